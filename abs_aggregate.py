@@ -0,0 +1,341 @@
+"""单次分组聚合：把所有维度编码后一次分组得到聚合立方体，各面板的统计表都从立方体上卷得到"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from abs_classify import RULES_CSV, classify, load_matcher
+from abs_data import CACHE_DIR, INTEGRATED_CSV, file_digest, read_integrated_appended
+from abs_sketch import DIGEST_ARRAYS, PERCENTILES, GroupedDigest
+from abs_topk import TOPK_ARRAYS, TOPK_SIZE, GroupedTopK
+
+SCALE_COLUMN = '拟发行金额(亿元)'
+
+# 处理天数 = 反馈/获批日期 − 申报日期；数据没有该列时不构建分位数草图
+APPROVAL_COLUMN = '反馈/获批日期'
+
+# 规模区间与原仪表板中的 pd.cut 分箱一致
+SCALE_BINS = [0, 10, 20, 30, 60]
+SCALE_LABELS = ['<10亿', '10-20亿', '20-30亿', '>30亿']
+
+# 立方体的维度，顺序即单元格编码中的维度顺序
+DIMENSIONS = ['承销商/管理人', '资产类型', '状态', '申报月份', '绿色认证', '规模区间']
+
+# 每个单元格的度量：行数、规模非缺失的行数、规模合计
+MEASURES = ['rows', 'count', 'sum']
+
+# 按这些维度分组维护审批处理天数（APPROVAL_COLUMN − 申报日期）的分位数草图
+DIGEST_DIMENSIONS = ['资产类型', '承销商/管理人']
+
+# 按这些维度分组保留规模最大的 TOPK_SIZE 个项目；不分组的 Top-N 取自第一个维度（每行都有资产类型）
+TOPK_DIMENSIONS = ['资产类型', '状态']
+
+# 持久化聚合状态的格式或维度变化时递增，旧状态自动失效
+AGGREGATE_VERSION = 3
+
+# 维度组合总数不超过该值时用稠密 bincount 分组（每个度量约 8 字节/组合），否则对组合键做哈希分组
+DENSE_CELLS = 1 << 22
+
+
+def _encode(values):
+    """把一列编码为 (整数codes, 取值表)；缺失值编码为-1
+
+    分类列保留类别顺序（与 groupby 对分类列的排序一致），其他列按取值排序。
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return np.asarray(values.cat.codes, dtype=np.int64), values.cat.categories
+    codes, levels = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(levels)
+
+
+def _encode_months(dates):
+    """按月编码日期列，取值表为最早到最晚月份的连续月度 PeriodIndex
+
+    直接换算月序号，不逐行构造 Period 也不做哈希；区间内没有数据的月份在上卷时自然被跳过。
+    """
+    months = dates.to_numpy().astype('datetime64[M]')
+    valid = ~np.isnat(months)
+    ordinals = months.astype(np.int64)
+    codes = np.full(len(months), -1, dtype=np.int64)
+    if not valid.any():
+        return codes, pd.PeriodIndex([], freq='M')
+    first, last = ordinals[valid].min(), ordinals[valid].max()
+    codes[valid] = ordinals[valid] - first
+    return codes, pd.PeriodIndex.from_ordinals(np.arange(first, last + 1), freq='M')
+
+
+def _encode_scale_bands(scale):
+    """按 SCALE_BINS 分箱（右闭，最低一档含左端点），等价于 pd.cut(..., include_lowest=True)"""
+    codes = np.searchsorted(SCALE_BINS, scale, side='left') - 1
+    codes[scale == SCALE_BINS[0]] = 0
+    codes[(codes < 0) | (codes >= len(SCALE_LABELS)) | np.isnan(scale)] = -1
+    return codes.astype(np.int64), pd.CategoricalIndex(SCALE_LABELS, categories=SCALE_LABELS, ordered=True)
+
+
+class AggregateCube:
+    """按 DIMENSIONS 全部维度分组后的稀疏单元格表
+
+    codes[维度] 为每个出现过的维度组合在该维度上的编码（-1表示缺失），measures[度量] 为对应单元格的度量；
+    levels[维度] 为取值表，编码即取值表中的位置。
+    digests[维度] 为 DIGEST_DIMENSIONS 中每个维度按取值分组的处理天数分位数草图（数据没有 APPROVAL_COLUMN 时为空），
+    tops[维度] 为 TOPK_DIMENSIONS 中每个维度按取值分组的规模 top-k。
+    """
+
+    def __init__(self, codes, measures, levels, digests=None, tops=None):
+        self.codes = codes
+        self.measures = measures
+        self.levels = levels
+        self.digests = digests or {}
+        self.tops = tops or {}
+
+    @classmethod
+    def from_frame(cls, df, top_k=TOPK_SIZE):
+        """对已分类的数据做一次分组；df 需要包含 资产类型 和 绿色认证 两列，每组保留规模最大的 top_k 个项目"""
+        scale = df[SCALE_COLUMN].to_numpy(dtype=float)
+        encoded = {
+            '承销商/管理人': _encode(df['承销商/管理人']),
+            '资产类型': _encode(df['资产类型']),
+            '状态': _encode(df['状态']),
+            '申报月份': _encode_months(df['申报日期']),
+            '绿色认证': _encode(df['绿色认证']),
+            '规模区间': _encode_scale_bands(scale),
+        }
+        levels = {name: encoded[name][1] for name in DIMENSIONS}
+        known = ~np.isnan(scale)
+        cube = cls._group([encoded[name][0] for name in DIMENSIONS], levels,
+                          None, known, np.where(known, scale, 0.0))
+        if APPROVAL_COLUMN in df:
+            days = (df[APPROVAL_COLUMN] - df['申报日期']).dt.days.to_numpy(dtype=float, na_value=np.nan)
+            cube.digests = {name: GroupedDigest.from_values(encoded[name][0], days, levels[name])
+                            for name in DIGEST_DIMENSIONS}
+        cube.tops = {name: GroupedTopK.from_frame(encoded[name][0], df, SCALE_COLUMN, levels[name], top_k)
+                     for name in TOPK_DIMENSIONS}
+        return cube
+
+    @classmethod
+    def _group(cls, codes, levels, rows, count, total):
+        """按维度组合对逐项度量分组求和；rows 为 None 时每项计为一行（原始数据），否则为已聚合的单元格"""
+        # 各维度编码（缺失值移到0）合成一个整数键，对键做一次分组
+        shape = tuple(len(levels[name]) + 1 for name in DIMENSIONS)
+        keys = np.ravel_multi_index([code + 1 for code in codes], shape)
+        dense = np.prod(shape, dtype=float) <= DENSE_CELLS
+        if dense:
+            group_of, n_groups = keys, int(np.prod(shape))
+        else:
+            group_of, cell_keys = pd.factorize(keys)
+            n_groups = len(cell_keys)
+        measures = {name: np.bincount(group_of, weights=weights, minlength=n_groups)
+                    for name, weights in zip(MEASURES, (rows, count, total))}
+        if dense:
+            cell_keys = np.flatnonzero(measures['rows'])
+            measures = {name: values[cell_keys] for name, values in measures.items()}
+        measures['rows'] = measures['rows'].astype(np.int64)
+        measures['count'] = measures['count'].astype(np.int64)
+
+        cell_codes = np.unravel_index(cell_keys, shape)
+        return cls({name: code - 1 for name, code in zip(DIMENSIONS, cell_codes)}, measures, levels)
+
+    def merge(self, other):
+        """合并两个立方体（例如历史状态与新增行）：取值表取并集，重新编码后按维度组合合并单元格"""
+        levels, codes = {}, []
+        for name in DIMENSIONS:
+            mine, theirs = self.levels[name], other.levels[name]
+            levels[name] = mine if mine.equals(theirs) else mine.union(theirs)
+            parts = []
+            for cube, level in ((self, mine), (other, theirs)):
+                # 末尾追加-1，使缺失编码(-1)仍映射为-1
+                mapping = np.append(levels[name].get_indexer(level), -1)
+                parts.append(mapping[cube.codes[name]])
+            codes.append(np.concatenate(parts))
+        measures = {name: np.concatenate([self.measures[name], other.measures[name]]) for name in MEASURES}
+        merged = self._group(codes, levels, measures['rows'], measures['count'], measures['sum'])
+        merged.digests = {name: self.digests[name].merge(other.digests[name])
+                          for name in DIGEST_DIMENSIONS if name in self.digests and name in other.digests}
+        merged.tops = {name: self.tops[name].merge(other.tops[name]) for name in TOPK_DIMENSIONS}
+        return merged
+
+    def _mask(self, where):
+        """where 为 {维度: 取值}，返回满足全部条件的单元格掩码；取值不存在时没有单元格满足"""
+        mask = np.ones(len(self.measures['rows']), dtype=bool)
+        for name, value in (where or {}).items():
+            level = self.levels[name]
+            code = level.get_loc(value) if value in level else -2
+            mask &= self.codes[name] == code
+        return mask
+
+    def total(self, measure, where=None):
+        """满足 where 的所有行上某个度量的合计"""
+        return self.measures[measure][self._mask(where)].sum()
+
+    def rollup(self, by, where=None):
+        """按 by 中的维度上卷，返回以取值为索引、MEASURES 为列的表
+
+        与 df.groupby(by) 的语义一致：跳过缺失键，只保留出现过的组合，按取值排序。
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        mask = self._mask(where)
+        for name in by:
+            mask &= self.codes[name] >= 0
+
+        # 在 by 维度构成的小空间里再做一次 bincount；按编码顺序展开即按取值排序
+        shape = tuple(len(self.levels[name]) for name in by)
+        keys = np.ravel_multi_index([self.codes[name][mask] for name in by], shape)
+        size = int(np.prod(shape))
+        rows = np.bincount(keys, weights=self.measures['rows'][mask], minlength=size)
+        observed = np.flatnonzero(rows)
+        table = pd.DataFrame({
+            'rows': rows[observed].astype(np.int64),
+            'count': np.bincount(keys, weights=self.measures['count'][mask], minlength=size)[observed].astype(np.int64),
+            'sum': np.bincount(keys, weights=self.measures['sum'][mask], minlength=size)[observed],
+        })
+
+        arrays = [self.levels[name].take(code) for name, code in zip(by, np.unravel_index(observed, shape))]
+        if len(by) == 1:
+            table.index = pd.Index(arrays[0], name=by[0])
+        else:
+            table.index = pd.MultiIndex.from_arrays(arrays, names=by)
+        return table
+
+    def value_counts(self, name):
+        """与 df[name].value_counts() 一致的计数（计数相同时按取值排序）"""
+        counts = self.rollup(name)['rows'].rename('count')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def crosstab(self, index, columns, measure='rows'):
+        """两个维度的交叉表，未出现的组合填0"""
+        return self.rollup([index, columns])[measure].unstack(fill_value=0)
+
+    def percentiles(self, by=None, percentiles=PERCENTILES):
+        """处理天数的百分位表（count、mean、p50、p90、p99）；by 为 DIGEST_DIMENSIONS 中的维度，None 为全部项目"""
+        if not self.digests:
+            raise ValueError(f'数据没有 {APPROVAL_COLUMN} 列，没有处理天数草图')
+        digest = self.digests[by or DIGEST_DIMENSIONS[0]]
+        table = (digest if by else digest.overall()).quantiles(percentiles)
+        table.index.name = by
+        return table
+
+    def top(self, n, where=None):
+        """规模最大的 n 个项目（与 df.nlargest(n, 规模) 的行和顺序一致），只读保留的 top-k 记录
+
+        where 为 {维度: 取值}，维度须在 TOPK_DIMENSIONS 中，例如 {'状态': '已申报'}。
+        """
+        (name, value), = (where or {TOPK_DIMENSIONS[0]: None}).items()
+        return self.tops[name].top(n, SCALE_COLUMN, value)
+
+
+def build_cube(df, top_k=TOPK_SIZE):
+    """对已分类的数据做一次分组聚合"""
+    return AggregateCube.from_frame(df, top_k)
+
+
+def _dump_level(level):
+    """把取值表转成可写入JSON的形式"""
+    if isinstance(level, pd.PeriodIndex):
+        return {'months': level.asi8.tolist()}
+    if isinstance(level, pd.CategoricalIndex):
+        return {'values': [str(v) for v in level], 'categories': [str(v) for v in level.categories],
+                'ordered': bool(level.ordered)}
+    return {'values': level.tolist()}
+
+
+def _load_level(entry):
+    if 'months' in entry:
+        return pd.PeriodIndex.from_ordinals(np.asarray(entry['months'], dtype=np.int64), freq='M')
+    if 'categories' in entry:
+        return pd.CategoricalIndex(entry['values'], categories=entry['categories'], ordered=entry['ordered'])
+    return pd.Index(entry['values'])
+
+
+def save_cube(cube, directory, meta):
+    """把立方体写成一个 .npz（编码矩阵 + 度量 + 草图质心）和一个 meta.json（取值表 + meta），整体替换旧状态"""
+    # 每个进程写自己的临时目录：并行构建时多个工作进程可能同时写同一份状态
+    tmp_dir = f'{directory}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    codes = np.vstack([cube.codes[name] for name in DIMENSIONS]).astype(np.int32)
+    digests = {f'digest{i}_{key}': values for i, name in enumerate(DIGEST_DIMENSIONS) if name in cube.digests
+               for key, values in cube.digests[name].to_arrays().items()}
+    tops = {f'top{i}_{key}': values for i, name in enumerate(TOPK_DIMENSIONS)
+            for key, values in cube.tops[name].to_arrays().items()}
+    np.savez(os.path.join(tmp_dir, 'cells.npz'), codes=codes, **cube.measures, **digests, **tops)
+    meta = dict(meta, levels={name: _dump_level(cube.levels[name]) for name in DIMENSIONS},
+                digests={name: {'levels': _dump_level(cube.digests[name].levels),
+                                'compression': cube.digests[name].compression} for name in cube.digests},
+                tops={name: {'levels': _dump_level(cube.tops[name].levels), 'k': cube.tops[name].k,
+                             'seen': cube.tops[name].seen, 'records': cube.tops[name].dump_records()}
+                      for name in TOPK_DIMENSIONS})
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # 另一个进程刚写入了同一份状态，保留它的
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_cube(directory):
+    """读取 save_cube 写出的状态，返回 (立方体, meta)；不存在时返回 (None, None)"""
+    meta_path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None, None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    with np.load(os.path.join(directory, 'cells.npz')) as cells:
+        codes = {name: cells['codes'][i].astype(np.int64) for i, name in enumerate(DIMENSIONS)}
+        measures = {name: cells[name] for name in MEASURES}
+        entries = meta.pop('digests')
+        digests = {name: GroupedDigest.from_arrays({key: cells[f'digest{i}_{key}'] for key in DIGEST_ARRAYS},
+                                                   _load_level(entries[name]['levels']), entries[name]['compression'])
+                   for i, name in enumerate(DIGEST_DIMENSIONS) if name in entries}
+        entries = meta.pop('tops')
+        tops = {name: GroupedTopK.from_arrays({key: cells[f'top{i}_{key}'] for key in TOPK_ARRAYS},
+                                              entries[name]['records'], _load_level(entries[name]['levels']),
+                                              entries[name]['k'], entries[name]['seen'])
+                for i, name in enumerate(TOPK_DIMENSIONS)}
+    levels = meta.pop('levels')
+    levels = {name: _load_level(levels[name]) for name in DIMENSIONS}
+    return AggregateCube(codes, measures, levels, digests, tops), meta
+
+
+def _classified_cube(df, matcher, top_k):
+    df = df.copy()
+    df['资产类型'], df['绿色认证'] = classify(df['ABS'], matcher)
+    return build_cube(df, top_k)
+
+
+def load_aggregates(path=INTEGRATED_CSV, rules=RULES_CSV, cache=True, top_k=TOPK_SIZE):
+    """返回 integrated ABS.csv 的聚合立方体，只把上次保存之后追加的行折叠进持久化状态
+
+    按文件路径保存一份状态，记录已处理到的字节位置；文件只在末尾追加时只解析、分类、聚合新增行，
+    刷新开销与增量大小成正比（处理天数的分位数草图和规模 top-k 同样只合并新增行）。
+    文件被改写、规则表变化或 top_k 变化时整体重建。
+    """
+    name = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    directory = os.path.join(CACHE_DIR, 'aggregates', f'integrated-{name}-v{AGGREGATE_VERSION}')
+    matcher = load_matcher(rules)
+    rules_digest = file_digest(rules)
+
+    cube, meta = load_cube(directory) if cache else (None, None)
+    if cube is not None and meta['rules'] == rules_digest and meta['top_k'] == top_k:
+        added, state = read_integrated_appended(path, meta['source'])
+        if added is not None and len(added) == 0:
+            # 没有新增行时立方体不变，但只追加了空白时已处理到的位置仍然前移，需要照常保存
+            if state == meta['source']:
+                return cube
+        else:
+            cube = cube.merge(_classified_cube(added, matcher, top_k)) if added is not None else None
+    else:
+        cube = None
+    if cube is None:
+        df, state = read_integrated_appended(path, None)
+        cube = _classified_cube(df, matcher, top_k)
+
+    if cache:
+        save_cube(cube, directory, {'source': state, 'rules': rules_digest, 'top_k': top_k,
+                                    'rows': int(cube.total('rows'))})
+    return cube
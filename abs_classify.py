@@ -0,0 +1,206 @@
+"""资产类型与绿色标签的向量化分类器"""
+import csv
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from abs_data import CACHE_DIR, file_digest
+
+# 规则表：每行一个关键词，asset 组按行序决定优先级，名称同时命中多条规则时取第一条
+RULES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'asset_rules.csv')
+
+# 规则编译或已分类名称缓存的格式变化时递增
+COMPILED_VERSION = 2
+
+# 启用已分类名称缓存的最少关键词数：实测10^6个名称下，一次哈希查表约相当于30个关键词的子串匹配
+MEMO_MIN_KEYWORDS = 32
+
+# 已分类名称缓存中名称之间的分隔符
+NAME_SEPARATOR = '\x1f'
+
+# 进程内缓存：规则文件摘要 -> 已编译的匹配器
+_MATCHERS = {}
+
+
+def compile_rules(path):
+    """解析规则CSV，编译为 (标签列表, 扁平关键词表, 绿色关键词列表)"""
+    labels, table, green_keywords, default = [], [], [], None
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            group, label, keyword = row['group'].strip(), row['label'].strip(), row['keyword'].strip()
+            if group == 'asset':
+                if label not in labels:
+                    labels.append(label)
+                table.append([keyword, labels.index(label)])
+            elif group == 'default':
+                default = label
+            elif group == 'green':
+                green_keywords.append(keyword)
+            else:
+                raise ValueError(f'未知规则组: {group}')
+    if default is None:
+        raise ValueError(f'规则文件缺少 default 行: {path}')
+    return {'labels': labels + [default], 'table': table, 'green': green_keywords}
+
+
+class KeywordMatcher:
+    """把有序关键词规则编译为一张扁平的(关键词, 编码)表，对去重后的名称逐个匹配
+
+    CPython 的子串查找对这类短中文名称比正则或 Aho-Corasick 绑定都快，
+    因此主要收益来自去重：每个不同的名称只匹配一次，结果按 factorize 编码回填整列。
+    指定 cache_dir 且规则表足够大时，已分类的名称连同结果持久化，
+    规则不变时只需匹配新出现的名称。
+    """
+
+    def __init__(self, compiled, cache_dir=None, memo=None):
+        self.labels = compiled['labels']
+        self.default_code = len(self.labels) - 1
+        self.table = [(keyword, code) for keyword, code in compiled['table']]
+        self.green_keywords = list(compiled['green'])
+        self.cache_dir = cache_dir
+        self._known = None
+        # 关键词较少时逐个子串匹配比查表更快，默认只有规则表足够大时才启用名称缓存
+        if memo is None:
+            memo = len(self.table) + len(self.green_keywords) >= MEMO_MIN_KEYWORDS
+        self.use_memo = bool(cache_dir) and memo
+
+    @classmethod
+    def from_rules_file(cls, path=RULES_CSV, cache=True):
+        """读取规则文件；编译结果按文件摘要缓存在磁盘和进程内"""
+        digest = file_digest(path)
+        key = (digest, cache)
+        if key in _MATCHERS:
+            return _MATCHERS[key]
+
+        cache_dir = None
+        compiled = None
+        if cache:
+            cache_dir = os.path.join(CACHE_DIR, 'rules', f'{digest[:16]}-v{COMPILED_VERSION}')
+            compiled_path = os.path.join(cache_dir, 'compiled.json')
+            if os.path.exists(compiled_path):
+                with open(compiled_path, encoding='utf-8') as f:
+                    compiled = json.load(f)
+        if compiled is None:
+            compiled = compile_rules(path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f'{compiled_path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(compiled, f, ensure_ascii=False)
+                os.replace(tmp_path, compiled_path)
+
+        matcher = cls(compiled, cache_dir)
+        _MATCHERS[key] = matcher
+        return matcher
+
+    def asset_code(self, name):
+        """返回单个名称命中的第一条规则编码"""
+        for keyword, code in self.table:
+            if keyword in name:
+                return code
+        return self.default_code
+
+    def green(self, name):
+        """返回单个名称是否包含绿色关键词"""
+        for keyword in self.green_keywords:
+            if keyword in name:
+                return True
+        return False
+
+    def match_unique(self, uniques):
+        """对一组不重复的名称匹配，返回编码数组和绿色标记数组"""
+        n = len(uniques)
+        codes = np.fromiter(map(self.asset_code, uniques), dtype=np.int16, count=n)
+        greens = np.fromiter(map(self.green, uniques), dtype=bool, count=n)
+        return codes, greens
+
+    def _memo_path(self):
+        return os.path.join(self.cache_dir, 'known.npz')
+
+    def _load_known(self):
+        """读取已分类名称表：名称以分隔符拼接后的UTF-8字节、编码、标记三个数组存于同一个 .npz"""
+        if self._known is None:
+            if os.path.exists(self._memo_path()):
+                with np.load(self._memo_path()) as memo:
+                    names = memo['names'].tobytes().decode('utf-8').split(NAME_SEPARATOR)
+                    codes, greens = memo['codes'], memo['greens']
+            else:
+                names, codes, greens = [], np.empty(0, dtype=np.int16), np.empty(0, dtype=bool)
+            self._known = (pd.Index(np.array(names, dtype=object)), codes, greens)
+        return self._known
+
+    def _append_known(self, names, codes, greens):
+        """把新分类的名称追加到缓存：三个数组写入本进程的临时文件后一起替换，名称与编码始终对应"""
+        index, known_codes, known_greens = self._load_known()
+        # 含分隔符的名称无法无歧义地存储，跳过即可（下次重新匹配）
+        storable = np.array([NAME_SEPARATOR not in name for name in names], dtype=bool)
+        names, codes, greens = names[storable], codes[storable], greens[storable]
+        if len(names) == 0:
+            return
+        index = index.append(pd.Index(names, dtype=object))
+        known_codes = np.concatenate([known_codes, codes])
+        known_greens = np.concatenate([known_greens, greens])
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f'{self._memo_path()}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, names=np.frombuffer(NAME_SEPARATOR.join(index).encode('utf-8'), dtype=np.uint8),
+                     codes=known_codes, greens=known_greens)
+        os.replace(tmp_path, self._memo_path())
+        self._known = (index, known_codes, known_greens)
+
+    def match_cached(self, uniques):
+        """先查已分类名称表，只对新名称执行匹配，并把新结果写回缓存"""
+        if not self.use_memo:
+            return self.match_unique(uniques)
+
+        index, known_codes, known_greens = self._load_known()
+        position = index.get_indexer(uniques)
+        is_new = position < 0
+        codes = np.full(len(uniques), self.default_code, dtype=np.int16)
+        greens = np.zeros(len(uniques), dtype=bool)
+        codes[~is_new] = known_codes[position[~is_new]]
+        greens[~is_new] = known_greens[position[~is_new]]
+        if is_new.any():
+            new_names = uniques[is_new]
+            codes[is_new], greens[is_new] = self.match_unique(new_names)
+            self._append_known(new_names, codes[is_new], greens[is_new])
+        return codes, greens
+
+    def classify(self, names):
+        """一次去重、一次匹配，返回每行的 (资产类型编码, 绿色标记)"""
+        row_codes, uniques = pd.factorize(pd.Series(names))
+        codes, greens = self.match_cached(np.asarray(uniques, dtype=object))
+        # 末尾追加缺失名称(code=-1)对应的默认值
+        codes = np.append(codes, self.default_code).astype(np.int16)
+        greens = np.append(greens, False)
+        return codes[row_codes], greens[row_codes]
+
+
+def load_matcher(path=RULES_CSV, cache=True):
+    """加载规则文件对应的匹配器"""
+    return KeywordMatcher.from_rules_file(path, cache)
+
+
+def classify(names, matcher=None, as_categorical=False):
+    """整列分类，返回 (资产类型, 绿色认证) 两个与输入同索引的Series"""
+    matcher = matcher or load_matcher()
+    names = pd.Series(names)
+    codes, greens = matcher.classify(names)
+    if as_categorical:
+        values = pd.Categorical.from_codes(codes, categories=matcher.labels)
+    else:
+        values = np.array(matcher.labels, dtype=object)[codes]
+    return (pd.Series(values, index=names.index, name='资产类型'),
+            pd.Series(greens, index=names.index, name='绿色认证'))
+
+
+def classify_asset_type(names, matcher=None, as_categorical=False):
+    """按规则表对整列ABS名称分类"""
+    return classify(names, matcher, as_categorical)[0]
+
+
+def is_green(names, matcher=None):
+    """整列判断是否为绿色/碳中和项目"""
+    return classify(names, matcher)[1]
@@ -0,0 +1,183 @@
+"""常驻渲染守护进程：解释器、字体和解析好的数据保持热状态，通过本地 Unix socket 接收渲染请求，省去每次的冷启动
+
+    python abs_daemon.py serve              # 前台启动守护进程
+    python abs_daemon.py render [图表 ...]   # 请求渲染，参数与 build_charts.py 相同；守护进程未运行时直接运行 build_charts.py
+    python abs_daemon.py stop
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+import warnings
+
+# 客户端只用到标准库；pandas、matplotlib 和项目模块只在 serve() 中导入，请求一次渲染不必等它们加载
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 与 abs_data.CACHE_DIR 取值相同；这里不导入 abs_data，以免客户端加载 pandas
+SOCKET_PATH = os.environ.get('ABS_DAEMON_SOCKET') or os.path.join(
+    ROOT, os.environ.get('ABS_CACHE_DIR', '.abs_cache'), 'render.sock')
+
+
+def request(message, path=SOCKET_PATH):
+    """向守护进程发送一个请求并等待回复；守护进程未运行时返回 None"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        with client.makefile('rwb') as stream:
+            stream.write(json.dumps(message, ensure_ascii=False).encode() + b'\n')
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def _warm_up():
+    """导入图表脚本用到的全部模块，注册中文字体并渲染一段文字填充字体缓存，解析全部数据集"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import PIL.Image  # noqa: F401  abs_export 生成缩略图时才导入
+
+    import abs_fonts
+    import build_charts
+
+    # 缺字形等警告在各图表脚本中同样被忽略，缺字情况由 abs_export 汇总记录
+    warnings.filterwarnings('ignore')
+    with plt.rc_context(abs_fonts.font_rc(['DejaVu Sans'])):
+        figure = plt.figure()
+        figure.text(0.1, 0.5, '资产证券化 ABS 0123', fontweight='bold')
+        figure.text(0.1, 0.2, '资产证券化 ABS 0123')
+        figure.canvas.draw()
+        plt.close(figure)
+    for target, _, _ in build_charts.TASKS.values():
+        if callable(target):
+            target()
+    return build_charts
+
+
+def _render(build_charts, message):
+    """在守护进程中执行一次构建，返回 build_charts.py 格式的报告文本"""
+    import abs_export
+
+    names = build_charts.resolve(message.get('charts') or
+                                 [name for name, task in build_charts.TASKS.items() if task[1]])
+    # 数据文件有变化时先在本进程中重新解析，之后 fork 出的工作进程直接继承解析结果
+    for name in names:
+        target = build_charts.TASKS[name][0]
+        if callable(target):
+            target()
+
+    cache = None
+    if not message.get('no_cache'):
+        cache_size = message.get('cache_size')
+        cache = build_charts.OutputCache() if cache_size is None else \
+            build_charts.OutputCache(max_bytes=cache_size << 20)
+    band_height, extras = abs_export.EXPORT_BAND_HEIGHT, abs_export.EXPORT_EXTRAS
+    if message.get('band_height'):
+        abs_export.EXPORT_BAND_HEIGHT = message['band_height']
+    if message.get('extras'):
+        abs_export.EXPORT_EXTRAS = True
+    try:
+        start = time.time()
+        results = build_charts.build(names, message.get('jobs'), cache)
+        return build_charts.format_report(results, start, time.time() - start, message.get('verbose', False))
+    finally:
+        abs_export.EXPORT_BAND_HEIGHT, abs_export.EXPORT_EXTRAS = band_height, extras
+
+
+def _claim(path):
+    """删除上次异常退出留下的 socket 文件；已有守护进程在监听时退出"""
+    if request({'command': 'ping'}, path) is not None:
+        raise SystemExit(f'渲染守护进程已在运行: {path}')
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+
+def serve(path=SOCKET_PATH):
+    """预热后逐个处理请求，直到收到 stop；每次构建的工作进程都从预热好的本进程 fork"""
+    start = time.time()
+    os.chdir(ROOT)
+    _claim(path)
+    build_charts = _warm_up()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    print(f'🔥 渲染守护进程已就绪（预热 {time.time() - start:.2f}s）：{path}', flush=True)
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection, connection.makefile('rwb') as stream:
+                line = stream.readline()
+                if not line:
+                    continue
+                # 格式错误的请求只给该客户端返回错误，守护进程继续服务
+                command = None
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError('请求必须是JSON对象')
+                    command = message.get('command', 'render')
+                    if command == 'render':
+                        reply = {'ok': True, 'report': _render(build_charts, message)}
+                    elif command in ('ping', 'stop'):
+                        reply = {'ok': True, 'report': ''}
+                    else:
+                        reply = {'ok': False, 'error': f'未知命令: {command}'}
+                except Exception as error:
+                    reply = {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+                try:
+                    stream.write(json.dumps(reply, ensure_ascii=False).encode() + b'\n')
+                    stream.flush()
+                except OSError:
+                    # 客户端已断开，不影响后续请求
+                    pass
+            if command == 'stop':
+                break
+    finally:
+        server.close()
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Unix socket 路径（也可用环境变量 ABS_DAEMON_SOCKET）')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('serve', help='启动守护进程')
+    commands.add_parser('stop', help='停止守护进程')
+    render = commands.add_parser('render', help='请求渲染图表')
+    render.add_argument('charts', nargs='*', help='只构建这些图表（默认全部）')
+    render.add_argument('-j', '--jobs', type=int, default=None, help='工作进程数（默认CPU核数）')
+    render.add_argument('-v', '--verbose', action='store_true', help='输出各图表脚本自身的打印内容')
+    render.add_argument('--no-cache', action='store_true', help='忽略输出缓存，全部重新渲染')
+    render.add_argument('--cache-size', type=int, default=None, help='输出缓存总大小上限(MB)')
+    render.add_argument('--band-height', type=int, default=None, help='仪表板分带渲染的像素行数')
+    render.add_argument('--extras', action='store_true', help='同时导出矢量格式和缩略图金字塔')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket)
+        return
+    if args.command == 'stop':
+        if request({'command': 'stop'}, args.socket) is None:
+            print('渲染守护进程未运行', file=sys.stderr)
+        return
+
+    reply = request({'command': 'render', 'charts': args.charts, 'jobs': args.jobs, 'verbose': args.verbose,
+                     'no_cache': args.no_cache, 'cache_size': args.cache_size, 'band_height': args.band_height,
+                     'extras': args.extras},
+                    args.socket)
+    if reply is None:
+        print('渲染守护进程未运行，改为直接运行 build_charts.py', file=sys.stderr)
+        argv = sys.argv[sys.argv.index('render') + 1:]
+        os.execv(sys.executable, [sys.executable, os.path.join(ROOT, 'build_charts.py')] + argv)
+    if not reply['ok']:
+        raise SystemExit(reply['error'])
+    print(reply['report'])
+
+
+if __name__ == '__main__':
+    main()
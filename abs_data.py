@@ -0,0 +1,177 @@
+"""共享数据加载层：每个数据源只解析一次，并缓存为按列存储的二进制快照"""
+import hashlib
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from abs_schema import FLOAT, PARTIAL_DATE, TEXT, Schema
+
+INTEGRATED_CSV = 'integrated ABS.csv'
+SHANGHAI_CSV = 'shanghai_real_estate_abs.csv'
+
+# 缓存目录，可通过环境变量覆盖
+CACHE_DIR = os.environ.get('ABS_CACHE_DIR', '.abs_cache')
+
+# 清洗逻辑变化时递增，旧快照自动失效
+SNAPSHOT_VERSION = 2
+
+# shanghai_real_estate_abs.csv 的声明式结构：字段以空格补齐，'N/A' 表示缺失，发行日期可能只到年或月
+SHANGHAI_SCHEMA = Schema({
+    'Product_Name': TEXT,
+    'Issuer': TEXT,
+    'Exchange': TEXT,
+    'Issuance_Date': PARTIAL_DATE,
+    'Scale_Billion_Yuan': FLOAT,
+    'Underlying_Asset_Type': TEXT,
+    'Asset_Category': TEXT,
+    'Status': TEXT,
+    'Third_Party_Certification': TEXT,
+    'Lead_Underwriter': TEXT,
+    'Special_Features': TEXT,
+    'Credit_Rating': TEXT,
+})
+
+# 进程内缓存：同一进程中的所有渲染器共享同一份解析结果
+_FRAMES = {}
+
+# 追加检测时核对的已处理内容末尾字节数
+APPEND_CHECK_BYTES = 1 << 16
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """计算文件内容的SHA-256摘要"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_state(path, size=None):
+    """记录文件已处理到的位置：字节数、该位置之前最后 APPEND_CHECK_BYTES 字节的摘要、是否以换行结尾"""
+    size = os.path.getsize(path) if size is None else size
+    start = max(0, size - APPEND_CHECK_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        tail = f.read(size - start)
+    return {'size': size, 'tail_digest': hashlib.sha256(tail).hexdigest(), 'newline': tail.endswith(b'\n')}
+
+
+def read_appended(path, state, reader):
+    """只解析 state 之后追加到文件末尾的行，返回 (新增行, 新的state)
+
+    state 为 None 时解析整个文件。文件被截断、已处理部分的末尾内容变化，
+    或追加内容接在未换行的最后一行上时，无法只读增量，返回的新增行为 None，调用方需要整体重建。
+    新的state 记录的正是本次解析到的位置，解析期间文件继续增长也不会重复或遗漏。
+    """
+    size = os.path.getsize(path)
+    if state is None:
+        with open(path, 'rb') as f:
+            data = f.read(size)
+        return reader(io.BytesIO(data)), source_state(path, size)
+    if size < state['size'] or source_state(path, state['size']) != state:
+        return None, source_state(path, size)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(state['size'])
+        added = f.read(size - state['size'])
+    new_state = source_state(path, size)
+    if not added.strip():
+        return pd.DataFrame(), new_state
+    if not state['newline'] and not added.startswith((b'\n', b'\r')):
+        return None, new_state
+    return reader(io.BytesIO(header + added)), new_state
+
+
+def _read_integrated(path):
+    """读取并清洗 integrated ABS.csv（path 也可以是文件对象）"""
+    # 日期列按文本读入：只含少量行的增量中该列可能全部为空
+    df = pd.read_csv(path, dtype={'反馈/获批日期': 'str'})
+    df['申报日期'] = pd.to_datetime(df['申报日期'])
+    df['反馈/获批日期'] = pd.to_datetime(df['反馈/获批日期'].str.partition('；')[0])
+    df['拟发行金额(亿元)'] = pd.to_numeric(df['拟发行金额(亿元)'])
+    return df
+
+
+def _read_shanghai(path):
+    """按 SHANGHAI_SCHEMA 一次解析 shanghai_real_estate_abs.csv（另有 Issuance_Date_Precision 列）"""
+    return SHANGHAI_SCHEMA.read(path)
+
+
+def _save_snapshot(df, directory):
+    """把DataFrame按列写成 .npy 文件；文本列做字典编码（整数codes + 取值表）"""
+    # 每个进程写自己的临时目录：并行构建时多个工作进程可能同时写同一份状态
+    tmp_dir = f'{directory}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {'name': name, 'file': f'{i}.npy', 'dtype': str(series.dtype)}
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+            entry['kind'] = 'array'
+            np.save(os.path.join(tmp_dir, entry['file']), series.to_numpy())
+        else:
+            entry['kind'] = 'dictionary'
+            codes, uniques = pd.factorize(series)
+            np.save(os.path.join(tmp_dir, entry['file']), codes.astype(np.int32))
+            entry['values'] = [str(v) for v in uniques]
+        columns.append(entry)
+
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'rows': len(df), 'columns': columns}, f, ensure_ascii=False)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # 另一个进程刚写入了同一份状态，保留它的
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _load_snapshot(directory):
+    """以内存映射方式读取按列快照"""
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+
+    data = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'dictionary':
+            # 末尾追加None，使code为-1的缺失值映射为None
+            lookup = np.array(entry['values'] + [None], dtype=object)
+            values = pd.Series(lookup[values]).astype(entry['dtype'])
+        data[entry['name']] = values
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['rows']))
+
+
+def _load(name, path, reader):
+    digest = file_digest(path)
+    key = (name, os.path.abspath(path), digest)
+    if key not in _FRAMES:
+        directory = os.path.join(CACHE_DIR, 'frames', f'{name}-{digest[:16]}-v{SNAPSHOT_VERSION}')
+        if not os.path.exists(os.path.join(directory, 'meta.json')):
+            _save_snapshot(reader(path), directory)
+        _FRAMES[key] = _load_snapshot(directory)
+    # 返回副本，调用方可以自由增删列而不影响共享缓存
+    return _FRAMES[key].copy()
+
+
+def load_integrated(path=INTEGRATED_CSV):
+    """加载持有型不动产ABS汇总数据（已完成日期/数值转换）"""
+    return _load('integrated', path, _read_integrated)
+
+
+def read_integrated_appended(path, state):
+    """只解析 integrated ABS.csv 在 state 之后追加的行（state 为 None 时解析整个文件），返回值同 read_appended"""
+    return read_appended(path, state, _read_integrated)
+
+
+def load_shanghai(path=SHANGHAI_CSV):
+    """加载上交所房地产ABS明细数据（已去除字段空白、缺失值标记转为缺失值并完成类型转换）"""
+    return _load('shanghai', path, _read_shanghai)
@@ -0,0 +1,420 @@
+"""分带导出大尺寸PNG：按水平条带逐段渲染，编码后的行直接写入PNG文件，峰值内存只与条带大小有关"""
+import os
+import struct
+import zlib
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.collections import Collection
+from matplotlib.patches import Patch, Rectangle
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+from abs_fonts import missing_glyphs
+from abs_logging import get_logger
+
+logger = get_logger('export')
+
+# 默认条带高度（像素）：8400像素宽的画布每个条带约 8400*1024*4 = 34MB
+BAND_HEIGHT = 1024
+
+# 图表脚本直接运行时的导出条带高度，未设置时按普通方式一次性保存；build_charts.py --band-height 也会设置它
+EXPORT_BAND_HEIGHT = int(os.environ.get('ABS_EXPORT_BAND_HEIGHT', 0)) or None
+
+# 矢量格式与缩略图金字塔：与主PNG共用一次布局，缩略图由渲染好的像素行缩小得到，不再额外渲染。
+# 默认只写主PNG；设置 ABS_EXPORT_EXTRAS=1 时图表脚本才同时导出，build_charts.py --extras 也会设置它
+EXPORT_EXTRAS = os.environ.get('ABS_EXPORT_EXTRAS', '0') != '0'
+EXPORT_DIR = 'exports'
+VECTOR_FORMATS = ('svg', 'pdf')
+THUMBNAIL_WIDTHS = (2048, 1024, 512, 256)
+THUMBNAIL_FORMATS = ('png', 'webp')
+WEBP_QUALITY = 90
+
+# 每次过滤、压缩的行数，限制中间数组的大小
+FILTER_ROWS = 64
+
+# 为避开跨越切口的易变图形，单个条带最多可延长到 band_height 的这一倍数
+BAND_STRETCH = 2
+
+# 判断坐标轴是否落在条带内时，在其外接框四周额外保留的像素（抗锯齿、描边等）
+CULL_MARGIN = 8
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_FILTER_UP = 2
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def _filter_rows(rows, previous):
+    """对RGBA行统一使用 Up 过滤器（与上一行逐字节相减，uint8 按模256回绕正是PNG的定义），返回带过滤类型字节的数据
+
+    图表以大片纯色和水平结构为主，Up 过滤后的压缩率与逐行自适应选择只差几个百分点，但计算量小一个数量级。
+    previous 为上一块的最后一行。
+    """
+    raw = rows.reshape(len(rows), -1)
+    filtered = np.empty((len(raw), raw.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = PNG_FILTER_UP
+    np.subtract(raw[:1], previous, out=filtered[:1, 1:])
+    np.subtract(raw[1:], raw[:-1], out=filtered[1:, 1:])
+    return filtered
+
+
+class PNGStreamWriter:
+    """逐段写入RGBA行的PNG编码器：IHDR 先写出，每段行过滤、压缩后立即作为 IDAT 块写入文件"""
+
+    def __init__(self, fileobj, width, height, dpi=None, metadata=None, compress_level=6):
+        self.file = fileobj
+        self.width, self.height = width, height
+        self.rows_written = 0
+        self._previous = np.zeros(width * 4, dtype=np.uint8)
+        self._compressor = zlib.compressobj(compress_level)
+
+        self.file.write(PNG_SIGNATURE)
+        self.file.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        if dpi:
+            pixels_per_meter = round(dpi / 0.0254)
+            self.file.write(_chunk(b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1)))
+        for key, value in (metadata or {}).items():
+            if value is not None:
+                self.file.write(_chunk(b'tEXt', key.encode('latin-1') + b'\0' + str(value).encode('latin-1', 'replace')))
+
+    def write_rows(self, rgba):
+        """写入若干行，rgba 形状为 (行数, 宽, 4) 的 uint8 数组"""
+        for start in range(0, len(rgba), FILTER_ROWS):
+            rows = rgba[start:start + FILTER_ROWS]
+            data = self._compressor.compress(_filter_rows(rows, self._previous).tobytes())
+            self._previous = rows[-1].reshape(-1).copy()
+            if data:
+                self.file.write(_chunk(b'IDAT', data))
+        self.rows_written += len(rgba)
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f'PNG声明 {self.height} 行，实际写入 {self.rows_written} 行')
+        self.file.write(_chunk(b'IDAT', self._compressor.flush()))
+        self.file.write(_chunk(b'IEND', b''))
+
+
+def _halve(rows):
+    """2×2 盒式滤波把偶数行数的RGBA块缩小一半，奇数宽度时重复最后一列"""
+    if rows.shape[1] % 2:
+        rows = np.concatenate([rows, rows[:, -1:]], axis=1)
+    total = rows[0::2, 0::2].astype(np.uint16) + rows[1::2, 0::2] + rows[0::2, 1::2] + rows[1::2, 1::2]
+    return ((total + 2) >> 2).astype(np.uint8)
+
+
+class ThumbnailPyramid:
+    """流式缩略图金字塔：逐段接收原图的RGBA行，逐级减半（每级只缓存一个奇数余行），
+    只保留每个目标宽度之上最近的一级；close() 后由该级按 Lanczos 缩放到准确的目标宽度。
+    """
+
+    def __init__(self, widths=THUMBNAIL_WIDTHS):
+        self.widths = sorted(widths, reverse=True)
+        self.levels = None
+        self.images = {}
+
+    def _start(self, width):
+        # 第 k 级宽度约为 width / 2**k；目标宽度 w 取宽度不小于 w 的最后一级
+        keep = {}
+        for target in self.widths:
+            if target < width:
+                keep[target] = int(np.log2(width / target))
+        self.depth = max(keep.values(), default=0)
+        self.keep = keep
+        self.pending = [None] * (self.depth + 1)
+        self.levels = {level: [] for level in set(keep.values())}
+
+    def write_rows(self, rgba):
+        if self.levels is None:
+            self._start(rgba.shape[1])
+        self._push(0, rgba)
+
+    def _push(self, level, rows):
+        if level in self.levels:
+            self.levels[level].append(rows.copy() if level == 0 else rows)
+        if level == self.depth or not len(rows):
+            return
+        if self.pending[level] is not None:
+            rows = np.concatenate([self.pending[level], rows])
+        even = len(rows) // 2 * 2
+        self.pending[level] = rows[even:].copy() if even < len(rows) else None
+        if even:
+            self._push(level + 1, _halve(rows[:even]))
+
+    def close(self):
+        if self.levels is None:
+            return
+        # 末尾的奇数行与自身配对后逐级下传
+        for level in range(self.depth):
+            if self.pending[level] is not None:
+                rows, self.pending[level] = self.pending[level], None
+                self._push(level + 1, _halve(np.concatenate([rows, rows])))
+        # 只有生成缩略图时才用到 Pillow，延迟导入以缩短不出缩略图时的启动时间
+        from PIL import Image
+        for target, level in self.keep.items():
+            image = Image.fromarray(np.concatenate(self.levels[level]))
+            height = max(round(image.height * target / image.width), 1)
+            self.images[target] = image.resize((target, height), Image.LANCZOS)
+
+    def save(self, stem, formats=THUMBNAIL_FORMATS):
+        """按 {stem}_{宽度}w.{格式} 保存各级缩略图，返回写出的路径"""
+        paths = []
+        for target, image in self.images.items():
+            for fmt in formats:
+                path = f'{stem}_{target}w.{fmt}'
+                if fmt == 'webp':
+                    image.save(path, quality=WEBP_QUALITY)
+                else:
+                    image.save(path)
+                paths.append(path)
+        return paths
+
+
+class _BandRendererAgg(RendererAgg):
+    """条带渲染器：描边路径不在条带边缘被截断，保证跨条带的线条与整幅渲染逐像素一致
+
+    Agg 在描边前把无填充路径裁剪到画布范围：虚线从裁剪点重新起算相位，粗线在裁剪点生成的线帽也会伸回画布内，
+    穿过条带边缘的线条因此与整幅渲染不同。对整幅画布本不会裁剪的路径附加一个完全透明的填充色来关闭这一步裁剪，
+    描边的顶点序列与整幅渲染相同，条带外的部分由光栅化器丢弃；透明填充不改变任何像素。
+    需要化简的长路径（化简只在裁剪时进行）保持原样绘制。
+    """
+
+    # alpha 非零才会关闭裁剪，但换算成8位后为0，填充不落任何像素
+    _NO_CLIP_FACE = (0.0, 0.0, 0.0, 1e-6)
+
+    def __init__(self, width, height, dpi):
+        super().__init__(width, height, dpi)
+        # 整幅画布在当前条带显示坐标中的范围，由 BandedCanvasAgg 在每个条带前设置
+        self.canvas_bounds = self.bbox
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        if rgbFace is None and gc.get_hatch() is None and not path.should_simplify and len(path.vertices):
+            x0, y0, x1, y1 = self.canvas_bounds.extents
+            vertices = transform.transform(path.vertices)
+            vertices = vertices[np.isfinite(vertices).all(axis=1)]
+            # 与 Agg 的裁剪范围一致：画布四周各外扩1像素
+            if len(vertices) and (vertices.min(axis=0) >= (x0 - 1, y0 - 1)).all() \
+                    and (vertices.max(axis=0) <= (x1 + 1, y1 + 1)).all():
+                # 强制 alpha 会覆盖填充色的 alpha；描边颜色里已经带有这个 alpha，绘制时暂时取消强制
+                forced_alpha, gc._forced_alpha = gc._forced_alpha, False
+                try:
+                    return super().draw_path(gc, path, transform, self._NO_CLIP_FACE)
+                finally:
+                    gc._forced_alpha = forced_alpha
+        super().draw_path(gc, path, transform, rgbFace)
+
+
+class BandedCanvasAgg(FigureCanvasAgg):
+    """按水平条带渲染的 Agg 画布，任何时刻只分配一个条带大小的渲染缓冲区
+
+    每个条带把 transFigure 的输出框向下平移整数像素，使条带对应的部分落到条带画布上；
+    渲染器高度保留整幅画布高度的小数部分，与一次性渲染时文字、图像的取整方式完全一致。
+    完全不与条带相交的坐标轴在该条带中跳过绘制。坐标平移后浮点舍入略有不同，
+    极少数虚线、曲线的抗锯齿边缘像素可能相差1级，其余像素与一次性渲染逐一相同。
+    """
+
+    def __init__(self, figure, band_height=BAND_HEIGHT, sinks=()):
+        super().__init__(figure)
+        # band_height 为 None 时整幅画布作为一个条带渲染；sinks 与PNG编码器一样逐段接收渲染好的行
+        self.band_height = band_height
+        self.sinks = list(sinks)
+
+    def _band_limit(self, rows):
+        return rows if self.band_height is None else self.band_height
+
+    def get_renderer(self):
+        # 排版和测量文字只需要渲染器的 dpi 与字体，不必分配整幅画布
+        width, height = self.figure.bbox.size
+        return self._band_renderer(width, min(height, self._band_limit(int(height))))
+
+    def _band_renderer(self, width, height):
+        key = (width, height, self.figure.dpi)
+        if getattr(self, '_band_key', None) != key:
+            self._band_key = key
+            self.renderer = _BandRendererAgg(width, height, self.figure.dpi)
+        else:
+            self.renderer.clear()
+        return self.renderer
+
+    def _axes_extents(self, renderer):
+        """每个可见坐标轴在整幅画布中的外接框（显示坐标），用于跳过条带外的坐标轴"""
+        return {ax: ax.get_tightbbox(renderer).padded(CULL_MARGIN) for ax in self.figure.axes if ax.get_visible()}
+
+    def _fragile_extents(self, renderer):
+        """边缘倾斜或弯曲的填充图形（扇形、圆角框、多边形、散点等）的外接框
+
+        光栅化器在条带边缘裁剪这类多边形时，交点取整与整幅渲染不同，边缘像素会有1~2级的差异；
+        水平/竖直的矩形、线条、文字和图像平移整数像素后完全一致，不需要避开。
+        """
+        extents = []
+        for artist in self.figure.findobj(lambda a: a.get_visible()):
+            if isinstance(artist, Text) and artist.get_bbox_patch() is not None and artist.get_text():
+                artist.update_bbox_position_size(renderer)
+                artist = artist.get_bbox_patch()
+            elif isinstance(artist, Rectangle) and artist.get_angle() == 0 or artist is self.figure.patch:
+                continue
+            elif not isinstance(artist, (Patch, Collection)):
+                continue
+            extent = artist.get_window_extent(renderer)
+            if np.isfinite(extent.extents).all() and extent.height > 0:
+                extents.append(extent.padded(CULL_MARGIN))
+        return extents
+
+    def _bands(self, extents, rows, fraction):
+        """把像素行切成若干条带，返回每个条带的 (起始行, 行数)
+
+        切口尽量落在不穿过任何易变图形的行上（在 band_height 以内取最靠下的一个），这样的切分与整幅渲染逐像素一致；
+        条带高度内没有这样的行时，条带最多延长到 BAND_STRETCH 倍去够下一个，仍然没有才在 band_height 处直接切开。
+        """
+        height = rows + fraction
+        free = np.ones(rows + 1, dtype=bool)
+        for extent in extents:
+            # 第 c 行之上的切口位于显示坐标 height - c，落在外接框内部即不可用
+            first = max(int(np.floor(height - extent.y1)) + 1, 0)
+            last = min(int(np.ceil(height - extent.y0)), rows + 1)
+            free[first:last] = False
+        cuts = np.flatnonzero(free)
+
+        limit = self._band_limit(rows)
+        bands, top = [], 0
+        while top < rows:
+            below = cuts[cuts > top]
+            reachable = below[below <= top + limit]
+            if len(reachable):
+                bottom = int(reachable[-1])
+            elif len(below) and below[0] <= top + BAND_STRETCH * limit:
+                bottom = int(below[0])
+            else:
+                bottom = min(top + limit, rows)
+            bands.append((top, bottom - top))
+            top = bottom
+        return bands
+
+    def print_png(self, filename_or_obj, *, metadata=None, pil_kwargs=None, **kwargs):
+        # print_figure 把 dpi/facecolor/orientation 等参数也传给非 matplotlib 自带的打印方法；这些参数此时已作用到 figure 上
+        width, height = self.figure.bbox.size
+        rows, columns = int(height), int(width)
+        fraction = height - rows
+        transform = self.figure.transFigure
+        boxout = transform._boxout
+        metadata = {'Software': f'Matplotlib version{matplotlib.__version__}, https://matplotlib.org/',
+                    **(metadata or {})}
+
+        with matplotlib.cbook.open_file_cm(filename_or_obj, 'wb') as f:
+            # 排版（bbox_inches='tight' 时 print_figure 在这里截获渲染器）只需一个条带大小的渲染器
+            renderer = self._band_renderer(width, min(self._band_limit(rows), rows) + fraction)
+            extents = self._axes_extents(renderer)
+            bands = self._bands(self._fragile_extents(renderer), rows, fraction)
+            writer = PNGStreamWriter(f, columns, rows, self.figure.dpi, metadata)
+            try:
+                for top, band in bands:
+                    renderer = self._band_renderer(width, band + fraction)
+                    # 条带底边在整幅画布显示坐标中的位置；整幅画布向下平移该距离后条带恰好落在 [0, band)
+                    shift = rows - top - band
+                    transform._boxout = Bbox(boxout.get_points() - [0, shift])
+                    transform.invalidate()
+                    renderer.canvas_bounds = Bbox.from_bounds(0, -shift, width, height)
+                    hidden = [ax for ax in extents
+                              if extents[ax].y1 < shift or extents[ax].y0 > shift + band + fraction]
+                    for ax in hidden:
+                        ax.set_visible(False)
+                    try:
+                        self.figure.draw(renderer)
+                    finally:
+                        for ax in hidden:
+                            ax.set_visible(True)
+                    pixels = np.asarray(renderer.buffer_rgba())[:band]
+                    for sink in [writer] + self.sinks:
+                        sink.write_rows(pixels)
+            finally:
+                transform._boxout = boxout
+                transform.invalidate()
+            for sink in [writer] + self.sinks:
+                sink.close()
+
+
+def save_banded_png(figure, fname, band_height=BAND_HEIGHT, **savefig_kwargs):
+    """与 figure.savefig(fname, format='png', ...) 输出相同的像素（见 BandedCanvasAgg），但按条带渲染并流式写入
+
+    支持 savefig 的全部参数（dpi、bbox_inches='tight'、facecolor 等）；保存结束后恢复原画布。
+    """
+    original = figure.canvas
+    try:
+        BandedCanvasAgg(figure, band_height).print_figure(fname, format='png', **savefig_kwargs)
+    finally:
+        figure.set_canvas(original)
+
+
+def _export_stem(fname):
+    """矢量文件和缩略图的路径前缀：与主PNG同目录下的 EXPORT_DIR 中，去掉扩展名"""
+    return os.path.join(os.path.dirname(fname), EXPORT_DIR, os.path.splitext(os.path.basename(fname))[0])
+
+
+def _extra_formats(vector_formats, thumbnail_widths):
+    """未显式指定的矢量格式和缩略图宽度按 EXPORT_EXTRAS 取默认值（调用时读取，build_charts.py 可在运行时修改）"""
+    if vector_formats is None:
+        vector_formats = VECTOR_FORMATS if EXPORT_EXTRAS else ()
+    if thumbnail_widths is None:
+        thumbnail_widths = THUMBNAIL_WIDTHS if EXPORT_EXTRAS else ()
+    return vector_formats, thumbnail_widths
+
+
+def _png_width(path):
+    """从PNG文件头（IHDR）读取宽度，文件不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(24)
+    except FileNotFoundError:
+        return None
+    return struct.unpack('>I', header[16:20])[0] if header[12:16] == b'IHDR' else None
+
+
+def export_paths(fname, vector_formats=None, thumbnail_widths=None, thumbnail_formats=THUMBNAIL_FORMATS, width=None):
+    """export_figure 以相同参数为 fname 写出的文件路径
+
+    宽度不小于原图的缩略图不会生成：width 为原图宽度，未给出时从已写出的 fname 读取（读不到时列出全部缩略图）。
+    """
+    vector_formats, thumbnail_widths = _extra_formats(vector_formats, thumbnail_widths)
+    width = _png_width(fname) if width is None else width
+    stem = _export_stem(fname)
+    return ([fname] + [f'{stem}.{fmt}' for fmt in vector_formats]
+            + [f'{stem}_{target}w.{fmt}' for target in thumbnail_widths if width is None or target < width
+               for fmt in thumbnail_formats])
+
+
+def export_figure(figure, fname, band_height=None, vector_formats=None, thumbnail_widths=None,
+                  thumbnail_formats=THUMBNAIL_FORMATS, **savefig_kwargs):
+    """一次布局导出一张图，返回写出的文件路径
+
+    主PNG按 savefig 参数渲染；只有给定 band_height（分带流式写入）或缩略图宽度时才经由 BandedCanvasAgg，
+    此时渲染好的像素行同时送入缩略图金字塔，缩略图不需要再次渲染；给定矢量格式（SVG/PDF）时由同一个已排版的 figure 直接输出到 EXPORT_DIR。
+    两者未指定时由 EXPORT_EXTRAS 决定是否导出。
+    """
+    vector_formats, thumbnail_widths = _extra_formats(vector_formats, thumbnail_widths)
+    stem = _export_stem(fname)
+    # 代替被 warnings.filterwarnings('ignore') 屏蔽的逐字形缺字警告，每张图汇总记录一次
+    missing = missing_glyphs(text.get_text() for text in figure.findobj(Text))
+    if missing:
+        logger.info('%s: %d 个字符没有中文字体字形: %s', fname, len(missing), ''.join(missing))
+    pyramid = ThumbnailPyramid(thumbnail_widths)
+    if band_height is None and not thumbnail_widths:
+        # 既不分带也不生成缩略图时不需要逐行接收像素，直接走 matplotlib 自己的 savefig
+        figure.savefig(fname, format='png', **savefig_kwargs)
+    else:
+        original = figure.canvas
+        try:
+            BandedCanvasAgg(figure, band_height, [pyramid] if thumbnail_widths else []).print_figure(
+                fname, format='png', **savefig_kwargs)
+        finally:
+            figure.set_canvas(original)
+
+    written = [fname]
+    if vector_formats or pyramid.images:
+        os.makedirs(os.path.dirname(stem), exist_ok=True)
+    for fmt in vector_formats:
+        figure.savefig(f'{stem}.{fmt}', format=fmt, **savefig_kwargs)
+        written.append(f'{stem}.{fmt}')
+    return written + pyramid.save(stem, thumbnail_formats)
@@ -0,0 +1,202 @@
+"""中文字体引导：只查找一次支持中文的字体，把路径和字形覆盖范围缓存到磁盘，渲染前注册并生成字体相关的 rcParams"""
+import bisect
+import hashlib
+import json
+import os
+
+import matplotlib
+from matplotlib import font_manager
+from matplotlib.ft2font import FT2Font
+
+from abs_data import CACHE_DIR
+from abs_logging import get_logger
+
+logger = get_logger('fonts')
+
+# 缓存格式或查找规则变化时递增，旧缓存自动失效
+FONT_CACHE_VERSION = 1
+
+# 指定字体文件路径时跳过查找
+CJK_FONT_ENV = 'ABS_CJK_FONT'
+
+# 按名称优先选用的中文字体（依次为 Linux、Windows、macOS 常见字体）
+CJK_FAMILIES = [
+    'Noto Sans CJK SC', 'Noto Sans SC', 'Source Han Sans SC', 'Source Han Sans CN',
+    'WenQuanYi Zen Hei', 'WenQuanYi Micro Hei', 'Droid Sans Fallback',
+    'SimHei', 'Microsoft YaHei', 'PingFang SC', 'Heiti SC', 'STHeiti', 'Arial Unicode MS',
+]
+
+# 按字形覆盖查找时，字体必须包含这些字符才算支持中文
+PROBE_TEXT = '资产证券化发行规模承销商绿色认证审批处理天数亿元'
+
+# 中日韩部首补充区的起点，其后的字符没有中文字体时都显示为方框
+CJK_FIRST_CODEPOINT = 0x2E80
+
+# 导出矢量文件时的字体嵌入方式：PDF 用 Type 42，由 fontTools 子集化为实际用到的字形；
+# Type 3 每个字体对象最多256个字形，中文会拆成多个字体对象。SVG 把用到的字形各定义一次再引用
+VECTOR_FONT_RC = {'pdf.fonttype': 42, 'svg.fonttype': 'path'}
+
+# 进程内缓存：引导结果，None 表示尚未引导
+_RESOLVED = None
+
+
+def _cache_path():
+    return os.path.join(CACHE_DIR, 'fonts.json')
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _fingerprint():
+    """matplotlib 已知字体文件列表和环境变量的摘要；安装或删除字体后摘要变化，触发重新查找"""
+    digest = hashlib.sha256(f'{FONT_CACHE_VERSION}-{matplotlib.__version__}'.encode())
+    digest.update(os.environ.get(CJK_FONT_ENV, '').encode())
+    for fname in sorted({entry.fname for entry in font_manager.fontManager.ttflist}):
+        digest.update(fname.encode())
+    return digest.hexdigest()
+
+
+def _ranges(codepoints):
+    """把码位集合压缩为 [起, 止] 闭区间列表"""
+    ranges = []
+    for code in sorted(codepoints):
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ranges
+
+
+def _coverage(path):
+    """字体支持中文时返回覆盖的码位区间，否则返回 None
+
+    探测字符必须各自映射到不同的字形：Last Resort 一类的兜底字体把整个区块映射到同一个占位字形，不算支持。
+    """
+    try:
+        charmap = FT2Font(path).get_charmap()
+    except (OSError, RuntimeError, ValueError):
+        return None
+    probe = set(PROBE_TEXT)
+    glyphs = {charmap.get(ord(char)) for char in probe}
+    if None in glyphs or 0 in glyphs or len(glyphs) < len(probe):
+        return None
+    return _ranges(charmap)
+
+
+def _uncovered(ranges, chars):
+    """返回 chars 中不在 ranges 内的字符（区间按起点有序，二分查找）"""
+    starts = [start for start, _ in ranges]
+    missing = []
+    for char in chars:
+        index = bisect.bisect_right(starts, ord(char)) - 1
+        if index < 0 or ord(char) > ranges[index][1]:
+            missing.append(char)
+    return missing
+
+
+def _candidates():
+    """依次产出待检查的字体文件：环境变量指定的、按名称匹配的、其余全部字体（matplotlib 列表之外的系统字体最后）"""
+    override = os.environ.get(CJK_FONT_ENV)
+    if override:
+        yield override
+    entries = font_manager.fontManager.ttflist
+    by_name = {}
+    for entry in entries:
+        by_name.setdefault(entry.name, []).append(entry)
+    for family in CJK_FAMILIES:
+        # 同名字体优先常规字重
+        for entry in sorted(by_name.get(family, []), key=lambda e: (e.weight != 400, e.style != 'normal')):
+            yield entry.fname
+    known = {entry.fname for entry in entries}
+    yield from sorted(known)
+    yield from sorted(set(font_manager.findSystemFonts()) - known)
+
+
+def _locate():
+    """返回第一个覆盖全部探测字符的字体 {'path', 'name', 'state', 'coverage'}，找不到时返回 None"""
+    seen = set()
+    for path in _candidates():
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.add(path)
+        coverage = _coverage(path)
+        if coverage:
+            name = font_manager.ttfFontProperty(FT2Font(path)).name
+            return {'path': path, 'name': name, 'state': _file_state(path), 'coverage': coverage}
+    return None
+
+
+def _load_cache(fingerprint):
+    try:
+        with open(_cache_path(), encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('fingerprint') != fingerprint:
+        return None
+    font = cached.get('font')
+    if font is not None:
+        # 字体文件被替换或删除时重新查找
+        try:
+            if _file_state(font['path']) != font['state']:
+                return None
+        except OSError:
+            return None
+    return cached
+
+
+def resolve_cjk_font(cache=True):
+    """查找支持中文的字体，返回 {'path', 'name', 'state', 'coverage'} 或 None；结果（包括找不到）缓存到磁盘"""
+    fingerprint = _fingerprint()
+    cached = _load_cache(fingerprint) if cache else None
+    if cached is not None:
+        return cached['font']
+
+    font = _locate()
+    if cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f'{_cache_path()}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'font': font}, f, ensure_ascii=False)
+        os.replace(tmp_path, _cache_path())
+    return font
+
+
+def bootstrap():
+    """每个进程引导一次：查找中文字体并注册到 matplotlib 的字体管理器，返回字体信息或 None"""
+    global _RESOLVED
+    if _RESOLVED is None:
+        font = resolve_cjk_font()
+        if font is None:
+            logger.warning('未找到支持中文的字体，中文将显示为方框；可通过环境变量 %s 指定字体文件', CJK_FONT_ENV)
+        elif font['path'] not in {entry.fname for entry in font_manager.fontManager.ttflist}:
+            font_manager.fontManager.addfont(font['path'])
+        _RESOLVED = font or {}
+    return _RESOLVED or None
+
+
+def font_rc(families):
+    """返回字体相关的 rcParams：中文字体排在最前，families 中只保留已安装的字体，
+    避免 matplotlib 为不存在的字体逐个查找并告警；同时设置矢量文件的字体子集化嵌入方式"""
+    font = bootstrap()
+    installed = {entry.name for entry in font_manager.fontManager.ttflist}
+    names = [font['name']] if font else []
+    names += [name for name in families if name in installed and name not in names]
+    return {'font.sans-serif': names or list(families), 'axes.unicode_minus': False, **VECTOR_FONT_RC}
+
+
+def font_key():
+    """渲染缓存键中的字体部分：所用中文字体的路径和文件状态"""
+    font = bootstrap()
+    return font and [font['path'], font['state']]
+
+
+def missing_glyphs(texts):
+    """返回文本中中文字体没有覆盖的字符（未找到中文字体时为全部中日韩字符），按码位排序"""
+    font = bootstrap()
+    chars = {char for text in texts for char in text if not char.isspace()}
+    if font is None:
+        return sorted(char for char in chars if ord(char) >= CJK_FIRST_CODEPOINT)
+    return sorted(_uncovered(font['coverage'], chars))
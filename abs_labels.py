@@ -0,0 +1,139 @@
+"""标签避让：在绘制前估算文字尺寸、用网格索引检测重叠，决定每个标签的位置、是否隐藏以及是否加引线"""
+import math
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+# 字符宽度（字号的倍数）：全角字符约占一个字号，半角字符约0.6
+WIDE_CHAR_WIDTH = 1.0
+NARROW_CHAR_WIDTH = 0.6
+
+# 行高（字号的倍数），与 matplotlib 默认的 linespacing 一致
+LINE_HEIGHT = 1.2
+
+
+def text_extent(text, fontsize, pad=0.0):
+    """估算多行文本（含 bbox 内边距，pad 为字号的倍数）的宽和高，单位为磅"""
+    lines = text.split('\n')
+    width = max(sum(WIDE_CHAR_WIDTH if unicodedata.east_asian_width(c) in 'WF' else NARROW_CHAR_WIDTH
+                    for c in line) for line in lines)
+    height = len(lines) * LINE_HEIGHT
+    return (width + 2 * pad) * fontsize, (height + 2 * pad) * fontsize
+
+
+def points_per_unit(ax):
+    """当前坐标范围下一个数据单位对应的磅数；等比例坐标取两个方向中较小的一个"""
+    fig_width, fig_height = ax.figure.get_size_inches() * 72
+    position = ax.get_position()
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return min(position.width * fig_width / abs(x1 - x0), position.height * fig_height / abs(y1 - y0))
+
+
+class GridIndex:
+    """均匀网格空间索引：矩形按外接框登记到覆盖的所有格子，查询只检查相邻格子中的候选"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+
+    def _cells_of(self, bounds):
+        x0, y0, x1, y1 = (math.floor(v / self.cell_size) for v in bounds)
+        return [(i, j) for i in range(x0, x1 + 1) for j in range(y0, y1 + 1)]
+
+    def insert(self, key, bounds):
+        for cell in self._cells_of(bounds):
+            self._cells[cell].append(key)
+
+    def query(self, bounds):
+        found = set()
+        for cell in self._cells_of(bounds):
+            found.update(self._cells.get(cell, ()))
+        return found
+
+
+def _box_corners(center_x, center_y, half_width, half_height, theta):
+    """旋转矩形的四个顶点（逐个标签调用，用标量运算避免小数组开销）"""
+    ux, uy = math.cos(theta), math.sin(theta)
+    return [(center_x + sx * half_width * ux - sy * half_height * uy,
+             center_y + sx * half_width * uy + sy * half_height * ux)
+            for sx, sy in ((-1, -1), (1, -1), (1, 1), (-1, 1))]
+
+
+def _bounds_overlap(a, b):
+    """两个外接框是否相交"""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _boxes_overlap(a, b):
+    """分离轴定理判断两个旋转矩形是否相交：矩形只需检查两条相邻边的法向"""
+    for corners in (a, b):
+        for k in range(2):
+            axis_x = corners[k][1] - corners[k + 1][1]
+            axis_y = corners[k + 1][0] - corners[k][0]
+            pa = [x * axis_x + y * axis_y for x, y in a]
+            pb = [x * axis_x + y * axis_y for x, y in b]
+            if max(pa) <= min(pb) or max(pb) <= min(pa):
+                return False
+    return True
+
+
+def radial_label_box(angle, radius, width, height, center=(0.0, 0.0)):
+    """径向标签的旋转矩形，返回 (四个顶点, 外接框)
+
+    对应 ax.text(..., rotation=角度, ha='left'/'right', va='center') 的默认 rotation_mode：
+    先旋转再按外接框对齐，右半边外接框左边缘贴着锚点，左半边右边缘贴着锚点。
+    """
+    cos, sin = math.cos(angle), math.sin(angle)
+    anchor_x = center[0] + radius * cos
+    anchor_y = center[1] + radius * sin
+    box_width = abs(width * cos) + abs(height * sin)
+    box_height = abs(width * sin) + abs(height * cos)
+    center_x = anchor_x + (box_width / 2 if cos >= 0 else -box_width / 2)
+    corners = _box_corners(center_x, anchor_y, width / 2, height / 2, angle)
+    bounds = (center_x - box_width / 2, anchor_y - box_height / 2,
+              center_x + box_width / 2, anchor_y + box_height / 2)
+    return corners, bounds
+
+
+def place_ring_labels(angles, radii, widths, heights, priority=None, max_steps=4,
+                      leader_min=None, center=(0.0, 0.0)):
+    """为环形排列的径向标签消解重叠
+
+    angles/radii 为标签锚点的极坐标，widths/heights 为数据单位下的标签尺寸。
+    按 priority 从高到低依次放置：先试原位，再沿圆周向两侧按半个标签高度为步长微调，
+    最多 max_steps 步；仍然冲突的标签隐藏。偏移的弧长超过 leader_min（默认半个标签高度）时需要引线。
+    返回 (放置角度, 是否显示, 是否需要引线) 三个数组。
+    """
+    angles, radii, widths, heights = (np.asarray(a, dtype=float) for a in (angles, radii, widths, heights))
+    n = len(angles)
+    order = np.argsort(-np.asarray(priority, dtype=float), kind='stable') if priority is not None else np.arange(n)
+
+    placed_angles = angles.copy()
+    visible = np.zeros(n, dtype=bool)
+    leader = np.zeros(n, dtype=bool)
+    if n == 0:
+        return placed_angles, visible, leader
+
+    index = GridIndex(cell_size=max(float(np.median(widths)), float(np.median(heights)), 1e-9))
+    placed = {}
+    angles_list, radii_list = angles.tolist(), radii.tolist()
+    widths_list, heights_list = widths.tolist(), heights.tolist()
+    for i in order.tolist():
+        angle, radius, width, height = angles_list[i], radii_list[i], widths_list[i], heights_list[i]
+        step = height / 2 / radius
+        shifts = [0.0] + [sign * k * step for k in range(1, max_steps + 1) for sign in (1, -1)]
+        for shift in shifts:
+            corners, bounds = radial_label_box(angle + shift, radius, width, height, center)
+            # 先用外接框快速排除，再对旋转矩形做精确判断
+            if not any(_bounds_overlap(bounds, placed[k][1]) and _boxes_overlap(corners, placed[k][0])
+                       for k in index.query(bounds)):
+                placed[i] = (corners, bounds)
+                index.insert(i, bounds)
+                placed_angles[i] = angle + shift
+                visible[i] = True
+                threshold = height / 2 if leader_min is None else leader_min
+                leader[i] = abs(shift) * radius > threshold
+                break
+    return placed_angles, visible, leader
@@ -0,0 +1,91 @@
+"""极坐标布局：一次向量化计算所有节点的角度和坐标，结果按输入摘要缓存"""
+import hashlib
+import os
+
+import numpy as np
+
+from abs_data import CACHE_DIR
+
+# 布局算法变化时递增，旧缓存自动失效
+LAYOUT_VERSION = 1
+
+# 进程内缓存：输入摘要 -> (角度, x, y)
+_LAYOUTS = {}
+
+
+def _digest(kind, arrays, params):
+    """对布局类型、输入数组和标量参数计算摘要"""
+    digest = hashlib.sha256(f'{kind}-v{LAYOUT_VERSION}'.encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def _cached(kind, arrays, params, compute, cache=True):
+    """先查进程内缓存，再查磁盘缓存，都未命中时计算并写回"""
+    key = _digest(kind, arrays, params)
+    if key in _LAYOUTS:
+        return _LAYOUTS[key]
+
+    path = os.path.join(CACHE_DIR, 'layout', f'{key[:24]}.npy')
+    if cache and os.path.exists(path):
+        stacked = np.load(path)
+    else:
+        stacked = np.vstack(compute())
+        if cache:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, stacked)
+            os.replace(tmp_path, path)
+
+    _LAYOUTS[key] = (stacked[0], stacked[1], stacked[2])
+    return _LAYOUTS[key]
+
+
+def ring_layout(n, radius, center=(0.0, 0.0), cache=True):
+    """n个节点从0度起均匀分布在一个圆上，返回 (角度, x, y)"""
+    def compute():
+        angles = 2 * np.pi * np.arange(n) / n if n else np.empty(0)
+        return angles, center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)
+
+    return _cached('ring', [], (n, radius, tuple(center)), compute, cache)
+
+
+def sector_layout(starts, ends, counts, radii, margin=0.0, center=(0.0, 0.0), cache=True):
+    """把每组节点均匀铺在各自的角度区间 [start, end] 内
+
+    starts/ends/counts/radii 为每组一个元素的数组，结果按组顺序拼接，组内按原顺序排列。
+    区间两端各留出 margin 比例的空白；只有一个节点的组放在区间中点。
+    返回 (角度, x, y)，长度为 counts 之和。
+    """
+    starts, ends, counts = (np.asarray(a, dtype=float) for a in (starts, ends, counts))
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), starts.shape)
+
+    def compute():
+        sizes = counts.astype(int)
+        group = np.repeat(np.arange(len(sizes)), sizes)
+        # 组内序号：全局序号减去所在组的起始偏移
+        offsets = np.cumsum(sizes) - sizes
+        j = np.arange(sizes.sum()) - offsets[group]
+
+        start, n = starts[group], sizes[group]
+        span = ends[group] - start
+        gap = span * margin
+        usable = span - 2 * gap
+        spread = start + gap + (j / np.maximum(1, n - 1)) * usable
+        angles = np.where(n == 1, start + span / 2, spread)
+        return (angles, center[0] + radii[group] * np.cos(angles),
+                center[1] + radii[group] * np.sin(angles))
+
+    return _cached('sector', [starts, ends, counts, radii], (margin, tuple(center)), compute, cache)
+
+
+def fan_layout(centers, counts, span, radii, center=(0.0, 0.0), cache=True):
+    """每组节点以 centers 中的角度为中心展开成宽为 span 的扇形，单个节点位于中心角"""
+    centers = np.asarray(centers, dtype=float)
+    return sector_layout(centers - span / 2, centers + span / 2, counts, radii,
+                         center=center, cache=cache)
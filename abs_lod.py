@@ -0,0 +1,38 @@
+"""细节层次（LOD）：在节点预算内挑出单独绘制的产品，其余按分组聚合为汇总节点"""
+import numpy as np
+
+
+def select_lod(scales, groups, budget=None, n_groups=None):
+    """按规模选出单独绘制的产品，使 单独节点数 + 汇总节点数 不超过 budget
+
+    scales 为每个产品的规模，groups 为每个产品所属分组的整数编码（0..n_groups-1，默认按最大编码推断）。
+    规模最大的 k 个产品单独绘制，每个还有剩余产品的分组各加一个汇总节点；
+    取满足预算的最大 k；只剩一个产品的分组直接绘制该产品。预算小于分组数时只保留汇总节点（每组至少一个节点）。
+    返回 (是否单独绘制, 每组汇总数量, 每组汇总规模)。
+    """
+    scales = np.nan_to_num(np.asarray(scales, dtype=float))
+    groups = np.asarray(groups, dtype=int)
+    n = len(scales)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if n else 0
+    if budget is None or n <= budget:
+        return np.ones(n, dtype=bool), np.zeros(n_groups, dtype=int), np.zeros(n_groups)
+
+    # 按规模从大到小排序；前k个单独绘制时，还需要汇总节点的分组数 = 最后一次出现位置 >= k 的分组数
+    order = np.argsort(-scales, kind='stable')
+    last_position = np.zeros(n_groups, dtype=int)
+    np.maximum.at(last_position, groups[order], np.arange(n))
+    groups_left = np.cumsum(np.bincount(last_position, minlength=n)[::-1])[::-1]
+    totals = np.arange(n) + groups_left
+    fits = np.nonzero(totals <= budget)[0]
+    k = int(fits.max()) if len(fits) else 0
+
+    individual = np.zeros(n, dtype=bool)
+    individual[order[:k]] = True
+    # 只剩一个产品的分组直接画出该产品，节点数不变
+    single = np.bincount(groups[~individual], minlength=n_groups) == 1
+    individual |= single[groups]
+    rest = ~individual
+    summary_count = np.bincount(groups[rest], minlength=n_groups)
+    summary_scale = np.bincount(groups[rest], weights=scales[rest], minlength=n_groups)
+    return individual, summary_count, summary_scale
@@ -0,0 +1,37 @@
+"""统一的日志配置：默认静默，可选计数摘要或逐条调试输出"""
+import logging
+import os
+
+# 本项目所有日志记录器都挂在这个命名空间下，调级别时不影响 matplotlib 等第三方库
+ROOT_LOGGER = 'abs'
+
+LOG_FORMAT = '%(levelname)s %(name)s: %(message)s'
+
+
+def get_logger(name):
+    """返回项目命名空间下的日志记录器"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def configure_logging(verbose=False, summary=False):
+    """配置日志级别：默认只输出警告；summary 输出计数摘要(INFO)；verbose 输出调试信息(DEBUG)
+
+    环境变量 ABS_LOG_LEVEL（如 DEBUG/info，不区分大小写）优先于参数；无法识别的级别名回退到默认级别并给出警告。
+    """
+    if verbose:
+        level = logging.DEBUG
+    elif summary:
+        level = logging.INFO
+    else:
+        level = logging.WARNING
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logger = logging.getLogger(ROOT_LOGGER)
+    name = os.environ.get('ABS_LOG_LEVEL')
+    if name:
+        # getLevelName 对已知级别名返回对应的整数级别，否则返回字符串
+        resolved = logging.getLevelName(name.strip().upper())
+        if isinstance(resolved, int):
+            level = resolved
+        else:
+            logger.warning('未知的 ABS_LOG_LEVEL=%r，使用默认级别 %s', name, logging.getLevelName(level))
+    logger.setLevel(level)
@@ -0,0 +1,157 @@
+"""按内容寻址的图表输出缓存：渲染输入（代码、读取的数据列、主题、参数）的摘要不变时直接复用已生成的图片"""
+import ast
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from abs_data import CACHE_DIR
+
+# 缓存总大小上限（字节），超出时按最近使用时间淘汰，可通过环境变量覆盖
+MAX_CACHE_BYTES = int(os.environ.get('ABS_RENDER_CACHE_BYTES', 1 << 30))
+
+# 摘要算法或输入构成变化时递增，旧缓存自动失效
+RENDER_KEY_VERSION = 1
+
+
+def column_digest(df, columns):
+    """对 df 中指定列的内容计算摘要（按列名和逐行哈希值）"""
+    digest = hashlib.sha256()
+    for name in columns:
+        digest.update(name.encode())
+        digest.update(pd.util.hash_pandas_object(df[name], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _module_tree(path):
+    """返回脚本本身及其直接或间接导入的同目录模块的路径"""
+    directory = os.path.dirname(os.path.abspath(path))
+    found, pending = set(), [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        if current in found:
+            continue
+        found.add(current)
+        with open(current, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module_path = os.path.join(directory, name.split('.')[0] + '.py')
+                if os.path.exists(module_path):
+                    pending.append(module_path)
+    return sorted(found)
+
+
+def code_digest(path):
+    """对脚本及其导入的项目模块的源码计算摘要"""
+    digest = hashlib.sha256()
+    for module_path in _module_tree(path):
+        digest.update(os.path.basename(module_path).encode())
+        with open(module_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def theme_values(path, names):
+    """不执行脚本，静态读取模块级主题变量的取值；不是字面量的赋值取其源码文本"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    values = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id in names:
+                    try:
+                        values[target.id] = ast.literal_eval(node.value)
+                    except ValueError:
+                        values[target.id] = ast.get_source_segment(source, node.value)
+    missing = set(names) - set(values)
+    if missing:
+        raise KeyError(f'{path} 中没有主题变量: {sorted(missing)}')
+    return values
+
+
+def render_key(**parts):
+    """把渲染输入的各部分（均可JSON序列化）合成一个缓存键"""
+    payload = json.dumps({'version': RENDER_KEY_VERSION, **parts}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class OutputCache:
+    """以缓存键命名的输出目录：一次渲染的全部输出文件连同记录其路径的清单存放在同一个条目目录中；
+    条目整体写入、整体淘汰（按清单的最后使用时间），命中时刷新清单时间；缺少任何一个文件即视为未命中"""
+
+    def __init__(self, directory=None, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory or os.path.join(CACHE_DIR, 'renders')
+        self.max_bytes = max_bytes
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def fetch(self, key, outputs):
+        """清单记录的输出文件与 outputs 一致时，把缓存的文件复制回原路径并返回 True"""
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if sorted(map(os.path.abspath, manifest)) != sorted(map(os.path.abspath, outputs)):
+                return False
+            for index, output in enumerate(manifest):
+                os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+                shutil.copyfile(os.path.join(entry, str(index)), output)
+            os.utime(os.path.join(entry, 'manifest.json'))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, outputs):
+        """把刚生成的输出文件（不存在的跳过）写入本进程的临时目录，整体替换该键的条目，然后淘汰超出上限的旧条目"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_dir = f'{self._entry(key)}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        stored = [output for output in outputs if os.path.exists(output)]
+        for index, output in enumerate(stored):
+            shutil.copyfile(output, os.path.join(tmp_dir, str(index)))
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(stored, f, ensure_ascii=False)
+        shutil.rmtree(self._entry(key), ignore_errors=True)
+        try:
+            os.replace(tmp_dir, self._entry(key))
+        except OSError:
+            # 另一个进程刚写入了同一个键（内容相同），保留它的条目
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """按条目的最后使用时间从旧到新整体删除条目，直到总大小不超过上限；没有清单的条目（旧格式遗留）最先删除"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp'):
+                continue
+            if not entry.is_dir():
+                entries.append((0.0, entry.stat().st_size, entry.path))
+                continue
+            files = list(os.scandir(entry.path))
+            used = next((f.stat().st_mtime for f in files if f.name == 'manifest.json'), 0.0)
+            entries.append((used, sum(f.stat().st_size for f in files), entry.path))
+        total = sum(size for _, size, _ in entries)
+        for used, size, path in sorted(entries):
+            if total <= self.max_bytes and used:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
@@ -0,0 +1,164 @@
+"""发行人地域解析：发行人去重后用由省市名录编译的一个多模式自动机（Aho-Corasick）匹配，发行人→省份结果缓存到磁盘"""
+import csv
+import json
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from abs_data import CACHE_DIR, file_digest
+
+# 省市名录：每行一个关键词（省级名称、地级市、知名区县/新区）及其所属省级行政区；
+# exclude 组为含地名但不表示地域的词（如“中山证券”），命中时其覆盖的位置不再匹配地名
+GAZETTEER_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'region_gazetteer.csv')
+
+# 没有命中任何地名的发行人
+DEFAULT_REGION = '其他'
+
+# 缓存格式或匹配规则变化时递增
+REGION_CACHE_VERSION = 1
+
+# 进程内缓存：名录文件摘要 -> 解析器
+_RESOLVERS = {}
+
+
+def load_gazetteer(path=GAZETTEER_CSV):
+    """读取名录CSV，返回 [(关键词, 省份或 None)]；None 表示 exclude 词"""
+    entries = []
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            group, region, keyword = row['group'].strip(), row['region'].strip(), row['keyword'].strip()
+            if group not in ('province', 'city', 'district', 'exclude'):
+                raise ValueError(f'未知名录组: {group}')
+            entries.append((keyword, None if group == 'exclude' else region))
+    return entries
+
+
+class KeywordAutomaton:
+    """全部关键词编译成的一个 Aho-Corasick 自动机，一次扫描名称即找出所有命中
+
+    goto[状态] 为 {字符: 下一状态}，fail[状态] 为失配链接，outputs[状态] 为在该状态结束的
+    全部关键词编号（沿失配链接合并）。
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.goto = [{}]
+        outputs = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    outputs.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            outputs[state].append(index)
+
+        # 按层序计算失配链接，并把失配状态的输出并入当前状态
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                outputs[child] = outputs[child] + outputs[self.fail[child]]
+        self.outputs = [tuple(output) for output in outputs]
+
+    def matches(self, text):
+        """返回 text 中全部命中 [(起点, 终点, 关键词编号)]"""
+        found = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for index in self.outputs[state]:
+                found.append((position + 1 - len(self.keywords[index]), position + 1, index))
+        return found
+
+
+class RegionResolver:
+    """按省市名录把发行人名称解析为省级行政区
+
+    名称中出现多个地名时取最靠前的一个，同一起点取最长的（“吉林市”优先于“吉林”，
+    “海南藏族自治州”优先于“海南”）；exclude 词覆盖的位置跳过。
+    指定 cache_dir 时，已解析的发行人连同结果持久化，名录不变时只需匹配新出现的发行人。
+    """
+
+    def __init__(self, entries, cache_dir=None):
+        self.automaton = KeywordAutomaton(keyword for keyword, _ in entries)
+        self.regions = [region for _, region in entries]
+        self.cache_dir = cache_dir
+        self._known = None
+
+    @classmethod
+    def from_gazetteer_file(cls, path=GAZETTEER_CSV, cache=True):
+        """读取名录文件；解析器按文件摘要缓存在进程内，已解析的发行人按摘要缓存在磁盘"""
+        digest = file_digest(path)
+        key = (digest, cache)
+        if key not in _RESOLVERS:
+            cache_dir = os.path.join(CACHE_DIR, 'regions', f'{digest[:16]}-v{REGION_CACHE_VERSION}') if cache else None
+            _RESOLVERS[key] = cls(load_gazetteer(path), cache_dir)
+        return _RESOLVERS[key]
+
+    def region(self, name):
+        """返回单个名称所属的省级行政区，没有命中时返回 DEFAULT_REGION"""
+        blocked = 0
+        for start, end, index in sorted(self.automaton.matches(name), key=lambda m: (m[0], -m[1])):
+            if start < blocked:
+                continue
+            if self.regions[index] is not None:
+                return self.regions[index]
+            blocked = end
+        return DEFAULT_REGION
+
+    def _known_path(self):
+        return os.path.join(self.cache_dir, 'issuers.json')
+
+    def _load_known(self):
+        if self._known is None:
+            try:
+                with open(self._known_path(), encoding='utf-8') as f:
+                    self._known = json.load(f)
+            except (OSError, ValueError):
+                self._known = {}
+        return self._known
+
+    def resolve_unique(self, uniques):
+        """对一组不重复的名称解析地域；有磁盘缓存时只匹配缓存中没有的名称，并把新结果写回"""
+        if not self.cache_dir:
+            return [self.region(name) for name in uniques]
+        known = self._load_known()
+        new = [name for name in uniques if name not in known]
+        if new:
+            known.update((name, self.region(name)) for name in new)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{self._known_path()}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(known, f, ensure_ascii=False)
+            os.replace(tmp_path, self._known_path())
+        return [known[name] for name in uniques]
+
+    def resolve(self, names):
+        """整列解析：去除首尾空白后去重，每个不同的发行人只解析一次，结果按 factorize 编码回填"""
+        names = pd.Series(names)
+        row_codes, uniques = pd.factorize(names.astype('str').str.strip())
+        regions = np.array(self.resolve_unique(list(uniques)) + [DEFAULT_REGION], dtype=object)
+        # 缺失的发行人(code=-1)取末尾追加的默认值
+        return pd.Series(regions[row_codes], index=names.index, name='Region')
+
+
+def load_resolver(path=GAZETTEER_CSV, cache=True):
+    """加载名录文件对应的地域解析器"""
+    return RegionResolver.from_gazetteer_file(path, cache)
+
+
+def resolve_regions(issuers, resolver=None):
+    """整列把发行人解析为省级行政区，返回与输入同索引的Series"""
+    return (resolver or load_resolver()).resolve(issuers)
@@ -0,0 +1,177 @@
+"""批量渲染：把逐条绘制的线段和节点合并为按样式/图层分组的 Collection，每组只创建一个艺术家；
+点数过多的散点图改为分箱后的密度图像"""
+import os
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.collections import EllipseCollection, LineCollection, PatchCollection
+
+# 散点数超过该值时改画密度图，可通过环境变量覆盖
+DENSITY_THRESHOLD = int(os.environ.get('ABS_DENSITY_THRESHOLD', 20000))
+
+# 密度图的 (横轴, 纵轴) 分箱数
+DENSITY_BINS = (240, 120)
+
+# 密度图是否按图层（如项目状态）分色叠加；设为 0 时所有点合并为一层
+DENSITY_LAYERS = os.environ.get('ABS_DENSITY_LAYERS', '1') != '0'
+
+
+class EdgeBatch:
+    """按 (颜色, 线型, 透明度, 图层) 收集线段，线宽可以逐条不同"""
+
+    def __init__(self):
+        self._groups = {}
+
+    def __len__(self):
+        return sum(len(segments) for segments, _ in self._groups.values())
+
+    def add(self, start, end, color, linewidth=1.0, linestyle='-', alpha=None, zorder=2):
+        """添加一条从 start 到 end 的线段，参数含义与 ax.plot 一致"""
+        segments, widths = self._groups.setdefault((color, linestyle, alpha, zorder), ([], []))
+        segments.append((start, end))
+        widths.append(linewidth)
+
+    def draw(self, ax):
+        """每种样式生成一个 LineCollection 并加入坐标轴，返回创建的艺术家列表"""
+        artists = []
+        for (color, linestyle, alpha, zorder), (segments, widths) in self._groups.items():
+            # 端点和连接样式与 Line2D 的默认值保持一致，保证渲染结果相同
+            if linestyle in ('-', 'solid'):
+                capstyle = mpl.rcParams['lines.solid_capstyle']
+                joinstyle = mpl.rcParams['lines.solid_joinstyle']
+            else:
+                capstyle = mpl.rcParams['lines.dash_capstyle']
+                joinstyle = mpl.rcParams['lines.dash_joinstyle']
+            collection = LineCollection(segments, colors=color, linewidths=widths,
+                                        linestyles=linestyle, alpha=alpha, zorder=zorder,
+                                        capstyle=capstyle, joinstyle=joinstyle)
+            ax.add_collection(collection)
+            artists.append(collection)
+        return artists
+
+
+class NodeBatch:
+    """按图层收集圆形节点，每个图层输出一个 EllipseCollection
+
+    每次 add/add_many 的位置、半径、颜色和线宽作为一段追加到图层，绘制时各字段一次拼接为 NumPy 数组；
+    颜色语义与 Circle(color=...) 相同，即未指定 edgecolor 时边框与填充同色。
+    """
+
+    def __init__(self):
+        self._layers = {}
+
+    def __len__(self):
+        return sum(len(xy) for layer in self._layers.values() for xy in layer['xy'])
+
+    def _layer(self, zorder):
+        return self._layers.setdefault(zorder, {'xy': [], 'radii': [], 'face': [], 'edge': [], 'widths': []})
+
+    def add(self, x, y, radius, color, alpha=None, zorder=1, linewidth=None, edgecolor=None):
+        """添加一个圆心为 (x, y) 的节点"""
+        layer = self._layer(zorder)
+        layer['xy'].append([(x, y)])
+        layer['radii'].append([radius])
+        layer['face'].append([mcolors.to_rgba(color, alpha)])
+        layer['edge'].append([mcolors.to_rgba(color if edgecolor is None else edgecolor, alpha)])
+        layer['widths'].append([mpl.rcParams['patch.linewidth'] if linewidth is None else linewidth])
+
+    def add_many(self, xy, radii, color, alpha=None, zorder=1, linewidth=None, edgecolor=None):
+        """批量添加节点：xy 为 (n, 2) 数组，radii、linewidth 为标量或长度为 n 的数组，
+        color、edgecolor 为单个颜色或 n 个颜色；颜色只做一次 to_rgba_array 转换"""
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        n = len(xy)
+        face = mcolors.to_rgba_array(color, alpha)
+        edge = face if edgecolor is None else mcolors.to_rgba_array(edgecolor, alpha)
+        layer = self._layer(zorder)
+        layer['xy'].append(xy)
+        layer['radii'].append(np.broadcast_to(np.asarray(radii, dtype=float), n))
+        layer['face'].append(np.broadcast_to(face, (n, 4)))
+        layer['edge'].append(np.broadcast_to(edge, (n, 4)))
+        layer['widths'].append(np.broadcast_to(
+            np.asarray(mpl.rcParams['patch.linewidth'] if linewidth is None else linewidth, dtype=float), n))
+
+    def draw(self, ax):
+        """按 zorder 从低到高为每个图层生成一个集合，返回创建的艺术家列表"""
+        artists = []
+        for zorder in sorted(self._layers):
+            layer = {name: np.concatenate(parts) for name, parts in self._layers[zorder].items()}
+            diameters = 2 * layer['radii'].astype(float)
+            collection = EllipseCollection(diameters, diameters, np.zeros_like(diameters),
+                                           units='xy', offsets=layer['xy'].astype(float),
+                                           offset_transform=ax.transData,
+                                           facecolors=layer['face'], edgecolors=layer['edge'],
+                                           linewidths=layer['widths'], zorder=zorder,
+                                           # 与 Patch 的默认端点/连接样式一致
+                                           joinstyle='miter', capstyle='butt')
+            ax.add_collection(collection)
+            artists.append(collection)
+        return artists
+
+
+def draw_patches(ax, patches, zorder=None):
+    """把一组已配置好的 Patch（如 Wedge）合并为一个 PatchCollection，保留各自的样式"""
+    collection = PatchCollection(patches, match_original=True, joinstyle='miter', capstyle='butt')
+    collection.set_zorder(patches[0].get_zorder() if zorder is None else zorder)
+    ax.add_collection(collection)
+    return collection
+
+
+def _as_float(values):
+    """日期转换为 matplotlib 的日期数值，其余转换为浮点数"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return mdates.date2num(values)
+    return values.astype(float)
+
+
+def density_rgba(layers, bins, extent, max_alpha=0.9):
+    """把各图层的点分别分箱计数，按颜色和对数密度合成为一张 RGBA 图像（行序由下到上）
+
+    layers 为 [(x, y, 颜色), ...]，x、y 已是浮点数组；所有图层共用同一个计数上限，
+    后面的图层叠加在前面的图层之上。
+    """
+    x0, x1, y0, y1 = extent
+    counts = [np.histogram2d(y, x, bins=(bins[1], bins[0]), range=[[y0, y1], [x0, x1]])[0] for x, y, _ in layers]
+    scale = np.log1p(max((count.max() for count in counts), default=0)) or 1.0
+    rgb = np.zeros((bins[1], bins[0], 3))
+    alpha = np.zeros((bins[1], bins[0], 1))
+    for count, (_, _, color) in zip(counts, layers):
+        layer_alpha = (max_alpha * np.log1p(count) / scale)[..., None]
+        combined = layer_alpha + alpha * (1 - layer_alpha)
+        rgb = np.divide(np.array(mcolors.to_rgb(color)) * layer_alpha + rgb * alpha * (1 - layer_alpha), combined,
+                        out=np.zeros_like(rgb), where=combined > 0)
+        alpha = combined
+    return np.concatenate([rgb, alpha], axis=2)
+
+
+def draw_density(ax, layers, bins=DENSITY_BINS, layered=DENSITY_LAYERS, zorder=3,
+                 merged_color='#2c3e50', merged_label='全部产品'):
+    """把大量散点分箱为二维网格，整张图只画一个图像艺术家，代替逐点的 scatter
+
+    layers 为 [(x, y, 颜色, 图例标签), ...]，x 可以是日期。layered 为 False 时所有点合并为一层，
+    用 merged_color 着色。每个图层另加一个空散点作为图例项，图例样式与散点模式一致。
+    返回图像艺术家。
+    """
+    points = [(_as_float(x), _as_float(y), color, label) for x, y, color, label in layers]
+    if not layered:
+        points = [(np.concatenate([x for x, _, _, _ in points]), np.concatenate([y for _, y, _, _ in points]),
+                   merged_color, merged_label)]
+    points = [(x[np.isfinite(x) & np.isfinite(y)], y[np.isfinite(x) & np.isfinite(y)], color, label)
+              for x, y, color, label in points]
+    xs = np.concatenate([x for x, _, _, _ in points])
+    ys = np.concatenate([y for _, y, _, _ in points])
+    if len(xs):
+        extent = (xs.min(), xs.max() if xs.max() > xs.min() else xs.min() + 1,
+                  min(ys.min(), 0.0), ys.max() if ys.max() > min(ys.min(), 0.0) else 1.0)
+    else:
+        extent = (0.0, 1.0, 0.0, 1.0)
+
+    if any(np.issubdtype(np.asarray(x).dtype, np.datetime64) for x, _, _, _ in layers):
+        ax.xaxis_date()
+    image = ax.imshow(density_rgba([(x, y, color) for x, y, color, _ in points], bins, extent),
+                      extent=extent, origin='lower', aspect='auto', interpolation='nearest', zorder=zorder)
+    for _, _, color, label in points:
+        ax.scatter([], [], c=color, label=label, edgecolors='white')
+    return image
@@ -0,0 +1,144 @@
+"""声明式表结构解析：按列类型、缺失值标记解析文本表，分词后立即去除字段首尾空白，部分日期连同精度列一次解析完成"""
+import io
+import os
+
+import pandas as pd
+
+# 列类型：去除首尾空白的文本、数值、精度可到年/月/日的日期
+TEXT, FLOAT, PARTIAL_DATE = 'text', 'float', 'partial_date'
+
+# 默认的缺失值标记（去除空白后整字段匹配）
+NA_TOKENS = ('N/A', 'NA', '')
+
+# 部分日期按字段长度区分精度，补齐为该时段第一天的后缀
+DATE_PRECISIONS = {10: ('day', ''), 7: ('month', '-01'), 4: ('year', '-01-01')}
+
+# 部分日期列的精度列名后缀，如 Issuance_Date -> Issuance_Date_Precision
+PRECISION_SUFFIX = '_Precision'
+
+# 按块解析时每块的字节数：块在换行处切分，峰值内存与块大小成正比，而不是与整个文件成正比
+CHUNK_BYTES = 64 << 20
+
+
+def _tokenize_arrow(data, names, na_tokens):
+    """用 pyarrow 的 CSV 分词器把一块文本切成字符串列，每列随即去除空白并把缺失值标记换成缺失值"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(
+        pa.BufferReader(pa.py_buffer(data)),
+        read_options=pa_csv.ReadOptions(column_names=names, block_size=max(1 << 20, len(data) + 1)),
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in names},
+                                              null_values=[], strings_can_be_null=False))
+    columns = {}
+    for name in names:
+        values = pc.utf8_trim_whitespace(table.column(name))
+        missing = pc.is_in(values, value_set=pa.array(na_tokens, type=pa.string()))
+        columns[name] = pc.if_else(missing, pa.scalar(None, type=pa.string()), values)
+    return pa.table(columns).to_pandas()
+
+
+def _tokenize_pandas(data, names, na_tokens):
+    """没有 pyarrow 时用 pandas 的C解析器分词（字段开头的空白在分词时跳过），再去除结尾空白"""
+    raw = pd.read_csv(io.BytesIO(data), names=names, header=None, dtype=str, na_filter=False,
+                      skipinitialspace=True)
+    for name in names:
+        values = raw[name].str.strip()
+        raw[name] = values.mask(values.isin(na_tokens))
+    return raw
+
+
+class Schema:
+    """一张文本表的声明式结构：列名 -> 列类型（TEXT / FLOAT / PARTIAL_DATE），以及缺失值标记
+
+    不做类型推断也不静默丢弃：数值或日期字段无法按声明的类型解析时抛出 ValueError，指出列名和取值。
+    部分日期列解析为该时段第一天（'2025-04' -> 2025-04-01），另加一列记录精度 day / month / year。
+    """
+
+    def __init__(self, columns, na_tokens=NA_TOKENS):
+        self.columns = dict(columns)
+        self.na_tokens = list(na_tokens)
+
+    def _header(self, line):
+        names = [name.strip() for name in line.decode('utf-8-sig').rstrip('\r\n').split(',')]
+        if names != list(self.columns):
+            raise ValueError(f'表头与声明的结构不一致: {names} != {list(self.columns)}')
+        return names
+
+    def _convert(self, raw):
+        """把一块字符串列按声明的类型转换"""
+        df = {}
+        for name, kind in self.columns.items():
+            values = raw[name]
+            if kind == TEXT:
+                df[name] = values
+            elif kind == FLOAT:
+                try:
+                    df[name] = pd.to_numeric(values, errors='raise').astype(float)
+                except (ValueError, TypeError) as error:
+                    raise ValueError(f'{name} 列含无法解析为数值的取值: {error}') from error
+            elif kind == PARTIAL_DATE:
+                df[name], df[name + PRECISION_SUFFIX] = self._partial_dates(name, values)
+            else:
+                raise ValueError(f'未知列类型: {name}={kind}')
+        return pd.DataFrame(df, index=raw.index)
+
+    @staticmethod
+    def _partial_dates(name, values):
+        """按长度把 'YYYY' / 'YYYY-MM' / 'YYYY-MM-DD' 补齐为完整日期后一次按固定格式解析，返回 (日期, 精度)"""
+        lengths = values.str.len()
+        known = lengths.isin(list(DATE_PRECISIONS))
+        bad = values.notna() & ~known
+        if bad.any():
+            raise ValueError(f'{name} 列含无法识别精度的日期: {values[bad].unique()[:5].tolist()}')
+        precision = pd.Series(pd.NA, index=values.index, dtype='str')
+        complete = values.copy()
+        for length, (label, suffix) in DATE_PRECISIONS.items():
+            rows = lengths == length
+            precision[rows] = label
+            complete[rows] = values[rows] + suffix
+        try:
+            dates = pd.to_datetime(complete, format='%Y-%m-%d', errors='raise')
+        except ValueError as error:
+            raise ValueError(f'{name} 列含无法解析的日期: {error}') from error
+        return dates, precision
+
+    def iter_chunks(self, source, chunk_bytes=CHUNK_BYTES):
+        """逐块解析（source 为路径或二进制文件对象），每块产出一个已转换类型的 DataFrame"""
+        try:
+            import pyarrow.csv  # noqa: F401
+            tokenize = _tokenize_arrow
+        except ImportError:
+            tokenize = _tokenize_pandas
+        f = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+        try:
+            names = self._header(f.readline())
+            rows = 0
+            remainder = b''
+            while True:
+                block = f.read(chunk_bytes)
+                data = remainder + block
+                if not block:
+                    remainder = b''
+                else:
+                    # 块内只保留完整的行，最后一个换行之后的部分接到下一块前面；切片用 memoryview 避免复制
+                    cut = data.rfind(b'\n') + 1
+                    data, remainder = memoryview(data)[:cut], data[cut:]
+                if len(data):
+                    chunk = self._convert(tokenize(data, names, self.na_tokens))
+                    chunk.index = pd.RangeIndex(rows, rows + len(chunk))
+                    rows += len(chunk)
+                    yield chunk
+                if not block:
+                    break
+        finally:
+            if f is not source:
+                f.close()
+
+    def read(self, source, chunk_bytes=CHUNK_BYTES):
+        """解析整个文件，返回一个 DataFrame"""
+        chunks = list(self.iter_chunks(source, chunk_bytes))
+        if not chunks:
+            return self._convert(pd.DataFrame({name: pd.Series([], dtype='str') for name in self.columns}))
+        return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
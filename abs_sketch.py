@@ -0,0 +1,128 @@
+"""按分组的可合并分位数草图（t-digest）：所有分组的质心存于一组扁平数组，一次向量化压缩，可增量合并并持久化"""
+import numpy as np
+import pandas as pd
+
+# 压缩参数 δ：每个分组约保留 δ/2 个质心；δ 越大分位数越精确，状态也越大
+DIGEST_COMPRESSION = 200
+
+# 百分位表默认给出的百分位
+PERCENTILES = (50, 90, 99)
+
+# 持久化时每个草图写入 .npz 的数组
+DIGEST_ARRAYS = ['groups', 'means', 'weights', 'minimum', 'maximum']
+
+
+class GroupedDigest:
+    """每个分组一个 t-digest
+
+    groups/means/weights 为全部分组的质心（按分组、均值排序），groups 为质心所属分组在 levels 中的位置；
+    minimum/maximum 为每个分组的精确最小、最大值（没有数据的分组为 NaN），用于尾部插值。
+    """
+
+    def __init__(self, groups, means, weights, minimum, maximum, levels, compression=DIGEST_COMPRESSION):
+        self.groups = groups
+        self.means = means
+        self.weights = weights
+        self.minimum = minimum
+        self.maximum = maximum
+        self.levels = levels
+        self.compression = compression
+
+    @classmethod
+    def from_values(cls, codes, values, levels, compression=DIGEST_COMPRESSION):
+        """由逐行的分组编码和取值构建；编码为-1或取值缺失的行跳过"""
+        values = np.asarray(values, dtype=float)
+        keep = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[keep], values[keep]
+        minimum = np.full(len(levels), np.nan)
+        maximum = np.full(len(levels), np.nan)
+        np.fmin.at(minimum, codes, values)
+        np.fmax.at(maximum, codes, values)
+        return cls(codes, values, np.ones(len(values)), minimum, maximum, levels, compression)._compress()
+
+    def _compress(self):
+        """把每个分组内按 k1 尺度函数落在同一个单位区间的相邻质心合并为一个
+
+        k(q) = δ/(2π)·asin(2q−1) 在两端变化最快，尾部的质心因此很小，p99 这类分位数仍然精确。
+        所有分组排在一起一次排序、一次 bincount，不逐组循环。
+        """
+        order = np.lexsort((self.means, self.groups))
+        groups, means, weights = self.groups[order], self.means[order], self.weights[order]
+        if len(groups) == 0:
+            return self
+        totals = np.bincount(groups, weights=weights, minlength=len(self.levels))
+        # 每个质心左边缘在本组内的累计比例
+        before = np.cumsum(weights) - weights - (np.cumsum(totals) - totals)[groups]
+        q = np.clip(before / totals[groups], 0.0, 1.0)
+        bucket = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+
+        start = np.ones(len(groups), dtype=bool)
+        start[1:] = (groups[1:] != groups[:-1]) | (bucket[1:] != bucket[:-1])
+        ids = np.cumsum(start) - 1
+        merged = np.bincount(ids, weights=weights)
+        self.means = np.bincount(ids, weights=weights * means) / merged
+        self.weights = merged
+        self.groups = groups[start]
+        return self
+
+    def merge(self, other):
+        """合并两个草图（例如历史状态与新增行）：取值表取并集，重新编码后合并质心再压缩"""
+        mine, theirs = self.levels, other.levels
+        levels = mine if mine.equals(theirs) else mine.union(theirs)
+        minimum = np.full(len(levels), np.nan)
+        maximum = np.full(len(levels), np.nan)
+        groups = []
+        for digest, level in ((self, mine), (other, theirs)):
+            mapping = levels.get_indexer(level)
+            minimum[mapping] = np.fmin(minimum[mapping], digest.minimum)
+            maximum[mapping] = np.fmax(maximum[mapping], digest.maximum)
+            groups.append(mapping[digest.groups])
+        return GroupedDigest(np.concatenate(groups), np.concatenate([self.means, other.means]),
+                             np.concatenate([self.weights, other.weights]), minimum, maximum,
+                             levels, self.compression)._compress()
+
+    def overall(self):
+        """把全部分组合成一个分组（取值为 '全部'）"""
+        return GroupedDigest(np.zeros(len(self.means), dtype=np.int64), self.means, self.weights,
+                             np.array([np.nanmin(self.minimum, initial=np.inf)]),
+                             np.array([np.nanmax(self.maximum, initial=-np.inf)]),
+                             pd.Index(['全部']), self.compression)._compress()
+
+    def counts(self):
+        """每个分组的取值个数"""
+        return np.bincount(self.groups, weights=self.weights, minlength=len(self.levels))
+
+    def mean(self):
+        """全部取值的均值（质心合并不改变加权和，结果精确）"""
+        return float(np.sum(self.weights * self.means) / np.sum(self.weights))
+
+    def quantiles(self, percentiles=PERCENTILES):
+        """每个有数据的分组一行：count、mean 和各百分位（列名 p50、p90 ...），按取值表顺序
+
+        在质心中心（累计权重减半个质心）之间线性插值，两端用精确的最小、最大值；
+        质心都是单个取值时与 np.percentile(method='hazen') 一致。
+        """
+        counts = self.counts()
+        present = np.flatnonzero(counts)
+        ranks = np.asarray(percentiles, dtype=float) / 100
+        bounds = np.searchsorted(self.groups, present, side='left')
+        ends = np.searchsorted(self.groups, present, side='right')
+        rows = []
+        for code, begin, end in zip(present, bounds, ends):
+            means, weights = self.means[begin:end], self.weights[begin:end]
+            total = counts[code]
+            centers = np.cumsum(weights) - weights / 2
+            x = np.concatenate([[0.0], centers, [total]])
+            y = np.concatenate([[self.minimum[code]], means, [self.maximum[code]]])
+            rows.append([total, np.sum(weights * means) / total, *np.interp(ranks * total, x, y)])
+        columns = ['count', 'mean'] + [f'p{p:g}' for p in percentiles]
+        table = pd.DataFrame(rows, columns=columns, index=self.levels.take(present))
+        table['count'] = table['count'].astype(np.int64)
+        return table
+
+    def to_arrays(self):
+        return {name: getattr(self, name) for name in DIGEST_ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays, levels, compression=DIGEST_COMPRESSION):
+        return cls(*(arrays[name] for name in DIGEST_ARRAYS), levels, compression)
@@ -0,0 +1,116 @@
+"""按分组保留规模最大的k个项目：有界的每组 top-k，随追加行合并更新，Top-N 面板只读 O(k) 条记录"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# 每个分组保留的项目数，即 Top-N 面板可取的最大 N
+TOPK_SIZE = int(os.environ.get('ABS_TOPK_SIZE', 20))
+
+# 每条记录保存的字段（规模另存为数值数组）
+TOPK_COLUMNS = ['ABS', '状态', '资产类型', '承销商/管理人']
+
+# 持久化时每个 top-k 写入 .npz 的数组
+TOPK_ARRAYS = ['groups', 'rows', 'values']
+
+
+def _top_positions(groups, values, rows, k):
+    """每组按 (规模降序, 行号) 取前 k 条，返回所选位置，按 (分组, 规模降序, 行号) 排序
+
+    只用数值数组：先按分组做一次稳定排序，每组用 np.partition 求第 k 大的规模作阈值，
+    只保留不小于阈值的候选（与阈值相等的都保留，并列时按行号取舍），最后只对候选做一次 lexsort。
+    """
+    if len(groups) == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    counts = np.bincount(groups)
+    # 分组编码放得进 int16 时 NumPy 的稳定排序走基数排序
+    keys = groups.astype(np.int16) if len(counts) <= np.iinfo(np.int16).max else groups
+    order = np.argsort(keys, kind='stable')
+    ordered_values = values[order]
+    ends = np.cumsum(counts)
+    candidates = []
+    for start, end in zip(ends - counts, ends):
+        segment = ordered_values[start:end]
+        if len(segment) > k:
+            threshold = np.partition(segment, len(segment) - k)[len(segment) - k]
+            candidates.append(order[start:end][segment >= threshold])
+        else:
+            candidates.append(order[start:end])
+    candidates = np.concatenate(candidates)
+    candidates = candidates[np.lexsort((rows[candidates], -values[candidates], groups[candidates]))]
+    ranked = groups[candidates]
+    rank = np.arange(len(candidates)) - np.searchsorted(ranked, ranked, side='left')
+    return candidates[rank < k]
+
+
+class GroupedTopK:
+    """每个分组按规模从大到小保留前 k 条记录
+
+    groups/rows/values 为全部分组保留的记录（按分组、规模降序、行号排序），groups 为分组在 levels 中的位置，
+    rows 为记录在数据中的行号（规模相同时行号小的在前，与 df.nlargest 的 keep='first' 一致）；
+    records 为对应的 TOPK_COLUMNS 字段，seen 为已折叠进来的总行数。
+    每组的记录以有序数组而非堆保存；选取前 k 条只用分组、规模、行号三个数值数组，记录字段只取保留下来的行。
+    """
+
+    def __init__(self, groups, rows, values, records, levels, k=TOPK_SIZE, seen=0):
+        self.groups = groups
+        self.rows = rows
+        self.values = values
+        self.records = records
+        self.levels = levels
+        self.k = k
+        self.seen = seen
+
+    @classmethod
+    def from_frame(cls, codes, df, value_column, levels, k=TOPK_SIZE):
+        """由逐行的分组编码构建；编码为-1或规模缺失的行跳过"""
+        values = df[value_column].to_numpy(dtype=float)
+        keep = (codes >= 0) & ~np.isnan(values)
+        rows = np.flatnonzero(keep)
+        groups, values = codes[keep], values[keep]
+        top = _top_positions(groups, values, rows, k)
+        records = df.iloc[rows[top]][TOPK_COLUMNS].reset_index(drop=True)
+        return cls(groups[top], rows[top], values[top], records, levels, k, len(df))
+
+    def _trim(self):
+        """按 (分组, 规模降序, 行号) 排序后每组只保留前 k 条"""
+        order = _top_positions(self.groups, self.values, self.rows, self.k)
+        self.groups, self.rows, self.values = self.groups[order], self.rows[order], self.values[order]
+        self.records = self.records.take(order).reset_index(drop=True)
+        return self
+
+    def merge(self, other):
+        """把 other（在本状态之后追加的行）合并进来：取值表取并集，other 的行号排在已有行之后"""
+        mine, theirs = self.levels, other.levels
+        levels = mine if mine.equals(theirs) else mine.union(theirs)
+        groups = np.concatenate([levels.get_indexer(mine)[self.groups], levels.get_indexer(theirs)[other.groups]])
+        return GroupedTopK(groups, np.concatenate([self.rows, other.rows + self.seen]),
+                           np.concatenate([self.values, other.values]),
+                           pd.concat([self.records, other.records], ignore_index=True),
+                           levels, self.k, self.seen + other.seen)._trim()
+
+    def top(self, n, value_column, value=None):
+        """规模最大的 n 条记录；value 为 None 时取全部分组，否则只取该分组。n 不能超过 k"""
+        if n > self.k:
+            raise ValueError(f'只保留了每组前 {self.k} 条记录，无法取前 {n} 条；可调大 ABS_TOPK_SIZE')
+        if value is None:
+            mask = np.ones(len(self.groups), dtype=bool)
+        else:
+            mask = self.groups == (self.levels.get_loc(value) if value in self.levels else -1)
+        candidates = np.flatnonzero(mask)
+        candidates = candidates[np.lexsort((self.rows[candidates], -self.values[candidates]))][:n]
+        table = self.records.take(candidates).reset_index(drop=True)
+        table.insert(1, value_column, self.values[candidates])
+        return table
+
+    def to_arrays(self):
+        return {name: getattr(self, name) for name in TOPK_ARRAYS}
+
+    def dump_records(self):
+        """记录字段转成可写入JSON的形式（缺失值为 None）"""
+        return {name: [None if pd.isna(v) else v for v in self.records[name].tolist()] for name in TOPK_COLUMNS}
+
+    @classmethod
+    def from_arrays(cls, arrays, records, levels, k, seen):
+        return cls(*(arrays[name] for name in TOPK_ARRAYS), pd.DataFrame(records, columns=TOPK_COLUMNS),
+                   levels, k, seen)
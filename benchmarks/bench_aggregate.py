@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""对比仪表板原来的多次 groupby/crosstab 与单次分组聚合立方体的耗时"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abs_aggregate import build_cube
+from abs_classify import classify
+from abs_data import load_integrated
+
+
+def multi_pass(df):
+    """原仪表板中的逐表聚合实现，作为基准"""
+    scale = df['拟发行金额(亿元)']
+    pending_df = df[df['状态'] == '已申报']
+    month = df['申报日期'].dt.to_period('M')
+
+    asset_stats = df.groupby('资产类型').agg({'拟发行金额(亿元)': ['sum', 'count']}).round(2)
+    underwriter_stats = df.groupby('承销商/管理人').agg({'拟发行金额(亿元)': ['sum', 'count']}).round(2)
+    scale_range = pd.cut(scale, bins=[0, 10, 20, 30, 60], labels=['<10亿', '10-20亿', '20-30亿', '>30亿'],
+                         include_lowest=True)
+    specialization_matrix = pd.crosstab(df['承销商/管理人'], df['资产类型'], values=scale, aggfunc='sum').fillna(0)
+    top_underwriters = df.groupby('承销商/管理人')['拟发行金额(亿元)'].sum().nlargest(8).index
+    asset_performance = df.groupby('资产类型').agg({'拟发行金额(亿元)': ['sum', 'mean', 'count']}).round(2)
+    return {
+        'asset_stats': asset_stats,
+        'underwriter_stats': underwriter_stats,
+        'scale_dist': scale_range.value_counts().sort_index(),
+        'status_counts': df['状态'].value_counts(),
+        'status_green': pd.crosstab(df['状态'], df['绿色认证']),
+        'monthly_apps': df.groupby(month).size(),
+        'monthly_scale': scale.groupby(month).sum(),
+        'specialization_matrix': specialization_matrix.loc[top_underwriters],
+        'asset_performance': asset_performance,
+        'pipeline_by_type': pending_df.groupby('资产类型')['拟发行金额(亿元)'].sum(),
+    }
+
+
+def single_pass(df):
+    """一次分组得到立方体，再上卷出同样的表"""
+    cube = build_cube(df)
+    by_asset = cube.rollup('资产类型')
+    by_underwriter = cube.rollup('承销商/管理人')
+    by_month = cube.rollup('申报月份')
+    top_underwriters = by_underwriter['sum'].nlargest(8).index
+    return {
+        'asset_stats': by_asset[['sum', 'count']].round(2),
+        'underwriter_stats': by_underwriter[['sum', 'count']].round(2),
+        'scale_dist': cube.rollup('规模区间')['rows'].reindex(cube.levels['规模区间'], fill_value=0),
+        'status_counts': cube.value_counts('状态'),
+        'status_green': cube.crosstab('状态', '绿色认证'),
+        'monthly_apps': by_month['rows'],
+        'monthly_scale': by_month['sum'],
+        'specialization_matrix': cube.crosstab('承销商/管理人', '资产类型', 'sum').loc[top_underwriters],
+        'asset_performance': pd.DataFrame({'sum': by_asset['sum'], 'mean': by_asset['sum'] / by_asset['count'],
+                                           'count': by_asset['count']}).round(2),
+        'pipeline_by_type': cube.rollup('资产类型', {'状态': '已申报'})['sum'],
+    }
+
+
+def make_frame(n, seed=0):
+    """按样本数据的取值分布生成n行合成数据：承销商扩充到约200家，日期分布在5年内，约1%的规模缺失，约30%尚无反馈/获批日期"""
+    rng = np.random.default_rng(seed)
+    base = load_integrated()
+    underwriters = np.array([f'{name}{k}' for name in base['承销商/管理人'].unique() for k in range(20)], dtype=object)
+    scale = rng.gamma(2.0, 8.0, n).round(2)
+    scale[rng.random(n) < 0.01] = np.nan
+    days = rng.integers(0, 5 * 365, n)
+    applied = pd.Timestamp('2021-01-01') + pd.to_timedelta(days, unit='D')
+    # 约70%的项目已有反馈/获批日期，处理天数近似对数正态
+    approved = applied + pd.to_timedelta(rng.lognormal(3.5, 0.6, n).round(), unit='D')
+    df = pd.DataFrame({
+        'ABS': base['ABS'].to_numpy(dtype=object)[rng.integers(0, len(base), n)],
+        '承销商/管理人': underwriters[rng.integers(0, len(underwriters), n)],
+        '拟发行金额(亿元)': scale,
+        '申报日期': applied,
+        '反馈/获批日期': approved.where(rng.random(n) < 0.7),
+        '状态': np.where(rng.random(n) < 0.6, '已发行', '已申报'),
+    })
+    df['资产类型'], df['绿色认证'] = classify(df['ABS'])
+    return df
+
+
+def check_same(expected, actual):
+    """两种实现得到的表取值一致（浮点合计允许求和顺序带来的误差）"""
+    for name, table in expected.items():
+        left = np.asarray(table, dtype=float)
+        right = np.asarray(actual[name], dtype=float)
+        assert left.shape == right.shape, name
+        assert np.allclose(left, right, rtol=1e-9, atol=0.011), name
+        assert [str(v) for v in table.index] == [str(v) for v in actual[name].index], name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3, help='每种实现取最快一次')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'multi(s)':>10} {'single(s)':>10} {'speedup':>8} {'cells':>8}")
+    for n in args.rows:
+        df = make_frame(n)
+        timings = {}
+        for name, compute in (('multi', multi_pass), ('single', single_pass)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = compute(df)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = (best, result)
+
+        check_same(timings['multi'][1], timings['single'][1])
+        multi_time, single_time = timings['multi'][0], timings['single'][0]
+        print(f"{n:>10} {multi_time:>10.3f} {single_time:>10.3f} {multi_time / single_time:>7.1f}x "
+              f"{len(build_cube(df).measures['rows']):>8}")
+
+
+if __name__ == '__main__':
+    main()
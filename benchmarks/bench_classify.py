@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""对比逐行 apply 分类与向量化分类器的耗时"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# 各模块在导入时读取 ABS_CACHE_DIR：先指向临时目录，编译规则和已分类名称缓存都不写进工作目录
+os.environ['ABS_CACHE_DIR'] = tempfile.mkdtemp(prefix='abs_bench_')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import abs_data
+from abs_classify import RULES_CSV, KeywordMatcher, classify, compile_rules
+
+
+def extract_asset_type(name):
+    """原脚本中的逐行分类实现，作为基准"""
+    if '数据中心' in name:
+        return '数据中心'
+    elif '高速' in name:
+        return '高速公路'
+    elif '住房租赁' in name:
+        return '住房租赁'
+    elif '商业' in name:
+        return '商业地产'
+    elif '新能源' in name or '火电' in name:
+        return '能源设施'
+    elif '物流' in name:
+        return '物流仓储'
+    elif '产业园' in name:
+        return '产业园区'
+    elif '铁建' in name:
+        return '基础设施'
+    else:
+        return '其他'
+
+
+def is_green_project(name):
+    green_keywords = ['碳中和', '新能源', '绿色', '环保', '清洁']
+    return any(keyword in name for keyword in green_keywords)
+
+
+def make_names(n, unique, seed=0):
+    """基于样本产品名称生成n个合成名称；unique=False时名称大量重复"""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'integrated ABS.csv'))['ABS'].to_numpy(dtype=object)
+    picks = base[rng.integers(0, len(base), n)]
+    issues = np.arange(n) if unique else rng.integers(1, 200, n)
+    return pd.Series([f'{name}{k}期' for name, k in zip(picks, issues)], dtype=object)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    compiled = compile_rules(RULES_CSV)
+
+    print(f"{'rows':>10} {'names':>8} {'apply(s)':>10} {'vector(s)':>10} {'speedup':>8} {'warm(s)':>10}")
+    for n, unique in itertools.product(args.rows, [False, True]):
+        names = make_names(n, unique)
+
+        start = time.perf_counter()
+        expected_type = names.apply(extract_asset_type)
+        expected_green = names.apply(is_green_project)
+        apply_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asset_type, green = classify(names, KeywordMatcher(compiled))
+        vector_time = time.perf_counter() - start
+
+        # 强制启用已分类名称缓存：第一次调用写入缓存，第二次只做查表
+        cache_dir = os.path.join(abs_data.CACHE_DIR, f'{n}-{unique}')
+        classify(names, KeywordMatcher(compiled, cache_dir, memo=True))
+        start = time.perf_counter()
+        classify(names, KeywordMatcher(compiled, cache_dir, memo=True))
+        warm_time = time.perf_counter() - start
+
+        assert (asset_type == expected_type).all()
+        assert (green == expected_green).all()
+        print(f"{n:>10} {'unique' if unique else 'repeated':>8} {apply_time:>10.3f} {vector_time:>10.3f} {apply_time / vector_time:>7.1f}x {warm_time:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
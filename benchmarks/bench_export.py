@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""对比仪表板一次性保存PNG与分带流式导出的耗时和峰值内存（逐像素核对两者输出），
+以及逐格式分别渲染与一次排版导出PNG、矢量文件和缩略图金字塔的耗时"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from abs_export import THUMBNAIL_WIDTHS, VECTOR_FORMATS, WEBP_QUALITY, export_figure
+
+DASHBOARDS = {'final': 'final_polished_dashboard', 'streamlined': 'streamlined_abs_dashboard'}
+
+# 在独立子进程中渲染一次，只计量保存主PNG的耗时和常驻内存峰值(KB)。
+# 峰值取 /proc 中的 VmHWM：ru_maxrss 会跨 exec 继承父进程的峰值，不能用
+CHILD = '''
+import json, sys, time
+import matplotlib
+matplotlib.use('Agg')
+sys.path.insert(0, {root!r})
+from abs_classify import classify
+from abs_data import load_integrated
+from abs_export import save_banded_png
+from {module} import RC_PARAMS, render_dashboard
+def peak_rss():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+df = load_integrated()
+df['资产类型'], df['绿色认证'] = classify(df['ABS'])
+figure = render_dashboard(df, out=None)
+kwargs = dict(dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
+with matplotlib.rc_context(RC_PARAMS):
+    figure.canvas.draw()  # 预热字体缓存等，不计入
+    before = peak_rss()
+    start = time.perf_counter()
+    if {band_height!r} is None:
+        figure.savefig({out!r}, **kwargs)
+    else:
+        save_banded_png(figure, {out!r}, {band_height!r}, **kwargs)
+    seconds = time.perf_counter() - start
+print(json.dumps({{'before': before, 'peak': peak_rss(), 'seconds': seconds}}))
+'''
+
+
+def measure(module, out, band_height):
+    code = CHILD.format(root=ROOT, module=module, out=out, band_height=band_height)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONHASHSEED': '0'})
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def separate_renders(figure, out, **savefig_kwargs):
+    """原做法：每种尺寸和格式各调用一次 savefig，缩略图按目标宽度换算 dpi 重新渲染"""
+    figure.savefig(out, **savefig_kwargs)
+    width = Image.open(out).width
+    stem = os.path.splitext(out)[0]
+    for fmt in VECTOR_FORMATS:
+        figure.savefig(f'{stem}.{fmt}', format=fmt, **savefig_kwargs)
+    for target in THUMBNAIL_WIDTHS:
+        figure.savefig(f'{stem}_{target}w.png', **{**savefig_kwargs, 'dpi': savefig_kwargs['dpi'] * target / width})
+        Image.open(f'{stem}_{target}w.png').save(f'{stem}_{target}w.webp', quality=WEBP_QUALITY)
+
+
+def compare_pipeline(name, work_dir):
+    """同一进程内对比逐格式渲染与 export_figure 一次排版导出的耗时"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import importlib
+    from abs_classify import classify
+    from abs_data import load_integrated
+
+    module = importlib.import_module(DASHBOARDS[name])
+    df = load_integrated()
+    df['资产类型'], df['绿色认证'] = classify(df['ABS'])
+    figure = module.render_dashboard(df, out=None)
+    savefig_kwargs = dict(dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
+    with matplotlib.rc_context(module.RC_PARAMS):
+        start = time.perf_counter()
+        separate_renders(figure, os.path.join(work_dir, f'{name}-separate.png'), **savefig_kwargs)
+        separate = time.perf_counter() - start
+        start = time.perf_counter()
+        export_figure(figure, os.path.join(work_dir, f'{name}-pipeline.png'), vector_formats=VECTOR_FORMATS,
+                      thumbnail_widths=THUMBNAIL_WIDTHS, **savefig_kwargs)
+        pipeline = time.perf_counter() - start
+    print(f"{name:<12} {separate:>12.2f} {pipeline:>12.2f} {separate / pipeline:>7.1f}x")
+
+
+def differing_pixels(path_a, path_b, rows=512):
+    """逐块比较两张PNG，返回不同像素的个数和最大通道差"""
+    Image.MAX_IMAGE_PIXELS = None
+    a, b = np.asarray(Image.open(path_a)), np.asarray(Image.open(path_b))
+    assert a.shape == b.shape, (a.shape, b.shape)
+    count, worst = 0, 0
+    for top in range(0, len(a), rows):
+        diff = np.abs(a[top:top + rows].astype(np.int16) - b[top:top + rows])
+        count += int(diff.any(axis=2).sum())
+        worst = max(worst, int(diff.max()))
+    return count, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dashboards', nargs='+', default=list(DASHBOARDS), choices=list(DASHBOARDS))
+    parser.add_argument('--band-heights', type=int, nargs='+', default=[512, 1024, 2048], help='条带高度（像素行）')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='abs_bench_')
+    print(f"{'dashboard':<12} {'mode':<12} {'save(s)':>8} {'peak(MB)':>9} {'+save(MB)':>10} {'diff px':>8} {'max diff':>8}")
+    for name in args.dashboards:
+        module = DASHBOARDS[name]
+        reference = os.path.join(work_dir, f'{name}-savefig.png')
+        for band_height in [None] + args.band_heights:
+            out = reference if band_height is None else os.path.join(work_dir, f'{name}-band{band_height}.png')
+            stats = measure(module, out, band_height)
+            count, worst = (0, 0) if band_height is None else differing_pixels(reference, out)
+            mode = 'savefig' if band_height is None else f'band {band_height}'
+            print(f"{name:<12} {mode:<12} {stats['seconds']:>8.2f} {stats['peak'] / 1024:>9.0f} "
+                  f"{(stats['peak'] - stats['before']) / 1024:>10.0f} {count:>8} {worst:>8}")
+            assert worst <= 1, f'{name} {mode}: 分带导出与一次性保存差异过大'
+
+    print(f"\n{'dashboard':<12} {'separate(s)':>12} {'pipeline(s)':>12} {'speedup':>8}   "
+          f"(PNG + {'/'.join(VECTOR_FORMATS).upper()} + {len(THUMBNAIL_WIDTHS)} 级缩略图)")
+    for name in args.dashboards:
+        compare_pipeline(name, work_dir)
+
+
+if __name__ == '__main__':
+    main()
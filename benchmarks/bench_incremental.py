@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""对比追加少量新行后持久化聚合状态的增量刷新与整体重建的耗时"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# 各模块在导入时读取 ABS_CACHE_DIR：先指向临时目录，所有缓存（规则、快照、聚合）都不写进工作目录
+WORK_DIR = tempfile.mkdtemp(prefix='abs_bench_')
+os.environ['ABS_CACHE_DIR'] = os.path.join(WORK_DIR, 'cache')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import abs_aggregate
+from abs_aggregate import load_aggregates
+from abs_data import INTEGRATED_CSV
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_rows(n, start, seed):
+    """按样本CSV的取值生成n行合成数据（原始文本格式），序号从start开始"""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(os.path.join(ROOT, INTEGRATED_CSV), dtype=str)
+    underwriters = np.array([f'{name}{k}' for name in base['承销商/管理人'].unique() for k in range(20)], dtype=object)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    df['序号'] = np.arange(start, start + n)
+    df['承销商/管理人'] = underwriters[rng.integers(0, len(underwriters), n)]
+    df['拟发行金额(亿元)'] = rng.gamma(2.0, 8.0, n).round(2)
+    days = rng.integers(0, 5 * 365, n)
+    df['申报日期'] = (pd.Timestamp('2021-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000], help='历史行数')
+    parser.add_argument('--append', type=int, default=100, help='每次追加的行数')
+    args = parser.parse_args()
+
+    print(f"{'history':>10} {'append':>7} {'rebuild(s)':>11} {'refresh(s)':>11} {'speedup':>8}")
+    for n in args.rows:
+        path = os.path.join(WORK_DIR, f'integrated-{n}.csv')
+        make_rows(n, 1, seed=n).to_csv(path, index=False)
+        abs_aggregate.CACHE_DIR = os.path.join(WORK_DIR, f'cache-{n}')
+        load_aggregates(path)
+
+        make_rows(args.append, n + 1, seed=n + 1).to_csv(path, mode='a', header=False, index=False)
+        start = time.perf_counter()
+        refreshed = load_aggregates(path)
+        refresh_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rebuilt = load_aggregates(path, cache=False)
+        rebuild_time = time.perf_counter() - start
+
+        for by in ('承销商/管理人', '资产类型', '申报月份'):
+            expected, actual = rebuilt.rollup(by), refreshed.rollup(by)
+            assert expected.index.equals(actual.index), by
+            assert np.allclose(expected.to_numpy(float), actual.to_numpy(float)), by
+        for by in ('资产类型', '承销商/管理人'):
+            # 合并后的草图质心与重建的不同，分位数只近似一致；计数和均值必须一致
+            expected, actual = rebuilt.percentiles(by), refreshed.percentiles(by)
+            assert expected.index.equals(actual.index), by
+            assert np.allclose(expected[['count', 'mean']], actual[['count', 'mean']]), by
+        for where in (None, {'状态': '已发行'}, {'状态': '已申报'}):
+            k = rebuilt.tops['状态'].k
+            assert refreshed.top(k, where).equals(rebuilt.top(k, where)), where
+        print(f"{n:>10} {args.append:>7} {rebuild_time:>11.3f} {refresh_time:>11.3f} {rebuild_time / refresh_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
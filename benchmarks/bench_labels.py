@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""标签避让的耗时随标签数的变化：三层同心环上随机分布的径向标签"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abs_labels import place_ring_labels
+
+
+def make_labels(n, seed=0):
+    """n个标签随机分布在半径2.9/4.9/6.9的三个环上，尺寸与聚类网络图的产品标签相当"""
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(0, 2 * np.pi, n)
+    radii = rng.choice([2.9, 4.9, 6.9], n)
+    # 环越外标签越多，按周长缩放尺寸，使每个环的拥挤程度大致不随n变化
+    shrink = np.sqrt(100 / max(n, 100))
+    widths = rng.uniform(1.2, 2.2, n) * shrink
+    heights = rng.uniform(0.35, 0.6, n) * shrink
+    return angles, radii, widths, heights, rng.uniform(0, 50, n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--labels', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'labels':>8} {'time(s)':>9} {'us/label':>9} {'visible':>8} {'leader':>7} {'hidden':>7}")
+    for n in args.labels:
+        angles, radii, widths, heights, priority = make_labels(n)
+        start = time.perf_counter()
+        _, visible, leader = place_ring_labels(angles, radii, widths, heights, priority)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>8} {elapsed:>9.3f} {elapsed / n * 1e6:>9.1f} {visible.sum():>8} {leader.sum():>7} {(~visible).sum():>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""对比逐个 Circle 补丁与按图层批量的节点渲染耗时（阴影 + 节点两层）"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.patches import Circle
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abs_render import NodeBatch
+
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+
+
+def make_nodes(n, seed=0):
+    """在半径10的圆盘内随机生成n个节点的位置、半径和颜色"""
+    rng = np.random.default_rng(seed)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    radius = 10 * np.sqrt(rng.uniform(0, 1, n))
+    xy = np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
+    sizes = rng.uniform(0.05, 0.3, n)
+    colors = [COLORS[i] for i in rng.integers(0, len(COLORS), n)]
+    return xy, sizes, colors
+
+
+def render(draw_nodes, nodes, dpi):
+    """建图、绘制节点并保存到内存，返回 (绘制耗时, 保存耗时)"""
+    fig, ax = plt.subplots(figsize=(10, 10))
+    ax.set_xlim(-11, 11)
+    ax.set_ylim(-11, 11)
+    ax.set_aspect('equal')
+
+    start = time.perf_counter()
+    draw_nodes(ax, *nodes)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fig.savefig(io.BytesIO(), format='png', dpi=dpi)
+    save_time = time.perf_counter() - start
+    plt.close(fig)
+    return build_time, save_time
+
+
+def draw_patches(ax, xy, sizes, colors):
+    """原脚本的写法：每个节点两个 Circle"""
+    for (x, y), size, color in zip(xy, sizes, colors):
+        ax.add_patch(Circle((x + 0.03, y - 0.03), size, color='#000000', alpha=0.25, zorder=2))
+        ax.add_patch(Circle((x, y), size, color=color, alpha=0.95, zorder=3, linewidth=2))
+
+
+def draw_batched(ax, xy, sizes, colors):
+    """NodeBatch：每个图层一个 EllipseCollection"""
+    batch = NodeBatch()
+    batch.add_many(xy + [0.03, -0.03], sizes, color='#000000', alpha=0.25, zorder=2)
+    batch.add_many(xy, sizes, color=colors, alpha=0.95, zorder=3, linewidth=2)
+    batch.draw(ax)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'patch build':>12} {'patch save':>11} {'batch build':>12} {'batch save':>11} {'speedup':>8}")
+    for n in args.nodes:
+        nodes = make_nodes(n)
+        patch_build, patch_save = render(draw_patches, nodes, args.dpi)
+        batch_build, batch_save = render(draw_batched, nodes, args.dpi)
+        speedup = (patch_build + patch_save) / (batch_build + batch_save)
+        print(f"{n:>8} {patch_build:>12.3f} {patch_save:>11.3f} {batch_build:>12.3f} {batch_save:>11.3f} {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""处理天数分位数草图：与逐组精确百分位对比耗时和精度，并验证分批合并（审批陆续到达）与一次构建结果一致"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abs_aggregate import _encode
+from abs_sketch import PERCENTILES, GroupedDigest
+import synthetic
+
+# 估计值在各组经验分布中的排名误差上限（按分位比例计，另加插值本身带来的 1/组大小）
+MAX_RANK_ERROR = 0.01
+
+
+def processing_days(n, seed):
+    df = synthetic.make_integrated(n, seed)
+    applied = pd.to_datetime(df['申报日期'])
+    feedback = pd.to_datetime(df['反馈/获批日期'].str.partition('；')[0])
+    return df['承销商/管理人'], (feedback - applied).dt.days.to_numpy(dtype=float)
+
+
+def exact(groups, days):
+    """基准：逐组排序求精确百分位"""
+    return pd.Series(days).groupby(groups.to_numpy()).quantile(np.asarray(PERCENTILES) / 100).unstack()
+
+
+def rank_error(values, estimate, p):
+    """估计值在经验分布中对应的分位区间与目标分位 p 的距离"""
+    values = np.sort(values)
+    low = np.searchsorted(values, estimate, side='left') / len(values)
+    high = np.searchsorted(values, estimate, side='right') / len(values)
+    return max(low - p, p - high, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--batches', type=int, default=20, help='分批合并的批数')
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'groups':>7} {'exact(s)':>9} {'sketch(s)':>10} {'merged(s)':>10} "
+          f"{'centroids':>10} {'rank err':>13}")
+    for n in args.rows:
+        groups, days = processing_days(n, seed=n)
+        codes, levels = _encode(groups)
+
+        start = time.perf_counter()
+        expected = exact(groups, days)
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        digest = GroupedDigest.from_values(codes, days, levels)
+        table = digest.quantiles()
+        sketch_time = time.perf_counter() - start
+
+        # 分批到达：每批单独构建后合并进已有状态
+        start = time.perf_counter()
+        merged = None
+        for part in np.array_split(np.arange(n), args.batches):
+            batch_codes, batch_levels = _encode(groups.iloc[part])
+            batch = GroupedDigest.from_values(batch_codes, days[part], batch_levels)
+            merged = batch if merged is None else merged.merge(batch)
+        merged_table = merged.quantiles()
+        merge_time = time.perf_counter() - start
+
+        assert table.index.equals(expected.index) and merged_table.index.equals(expected.index)
+        assert np.array_equal(table['count'], merged_table['count'])
+        # 小分组的每个质心都是单个取值，结果精确；只抽查最大的20组
+        largest = table['count'].nlargest(20).index
+        by_group = pd.Series(days).groupby(groups.to_numpy())
+        worst = 0.0
+        for name in largest:
+            values = by_group.get_group(name).to_numpy()
+            for p in PERCENTILES:
+                for result in (table, merged_table):
+                    error = rank_error(values, result.at[name, f'p{p:g}'], p / 100) - 1 / len(values)
+                    worst = max(worst, error)
+        assert worst <= MAX_RANK_ERROR, worst
+        print(f"{n:>9} {len(levels):>7} {exact_time:>9.3f} {sketch_time:>10.3f} {merge_time:>10.3f} "
+              f"{len(digest.means):>10} {worst:>13.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""对比逐行判断关键词的地域划分与去重 + 多模式自动机 + 磁盘缓存的地域解析器的耗时
+
+逐行基准有两个：原 elegant_visualization.py 的实现（只认识6个地区），以及逐行依次检查全部名录关键词
+（覆盖全部省份时逐行方式的开销）。changed 为解析结果与原实现不同的已识别行数，例如“河南京东”
+原实现因含“南京”判为江苏，解析器取最靠前的地名判为河南。
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abs_region import DEFAULT_REGION, RegionResolver, load_gazetteer
+import synthetic
+
+# 发行人名录大小约为行数的 1/ISSUER_RATIO（同一发行人有多期产品）
+ISSUER_RATIO = 20
+
+
+def per_row(issuers):
+    """原 elegant_visualization.py 中的逐行实现"""
+    regions = []
+    for issuer in issuers:
+        if '北京' in str(issuer):
+            regions.append('北京')
+        elif '上海' in str(issuer):
+            regions.append('上海')
+        elif '广州' in str(issuer) or '广东' in str(issuer):
+            regions.append('广东')
+        elif '江苏' in str(issuer) or '无锡' in str(issuer) or '南通' in str(issuer) or '南京' in str(issuer):
+            regions.append('江苏')
+        elif '武汉' in str(issuer):
+            regions.append('湖北')
+        else:
+            regions.append('其他')
+    return regions
+
+
+def per_row_gazetteer(issuers, entries):
+    """逐行依次检查全部名录关键词，取第一个命中的"""
+    places = [(keyword, region) for keyword, region in entries if region]
+    regions = []
+    for issuer in issuers:
+        issuer = str(issuer)
+        regions.append(next((region for keyword, region in places if keyword in issuer), DEFAULT_REGION))
+    return regions
+
+
+def make_issuers(n, seed):
+    """合成发行人：约 n/ISSUER_RATIO 个发行人（合成数据的发行人名前随机加上名录中的地名），按 Zipf 权重分配到各行"""
+    rng = np.random.default_rng(seed)
+    count = max(50, n // ISSUER_RATIO)
+    places = np.array([keyword for keyword, region in load_gazetteer() if region] + [''] * 50, dtype=object)
+    names = places[rng.integers(0, len(places), count)] + synthetic.make_shanghai(count, seed)['Issuer'].to_numpy(object)
+    weights = 1.0 / np.arange(1, count + 1) ** synthetic.UNDERWRITER_ZIPF
+    return pd.Series(names[rng.choice(count, n, p=weights / weights.sum())])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    entries = load_gazetteer()
+    print(f"{'rows':>9} {'unique':>7} {'per-row(s)':>11} {'per-row all(s)':>15} {'cold(s)':>8} "
+          f"{'cached(s)':>10} {'regions':>8} {'changed':>8}")
+    for n in args.rows:
+        issuers = make_issuers(n, seed=n)
+
+        start = time.perf_counter()
+        expected = np.array(per_row(issuers), dtype=object)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        per_row_gazetteer(issuers, entries)
+        full_loop_time = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory(prefix='abs_region_') as cache_dir:
+            start = time.perf_counter()
+            regions = RegionResolver(entries, cache_dir).resolve(issuers)
+            cold_time = time.perf_counter() - start
+
+            # 新进程中的情形：重新编译名录，发行人结果从磁盘缓存读取
+            start = time.perf_counter()
+            cached = RegionResolver(entries, cache_dir).resolve(issuers)
+            cached_time = time.perf_counter() - start
+
+        assert cached.equals(regions)
+        known = expected != DEFAULT_REGION
+        changed = int((regions.to_numpy()[known] != expected[known]).sum())
+        print(f"{n:>9} {issuers.nunique():>7} {loop_time:>11.3f} {full_loop_time:>15.3f} {cold_time:>8.3f} "
+              f"{cached_time:>10.3f} {regions.nunique():>8} {changed:>8}")
+
+
+if __name__ == '__main__':
+    main()
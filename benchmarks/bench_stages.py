@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""用合成数据（10^3–10^6 行）逐个运行图表脚本，记录加载、分类、聚合、布局、连线、绘制、保存各阶段的耗时，
+结果写成JSON；给定基线JSON时逐项比较，标出变慢的阶段"""
+import argparse
+import ast
+import builtins
+import contextlib
+import functools
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 阶段 -> 计入该阶段的项目函数；脚本自身的其余时间（建图、创建图元、内联统计）计入 draw
+STAGES = {
+    'load': ['abs_data.load_integrated', 'abs_data.load_shanghai'],
+    'classify': ['abs_classify.classify'],
+    'cluster': ['abs_aggregate.build_cube', 'abs_aggregate.load_aggregates', 'abs_lod.select_lod'],
+    'layout': ['abs_layout.ring_layout', 'abs_layout.sector_layout', 'abs_layout.fan_layout',
+               'abs_labels.place_ring_labels'],
+    'edges': ['abs_render.EdgeBatch.add', 'abs_render.EdgeBatch.draw'],
+    'savefig': ['abs_export.export_figure'],
+}
+# 图表脚本中定义的函数 -> 阶段（运行前在语法树上给这些函数加计时装饰器，脚本本身不需要改动）
+SCRIPT_STAGES = {
+    'compute_aggregates': 'cluster',
+    'apply_lod': 'cluster',
+    'build_connection_edges': 'edges',
+}
+# import 为子进程导入项目模块（含 pandas/matplotlib）的时间
+STAGE_ORDER = ['import', 'load', 'classify', 'cluster', 'layout', 'edges', 'draw', 'savefig']
+
+# 变慢超过该比例的阶段在对比时标出（忽略不足 MIN_COMPARE_SECONDS 的阶段）
+REGRESSION_RATIO = 1.2
+MIN_COMPARE_SECONDS = 0.05
+
+DATA_FILES = {'integrated': 'integrated ABS.csv', 'shanghai': 'shanghai_real_estate_abs.csv'}
+
+
+class StageTimer:
+    """按调用栈记录各阶段的独占耗时：嵌套调用的时间只计入最内层的阶段"""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGE_ORDER, 0.0)
+        self.calls = dict.fromkeys(STAGE_ORDER, 0)
+        self.stack = []  # [阶段, 开始时间, 嵌套调用耗时]
+
+    def wrap(self, stage, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            self.stack.append([stage, time.perf_counter(), 0.0])
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _, start, nested = self.stack.pop()
+                elapsed = time.perf_counter() - start
+                self.totals[stage] += elapsed - nested
+                self.calls[stage] += 1
+                if self.stack:
+                    self.stack[-1][2] += elapsed
+        return timed
+
+    def decorator(self, stage):
+        return lambda func: self.wrap(stage, func)
+
+    def install(self):
+        """替换项目模块中的计时函数；以 from ... import 方式引用的同一对象一并替换"""
+        project = [module for module in list(sys.modules.values())
+                   if os.path.dirname(os.path.abspath(getattr(module, '__file__', None) or '/')) == ROOT]
+        for stage, targets in STAGES.items():
+            for target in targets:
+                module_name, _, attribute = target.partition('.')
+                owner = importlib.import_module(module_name)
+                if '.' in attribute:
+                    class_name, attribute = attribute.split('.')
+                    owner = getattr(owner, class_name)
+                    setattr(owner, attribute, self.wrap(stage, getattr(owner, attribute)))
+                    continue
+                original = getattr(owner, attribute)
+                wrapped = self.wrap(stage, original)
+                for module in project:
+                    for name, value in list(vars(module).items()):
+                        if value is original:
+                            setattr(module, name, wrapped)
+
+
+def _instrumented(path):
+    """编译图表脚本，给 SCRIPT_STAGES 中的顶层函数加上 __stage__ 计时装饰器"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in SCRIPT_STAGES:
+            node.decorator_list.insert(0, ast.Call(ast.Name('__stage__', ast.Load()),
+                                                   [ast.Constant(SCRIPT_STAGES[node.name])], []))
+    return compile(ast.fix_missing_locations(tree), path, 'exec')
+
+
+def _peak_rss_mb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+
+
+def run_child(script):
+    """子进程：在当前目录（合成数据所在目录）按 __main__ 方式运行一个图表脚本，最后一行输出各阶段耗时"""
+    start = time.perf_counter()
+    import matplotlib
+    matplotlib.use('Agg')
+    import build_charts  # noqa: F401  导入全部项目模块及 pandas/matplotlib
+    timer = StageTimer()
+    timer.totals['import'] = time.perf_counter() - start
+    timer.install()
+
+    path = os.path.join(ROOT, script)
+    code = _instrumented(path)
+    sys.argv = [path]
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        exec(code, {'__name__': '__main__', '__file__': path, '__builtins__': builtins,
+                    '__stage__': timer.decorator})
+    elapsed = time.perf_counter() - start
+    timer.totals['draw'] = elapsed - sum(timer.totals[stage] for stage in STAGES)
+    print(json.dumps({'stages': timer.totals, 'calls': timer.calls,
+                      'total': elapsed + timer.totals['import'], 'peak_mb': _peak_rss_mb()}))
+
+
+def run_chart(name, rows, data_dir, timeout):
+    """在独立子进程（独立的缓存目录）中运行一个图表，返回结果记录"""
+    from build_charts import TASKS
+    record = {'chart': name, 'rows': rows}
+    with tempfile.TemporaryDirectory(prefix='abs_stage_') as work_dir:
+        for filename in DATA_FILES.values():
+            os.symlink(os.path.join(data_dir, filename), os.path.join(work_dir, filename))
+        env = {**os.environ, 'ABS_CACHE_DIR': os.path.join(work_dir, '.abs_cache'), 'PYTHONHASHSEED': '0'}
+        try:
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', TASKS[name][0]],
+                                    cwd=work_dir, env=env, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {**record, 'status': 'timeout'}
+    if result.returncode != 0:
+        return {**record, 'status': 'error', 'error': result.stderr.strip().splitlines()[-1:]}
+    return {**record, 'status': 'ok', **json.loads(result.stdout.strip().splitlines()[-1])}
+
+
+def metadata():
+    import matplotlib
+    import numpy as np
+    import pandas as pd
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit or None,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'matplotlib': matplotlib.__version__}
+
+
+def print_record(record):
+    if record['status'] != 'ok':
+        print(f"{record['chart']:<12} {record['rows']:>8}  {record['status']} {' '.join(record.get('error', []))}")
+        return
+    stages = ' '.join(f"{record['stages'][stage]:>8.2f}" for stage in STAGE_ORDER)
+    print(f"{record['chart']:<12} {record['rows']:>8} {stages} {record['total']:>8.2f} {record['peak_mb']:>8.0f}")
+
+
+def compare(results, baseline_path):
+    """与基线逐阶段比较，返回变慢的 (图表, 行数, 阶段, 基线秒数, 本次秒数) 列表"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['chart'], r['rows']): r for r in json.load(f)['results'] if r['status'] == 'ok'}
+    regressions = []
+    for record in results:
+        before = baseline.get((record['chart'], record['rows']))
+        if record['status'] != 'ok' or before is None:
+            continue
+        for stage in STAGE_ORDER + ['total']:
+            old = before['total'] if stage == 'total' else before['stages'].get(stage, 0.0)
+            new = record['total'] if stage == 'total' else record['stages'][stage]
+            if max(old, new) >= MIN_COMPARE_SECONDS and new > old * REGRESSION_RATIO:
+                regressions.append((record['chart'], record['rows'], stage, old, new))
+    return regressions
+
+
+def main():
+    from build_charts import TASKS
+    import synthetic
+
+    charts = [name for name, task in TASKS.items() if task[1]]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--charts', nargs='+', default=charts, choices=charts)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000], help='合成数据行数')
+    parser.add_argument('--timeout', type=float, default=600, help='单个图表的超时(秒)；超时后跳过该图表更大的行数')
+    parser.add_argument('--output', default=None, help='结果JSON路径（默认 benchmarks/results/stages-时间.json）')
+    parser.add_argument('--baseline', default=None, help='与该基线JSON比较，列出变慢的阶段')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"stages-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    report = {'meta': metadata(), 'results': []}
+    skipped = set()
+    print(f"{'chart':<12} {'rows':>8} " + ' '.join(f'{stage:>8}' for stage in STAGE_ORDER) + f" {'total':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory(prefix='abs_synth_') as data_root:
+        for rows in sorted(args.rows):
+            data_dir = os.path.join(data_root, str(rows))
+            os.makedirs(data_dir)
+            synthetic.write_integrated(os.path.join(data_dir, DATA_FILES['integrated']), rows, args.seed)
+            synthetic.write_shanghai(os.path.join(data_dir, DATA_FILES['shanghai']), rows, args.seed)
+            for name in args.charts:
+                if name in skipped:
+                    record = {'chart': name, 'rows': rows, 'status': 'skipped'}
+                else:
+                    record = run_chart(name, rows, data_dir, args.timeout)
+                    if record['status'] == 'timeout':
+                        skipped.add(name)
+                report['results'].append(record)
+                print_record(record)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f'结果已写入 {output}')
+
+    if args.baseline:
+        regressions = compare(report['results'], args.baseline)
+        for chart, rows, stage, old, new in regressions:
+            print(f'⚠️ {chart} {rows}行 {stage}: {old:.2f}s -> {new:.2f}s ({new / old if old else float("inf"):.1f}x)')
+        if not regressions:
+            print(f'与基线相比没有超过 {REGRESSION_RATIO:.1f}x 的变慢')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        run_child(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,147 @@
+"""合成数据生成器：按样本CSV的格式生成任意行数的 integrated ABS.csv 和 shanghai_real_estate_abs.csv"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from abs_classify import RULES_CSV, compile_rules
+
+# 产品名称的组成部分，取自样本数据
+MANAGERS = ['中信证券', '中金公司', '华泰资管', '国金资管', '平安证券', '人保资产', '泰康资产', '太平洋资产',
+            '华泰', '兴业', '开源', '平安', '国泰君安', '招商证券', '中信建投', '广发证券']
+SPONSORS = ['万国数据', '世纪互联', '越秀', '凯德', '中国铁建', '东百集团', '新疆国信', '远景', '中交路建',
+            '观博啟城', '中铁诺德', '基汇资本', '建信', '广明', '九永', '安江', '欢乐颂', '华润', '招商蛇口', '京东']
+# 不含任何资产关键词的标的，分类为默认类别
+PLAIN_ASSETS = ['', '一期', '城市更新', '综合体']
+GREEN_SUFFIXES = ['(碳中和)', '（绿色）', '（清洁能源）', '（环保）']
+
+STATUS_WEIGHTS = {'已发行': 0.55, '已申报': 0.45}
+PENDING_STAGES = {'已受理': 0.3, '已反馈': 0.55, '已问询': 0.15}
+
+# 申报日期范围
+DATE_START, DATE_END = pd.Timestamp('2021-01-01'), pd.Timestamp('2025-06-30')
+
+# 承销商规模服从 Zipf 分布：少数承销商占大部分项目
+UNDERWRITER_ZIPF = 1.1
+
+
+def _pick(rng, values, n, weights=None):
+    values = np.asarray(values, dtype=object)
+    return values[rng.choice(len(values), n, p=weights)]
+
+
+def asset_phrases():
+    """每条资产关键词规则对应的名称片段，保证每个关键词都会出现；另加不命中任何关键词的片段"""
+    compiled = compile_rules(RULES_CSV)
+    return [keyword for keyword, _ in compiled['table']] + PLAIN_ASSETS
+
+
+def underwriters(n_rows):
+    """承销商名录及其按排名的 Zipf 权重；名录随行数增长（约为行数的平方根）"""
+    count = max(len(MANAGERS), int(np.sqrt(n_rows)))
+    names = [MANAGERS[i % len(MANAGERS)] + (str(i // len(MANAGERS)) if i >= len(MANAGERS) else '')
+             for i in range(count)]
+    weights = 1.0 / np.arange(1, count + 1) ** UNDERWRITER_ZIPF
+    return names, weights / weights.sum()
+
+
+def make_integrated(n, seed=0):
+    """生成n行 integrated ABS.csv 格式的数据（原始文本格式，可直接 to_csv）"""
+    rng = np.random.default_rng(seed)
+    phrases = asset_phrases()
+    green = rng.random(n) < 0.15
+    names = pd.Series(_pick(rng, MANAGERS, n)) + '-' + _pick(rng, SPONSORS, n) + \
+        pd.Series(rng.integers(2021, 2026, n)).astype(str) + '年第' + pd.Series(rng.integers(1, 6, n)).astype(str) + \
+        '期' + _pick(rng, phrases, n) + '持有型不动产资产支持专项计划' + \
+        np.where(green, _pick(rng, GREEN_SUFFIXES, n), '')
+
+    underwriter_names, weights = underwriters(n)
+    status = _pick(rng, list(STATUS_WEIGHTS), n, list(STATUS_WEIGHTS.values()))
+    issued = status == '已发行'
+    stage = np.where(issued, '通过', _pick(rng, list(PENDING_STAGES), n, list(PENDING_STAGES.values())))
+
+    span = (DATE_END - DATE_START).days
+    applied = DATE_START + pd.to_timedelta(rng.integers(0, span, n), unit='D')
+    # 已发行项目的审批周期更长
+    waited = np.where(issued, rng.gamma(3.0, 40.0, n), rng.gamma(1.5, 20.0, n)).astype(int) + 1
+    feedback = (applied + pd.to_timedelta(waited, unit='D')).strftime('%Y-%m-%d')
+    # 少数项目有两次反馈日期，以中文分号分隔
+    second = (applied + pd.to_timedelta(waited + rng.integers(30, 160, n), unit='D')).strftime('%Y-%m-%d')
+    feedback = np.where(rng.random(n) < 0.05, feedback + '；' + second, feedback)
+
+    return pd.DataFrame({
+        '序号': np.arange(1, n + 1),
+        'ABS': names,
+        '承销商/管理人': _pick(rng, underwriter_names, n, weights),
+        '拟发行金额(亿元)': rng.lognormal(2.5, 0.7, n).round(2),
+        '项目状态': stage,
+        '申报日期': applied.strftime('%Y-%m-%d'),
+        '反馈/获批日期': feedback,
+        '状态': status,
+    })
+
+
+def write_integrated(path, n, seed=0):
+    make_integrated(n, seed).to_csv(path, index=False)
+
+
+SHANGHAI_COLUMNS = ['Product_Name', 'Issuer', 'Exchange', 'Issuance_Date', 'Scale_Billion_Yuan',
+                    'Underlying_Asset_Type', 'Asset_Category', 'Status', 'Third_Party_Certification',
+                    'Lead_Underwriter', 'Special_Features', 'Credit_Rating']
+SHANGHAI_ASSETS = ['数据中心资产', '住房租赁资产', '基础设施不动产', '地铁收费权', '公交经营收费权', '商业物业', '产业园区']
+CERTIFICATIONS = ['绿色认证', '可持续挂钩认证', '北京中财绿融', '中节能咨询', '联合赤道', '东方金诚']
+SHANGHAI_UNDERWRITERS = ['中信证券', '华泰证券', '兴业证券', '开源证券', '平安证券', '中山证券', '中投证券']
+SPECIAL_FEATURES = ['全国首单', '绿色轨道交通', '绿色基础设施', '公共交通绿色项目', '住房租赁领域', 'N/A']
+NA = 'N/A'
+
+
+def make_shanghai(n, seed=0):
+    """生成n行 shanghai_real_estate_abs.csv 格式的数据（全部为文本，含 N/A 和只到年或月的日期）"""
+    rng = np.random.default_rng(seed)
+    issuers = _pick(rng, SPONSORS, n) + pd.Series(rng.integers(0, max(1, n // 50), n)).astype(str).to_numpy(object)
+    assets = _pick(rng, SHANGHAI_ASSETS, n)
+    green = rng.random(n) < 0.4
+    dates = DATE_START - pd.Timedelta(days=5 * 365) + pd.to_timedelta(rng.integers(0, 10 * 365, n), unit='D')
+    # 日期精度：约10%只到年，20%只到月
+    precision = rng.random(n)
+    issuance = np.where(precision < 0.1, dates.strftime('%Y'),
+                        np.where(precision < 0.3, dates.strftime('%Y-%m'), dates.strftime('%Y-%m-%d')))
+    scale = rng.lognormal(2.5, 0.8, n).round(3).astype(str).astype(object)
+    scale[rng.random(n) < 0.3] = NA
+    return pd.DataFrame({
+        'Product_Name': pd.Series(issuers) + assets +
+        np.where(green, '绿色资产支持专项计划', '持有型不动产资产支持专项计划'),
+        'Issuer': issuers,
+        'Exchange': 'Shanghai Stock Exchange',
+        'Issuance_Date': issuance,
+        'Scale_Billion_Yuan': scale,
+        'Underlying_Asset_Type': assets,
+        'Asset_Category': np.where(green, '绿色ABS', '持有型不动产ABS'),
+        'Status': _pick(rng, ['已发行', '已上市', '在审'], n, [0.5, 0.35, 0.15]),
+        'Third_Party_Certification': np.where(green, _pick(rng, CERTIFICATIONS, n), NA),
+        'Lead_Underwriter': np.where(rng.random(n) < 0.2, NA, _pick(rng, SHANGHAI_UNDERWRITERS, n)),
+        'Special_Features': _pick(rng, SPECIAL_FEATURES, n),
+        'Credit_Rating': NA,
+    }, columns=SHANGHAI_COLUMNS)
+
+
+def format_padded(df, widths):
+    """按样本文件的排版输出文本行：字段以 ', ' 分隔，每个字段用空格补齐到该列宽度"""
+    columns = [df[name].astype(str).str.pad(width, side='right') for name, width in zip(df.columns, widths)]
+    lines = columns[0]
+    for column in columns[1:]:
+        lines = lines + ', ' + column
+    return lines
+
+
+def write_shanghai(path, n, seed=0):
+    """按样本文件的补齐格式写出n行合成数据"""
+    df = make_shanghai(n, seed)
+    widths = [max(len(name), 24) for name in df.columns]
+    header = ', '.join(name.ljust(width) for name, width in zip(df.columns, widths))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(header + '\n')
+        f.write('\n'.join(format_padded(df, widths)) + '\n')
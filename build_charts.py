@@ -0,0 +1,218 @@
+"""一次构建全部图表：数据只解析一次，各图表脚本在进程池中并行渲染（Agg后端），并输出每张图的耗时"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import matplotlib
+matplotlib.use('Agg')
+# 以下模块在主进程中预先导入，fork 出的工作进程直接继承，不必各自重新导入
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import abs_aggregate
+import abs_classify
+import abs_data
+import abs_export
+import abs_fonts
+import abs_labels
+import abs_layout
+import abs_lod
+import abs_region
+import abs_render
+from abs_output_cache import OutputCache, code_digest, column_digest, render_key, theme_values
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def prepare_integrated():
+    """解析并缓存 integrated ABS.csv 的快照、编译分类规则、刷新持久化聚合状态"""
+    df = abs_data.load_integrated()
+    abs_classify.classify(df['ABS'])
+    abs_aggregate.load_aggregates()
+
+
+def prepare_shanghai():
+    """解析并缓存 shanghai_real_estate_abs.csv 的快照、刷新发行人地域缓存"""
+    df = abs_data.load_shanghai()
+    abs_region.resolve_regions(df['Issuer'])
+
+
+# 任务名 -> (数据准备函数或图表脚本, 输出文件, 依赖的任务)；数据任务完成后图表任务只读取缓存的快照
+TASKS = {
+    'integrated': (prepare_integrated, None, []),
+    'shanghai': (prepare_shanghai, None, []),
+    'streamlined': ('streamlined_abs_dashboard.py', 'Streamlined_ABS_Market_Dashboard.png', ['integrated']),
+    'final': ('final_polished_dashboard.py', 'Final_Polished_ABS_Dashboard.png', ['integrated']),
+    'clustered': ('clustered_network_visualization.py', 'ABS_Clustered_Network.png', ['integrated']),
+    'circular': ('circular_network_visualization.py', 'ABS_Circular_Network.png', ['integrated']),
+    'updated': ('updated_network_visualization.py', 'Updated_ABS_Network_Visualization.png', ['integrated']),
+    'elegant': ('elegant_visualization.py', 'ABS_Elegant_Dashboard.png', ['shanghai']),
+}
+
+INTEGRATED_COLUMNS = ['ABS', '承销商/管理人', '拟发行金额(亿元)', '状态']
+
+# 每个图表声明自己的渲染输入：读取的数据集和列、脚本中的主题变量、传给脚本的命令行参数。
+# 这些输入连同脚本及其导入模块的源码一起决定缓存键；分类结果由 ABS 列和规则文件决定，地域由 Issuer 列和省市名录决定
+RENDER_INPUTS = {
+    'streamlined': {'dataset': 'integrated', 'columns': INTEGRATED_COLUMNS + ['申报日期'],
+                    'themes': ['STYLE', 'RC_PARAMS', 'COLORS', 'PALETTE_MAIN', 'PALETTE_STATUS', 'PALETTE_GREEN'],
+                    'argv': []},
+    'final': {'dataset': 'integrated', 'columns': INTEGRATED_COLUMNS + ['申报日期', '反馈/获批日期'],
+              'themes': ['RC_PARAMS', 'colors_main', 'colors_status', 'colors_green'], 'argv': []},
+    'clustered': {'dataset': 'integrated', 'columns': INTEGRATED_COLUMNS, 'themes': ['CLUSTER_COLORS'], 'argv': []},
+    'circular': {'dataset': 'integrated', 'columns': INTEGRATED_COLUMNS,
+                 'themes': ['CIRCLE_THEME', 'MAX_PRODUCT_NODES'], 'argv': []},
+    'updated': {'dataset': 'integrated', 'columns': INTEGRATED_COLUMNS,
+                'themes': ['colors_underwriter', 'colors_asset'], 'argv': []},
+    'elegant': {'dataset': 'shanghai',
+                'columns': ['Scale_Billion_Yuan', 'Issuance_Date', 'Issuer', 'Asset_Category',
+                            'Lead_Underwriter', 'Third_Party_Certification'],
+                'themes': ['ELEGANT_THEME'], 'argv': []},
+}
+
+DATASETS = {'integrated': abs_data.load_integrated, 'shanghai': abs_data.load_shanghai}
+
+
+def chart_key(name):
+    """按图表声明的渲染输入计算输出缓存键"""
+    script = os.path.join(ROOT, TASKS[name][0])
+    inputs = RENDER_INPUTS[name]
+    df = DATASETS[inputs['dataset']]()
+    return render_key(
+        chart=name,
+        code=code_digest(script),
+        data=column_digest(df, inputs['columns']),
+        rules=abs_data.file_digest(abs_classify.RULES_CSV if inputs['dataset'] == 'integrated'
+                                   else abs_region.GAZETTEER_CSV),
+        themes=theme_values(script, inputs['themes']),
+        argv=inputs['argv'],
+        matplotlib=matplotlib.__version__,
+        fonts=abs_fonts.font_key(),
+        # 环境变量覆盖的渲染参数：时间线在散点与密度图之间切换、密度图是否分层
+        env={'density_threshold': abs_render.DENSITY_THRESHOLD, 'density_layers': abs_render.DENSITY_LAYERS},
+    )
+
+
+def run_task(name, cache=None):
+    """在工作进程中执行一个任务，返回 (任务名, 开始时间, 结束时间, 进程号, 是否命中缓存, 捕获的输出)
+
+    图表脚本按 __main__ 方式执行，与单独运行脚本的结果一致；
+    每个任务在独立的 rc_context 中运行，脚本对 rcParams 的修改不会影响同一进程中的下一个任务。
+    给定 cache 时先按渲染输入查找输出缓存，命中则直接复制图片（--extras 时含矢量文件和缩略图），不再渲染。
+    """
+    target, output_png = TASKS[name][:2]
+    output = io.StringIO()
+    start = time.time()
+    key = chart_key(name) if cache and name in RENDER_INPUTS else None
+    if key and cache.fetch(key, abs_export.export_paths(output_png)):
+        return name, start, time.time(), os.getpid(), True, ''
+
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output), \
+            matplotlib.rc_context(), warnings.catch_warnings():
+        if callable(target):
+            target()
+        else:
+            path = os.path.join(ROOT, target)
+            saved_argv = sys.argv
+            sys.argv = [path] + RENDER_INPUTS.get(name, {}).get('argv', [])
+            try:
+                runpy.run_path(path, run_name='__main__')
+            finally:
+                sys.argv = saved_argv
+                plt.close('all')
+    if key and os.path.exists(output_png) and os.path.getmtime(output_png) >= start - 1:
+        cache.store(key, abs_export.export_paths(output_png))
+    return name, start, time.time(), os.getpid(), False, output.getvalue()
+
+
+def resolve(names):
+    """展开所选任务的全部依赖，按 TASKS 中的顺序返回"""
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in TASKS:
+            raise ValueError(f'未知任务: {name}')
+        if name not in selected:
+            selected.add(name)
+            pending.extend(TASKS[name][2])
+    return [name for name in TASKS if name in selected]
+
+
+def build(names=None, jobs=None, cache=None):
+    """按依赖关系把任务提交到进程池：依赖全部完成的任务立即提交，返回每个任务的计时结果"""
+    names = resolve(names or [name for name, task in TASKS.items() if task[1]])
+    jobs = jobs or os.cpu_count() or 1
+    # fork 启动的工作进程直接继承本进程已导入的 pandas/matplotlib 和项目模块
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+    done, results, running = set(), {}, {}
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        while len(done) < len(names):
+            for name in names:
+                if name not in done and name not in running.values() and all(d in done for d in TASKS[name][2]):
+                    running[pool.submit(run_task, name, cache)] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                results[name] = future.result()
+                done.add(name)
+    return [results[name] for name in names]
+
+
+def format_report(results, start, wall, verbose=False):
+    """把 build() 的计时结果排成表格文本；verbose 时附上各图表脚本自身的打印内容"""
+    lines = [f"{'task':<12} {'output':<40} {'start(s)':>9} {'time(s)':>8} {'pid':>7}  status"]
+    for name, task_start, task_end, pid, cached, output in results:
+        # 图表脚本自己捕获异常只打印错误，因此以输出文件是否在本次构建中更新来判断成败
+        target = TASKS[name][1]
+        ok = target is None or (os.path.exists(target) and os.path.getmtime(target) >= task_start - 1)
+        lines.append(f"{name:<12} {target or '-':<40} {task_start - start:>9.2f} {task_end - task_start:>8.2f} {pid:>7}  "
+                     f"{'♻️ cached' if cached else '✅' if ok else '❌'}")
+        if verbose and output:
+            lines.append(output.rstrip())
+    serial = sum(end - begin for _, begin, end, _, _, _ in results)
+    lines.append(f"⏱️ 总耗时 {wall:.2f}s（各任务耗时合计 {serial:.2f}s）")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('charts', nargs='*', help=f"只构建这些图表（默认全部）：{', '.join(n for n, t in TASKS.items() if t[1])}")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='工作进程数（默认CPU核数）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出各图表脚本自身的打印内容')
+    parser.add_argument('--no-cache', action='store_true', help='忽略输出缓存，全部重新渲染')
+    parser.add_argument('--cache-size', type=int, default=None, help='输出缓存总大小上限(MB)')
+    parser.add_argument('--band-height', type=int, default=None,
+                        help='仪表板按该像素行数分带渲染并流式写入PNG，限制工作进程的峰值内存（像素不变）')
+    parser.add_argument('--extras', action='store_true',
+                        help=f'同时导出矢量格式和缩略图金字塔到 {abs_export.EXPORT_DIR}/（也可用环境变量 ABS_EXPORT_EXTRAS=1）')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    if args.band_height:
+        # 工作进程由 fork 启动，图表脚本导入的是已设置好的 abs_export 模块
+        abs_export.EXPORT_BAND_HEIGHT = args.band_height
+    if args.extras:
+        abs_export.EXPORT_EXTRAS = True
+    cache = None
+    if not args.no_cache:
+        cache = OutputCache() if args.cache_size is None else OutputCache(max_bytes=args.cache_size << 20)
+    start = time.time()
+    results = build(args.charts, args.jobs, cache)
+    wall = time.time() - start
+
+    print(format_report(results, start, wall, args.verbose))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,11 +6,17 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import FancyBboxPatch
 import warnings
+from abs_data import load_integrated
+from abs_classify import classify
+from abs_export import export_figure
+from abs_fonts import font_rc
+from abs_layout import fan_layout, ring_layout
+from abs_lod import select_lod
+from abs_render import EdgeBatch, NodeBatch
 warnings.filterwarnings('ignore')
 
 # 设置中文字体
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+plt.rcParams.update(font_rc(['Arial Unicode MS', 'SimHei', 'DejaVu Sans']))
 
 # 优雅配色方案
 CIRCLE_THEME = {
@@ -23,44 +29,18 @@ CIRCLE_THEME = {
     'text_color': '#374151',             # 深灰色 - 文字
 }
 
-def create_circular_network():
+# 产品节点预算：超出时规模较小的产品按子类别合并为汇总节点
+MAX_PRODUCT_NODES = 60
+
+def create_circular_network(max_product_nodes=MAX_PRODUCT_NODES):
     """创建圆形网络关系图"""
     print("🌐 创建圆形网络关系图...")
     
-    # 读取新数据
-    df = pd.read_csv('integrated ABS.csv')
-    
-    # 数据预处理
-    df['申报日期'] = pd.to_datetime(df['申报日期'])
-    df['拟发行金额(亿元)'] = pd.to_numeric(df['拟发行金额(亿元)'])
-    
-    # 提取资产类型和绿色认证
-    def extract_asset_type(name):
-        if '数据中心' in name:
-            return '数据中心'
-        elif '高速' in name:
-            return '高速公路'
-        elif '住房租赁' in name:
-            return '住房租赁'
-        elif '商业' in name:
-            return '商业地产'
-        elif '新能源' in name or '火电' in name:
-            return '能源设施'
-        elif '物流' in name:
-            return '物流仓储'
-        elif '产业园' in name:
-            return '产业园区'
-        elif '铁建' in name:
-            return '基础设施'
-        else:
-            return '其他'
-    
-    def is_green_project(name):
-        green_keywords = ['碳中和', '新能源', '绿色', '环保', '清洁']
-        return any(keyword in name for keyword in green_keywords)
+    # 读取数据（共享解析缓存）
+    df = load_integrated()
     
-    df['资产类型'] = df['ABS'].apply(extract_asset_type)
-    df['绿色认证'] = df['ABS'].apply(is_green_project)
+    # 提取资产类型和绿色认证（向量化分类）
+    df['资产类型'], df['绿色认证'] = classify(df['ABS'])
     
     # 创建图
     fig, ax = plt.subplots(figsize=(24, 24), facecolor=CIRCLE_THEME['bg_color'])
@@ -78,9 +58,8 @@ def create_circular_network():
         '绿色认证': {'绿色项目': [], '传统项目': []}
     }
     
-    # 处理数据并分类
-    for idx, row in df.iterrows():
-        product_name = row['ABS']
+    # 处理数据并分类：按行位置记录产品，重名的产品各自保留自己的规模
+    for position, (_, row) in enumerate(df.iterrows()):
         underwriter = row['承销商/管理人']
         asset_type = row['资产类型']
         status = row['状态']
@@ -90,134 +69,159 @@ def create_circular_network():
         # 承销商分类
         if underwriter not in categories['承销商']:
             categories['承销商'][underwriter] = []
-        categories['承销商'][underwriter].append(product_name)
+        categories['承销商'][underwriter].append(position)
         
         # 资产类型分类
         if asset_type not in categories['资产类型']:
             categories['资产类型'][asset_type] = []
-        categories['资产类型'][asset_type].append(product_name)
+        categories['资产类型'][asset_type].append(position)
         
         # 项目状态分类
-        categories['项目状态'][status].append(product_name)
+        categories['项目状态'][status].append(position)
         
         # 规模分类
         if scale >= 30:
-            categories['规模分布']['大型(>30亿)'].append(product_name)
+            categories['规模分布']['大型(>30亿)'].append(position)
         elif scale >= 10:
-            categories['规模分布']['中型(10-30亿)'].append(product_name)
+            categories['规模分布']['中型(10-30亿)'].append(position)
         else:
-            categories['规模分布']['小型(<10亿)'].append(product_name)
+            categories['规模分布']['小型(<10亿)'].append(position)
         
         # 绿色认证分类
         if is_green:
-            categories['绿色认证']['绿色项目'].append(product_name)
+            categories['绿色认证']['绿色项目'].append(position)
         else:
-            categories['绿色认证']['传统项目'].append(product_name)
+            categories['绿色认证']['传统项目'].append(position)
     
-    # 计算角度
+    # 一次算出三层节点的角度和坐标：主类别均匀成环，子类别在主类别两侧60度内展开，
+    # 产品（含汇总节点）在子类别两侧22.5度内展开
     main_categories = list(categories.keys())
     n_main_cats = len(main_categories)
-    main_angles = np.linspace(0, 2*np.pi, n_main_cats, endpoint=False)
+    main_radius = 3.5
+    sub_radius = 6.5
+    product_radius = 9
+    main_angles, main_xs, main_ys = ring_layout(n_main_cats, main_radius, (center_x, center_y))
+    sub_angles, sub_xs, sub_ys = fan_layout(
+        main_angles, [len(cat_data) for cat_data in categories.values()], np.pi / 3,
+        sub_radius, (center_x, center_y))
+    subcat_products = [products for cat_data in categories.values() for products in cat_data.values()]
+    
+    # 细节层次：规模靠前的产品单独绘制，其余每个子类别合并为一个按总规模显示的汇总节点
+    names = df['ABS'].to_numpy()
+    scales = df['拟发行金额(亿元)'].to_numpy()
+    individual, summary_count, summary_scale = select_lod(
+        [scales[product] for products in subcat_products for product in products],
+        np.repeat(np.arange(len(subcat_products)), [len(products) for products in subcat_products]),
+        max_product_nodes, len(subcat_products))
+    shown_products = []
+    offset = 0
+    for products in subcat_products:
+        shown_products.append([product for product, keep in zip(products, individual[offset:offset + len(products)])
+                               if keep])
+        offset += len(products)
+    
+    _, prod_xs, prod_ys = fan_layout(
+        sub_angles, [len(shown) + (count > 0) for shown, count in zip(shown_products, summary_count)],
+        np.pi / 8, product_radius, (center_x, center_y))
+    sub_index = 0
+    prod_index = 0
+    
+    # 节点按层级收集，最后每层一个集合
+    node_batch = NodeBatch()
     
     # 绘制中心点
-    center_circle = plt.Circle((center_x, center_y), 0.8, 
-                              color=CIRCLE_THEME['center_color'], alpha=0.9, zorder=10)
-    ax.add_patch(center_circle)
+    node_batch.add(center_x, center_y, 0.8, 
+                   color=CIRCLE_THEME['center_color'], alpha=0.9, zorder=10)
     ax.text(center_x, center_y, 'ABS\n市场\n生态', ha='center', va='center',
             fontsize=20, fontweight='bold', color='white', zorder=11)
     
+    # 所有连接线先收集，最后按样式批量绘制
+    edge_batch = EdgeBatch()
+    
     # 绘制主要类别
-    main_radius = 3.5
     for i, (cat_name, cat_data) in enumerate(categories.items()):
-        angle = main_angles[i]
-        x = center_x + main_radius * np.cos(angle)
-        y = center_y + main_radius * np.sin(angle)
+        x = main_xs[i]
+        y = main_ys[i]
         
         # 绘制主类别节点
-        cat_circle = plt.Circle((x, y), 0.6, 
-                               color=CIRCLE_THEME['category_color'], alpha=0.8, zorder=8)
-        ax.add_patch(cat_circle)
+        node_batch.add(x, y, 0.6, 
+                       color=CIRCLE_THEME['category_color'], alpha=0.8, zorder=8)
         
         # 主类别标签
         ax.text(x, y, cat_name, ha='center', va='center',
                 fontsize=12, fontweight='bold', color='white', zorder=9)
         
         # 连接到中心的线
-        ax.plot([center_x, x], [center_y, y], 
-                color=CIRCLE_THEME['connection_color'], linewidth=2, alpha=0.6, zorder=1)
+        edge_batch.add((center_x, center_y), (x, y), 
+                       color=CIRCLE_THEME['connection_color'], linewidth=2, alpha=0.6, zorder=1)
         
         # 绘制子类别
-        subcats = list(cat_data.keys())
-        if subcats:
-            n_subcats = len(subcats)
-            # 计算子类别的角度范围
-            angle_span = np.pi / 3  # 60度范围
-            if n_subcats == 1:
-                subcat_angles = [angle]
-            else:
-                subcat_angles = np.linspace(angle - angle_span/2, 
-                                          angle + angle_span/2, n_subcats)
+        for subcat_name, products in cat_data.items():
+            subcat = sub_index
+            sub_x = sub_xs[sub_index]
+            sub_y = sub_ys[sub_index]
+            sub_index += 1
+            if not products:  # 跳过空的子类别
+                continue
             
-            sub_radius = 6.5
-            for j, (subcat_name, products) in enumerate(cat_data.items()):
-                if not products:  # 跳过空的子类别
-                    continue
-                    
-                sub_angle = subcat_angles[j % len(subcat_angles)]
-                sub_x = center_x + sub_radius * np.cos(sub_angle)
-                sub_y = center_y + sub_radius * np.sin(sub_angle)
-                
-                # 绘制子类别节点
-                size = min(0.4 + len(products) * 0.05, 0.8)  # 根据产品数量调整大小
-                subcat_circle = plt.Circle((sub_x, sub_y), size,
-                                         color=CIRCLE_THEME['subcategory_color'], 
-                                         alpha=0.7, zorder=6)
-                ax.add_patch(subcat_circle)
+            # 绘制子类别节点
+            size = min(0.4 + len(products) * 0.05, 0.8)  # 根据产品数量调整大小
+            node_batch.add(sub_x, sub_y, size,
+                           color=CIRCLE_THEME['subcategory_color'], 
+                           alpha=0.7, zorder=6)
+            
+            # 子类别标签
+            label = subcat_name if len(subcat_name) <= 8 else subcat_name[:6] + '..'
+            ax.text(sub_x, sub_y, f'{label}\n({len(products)})', 
+                    ha='center', va='center',
+                    fontsize=9, fontweight='bold', color='white', zorder=7)
+            
+            # 连接主类别和子类别的线
+            edge_batch.add((x, y), (sub_x, sub_y), 
+                           color=CIRCLE_THEME['connection_color'], 
+                           linewidth=1.5, alpha=0.5, zorder=2)
+            
+            # 绘制产品节点（按节点预算选出的产品）
+            for position in shown_products[subcat]:
+                product = names[position]
+                prod_x = prod_xs[prod_index]
+                prod_y = prod_ys[prod_index]
+                prod_index += 1
                 
-                # 子类别标签
-                label = subcat_name if len(subcat_name) <= 8 else subcat_name[:6] + '..'
-                ax.text(sub_x, sub_y, f'{label}\n({len(products)})', 
-                        ha='center', va='center',
-                        fontsize=9, fontweight='bold', color='white', zorder=7)
+                # 绘制产品节点
+                node_batch.add(prod_x, prod_y, 0.15,
+                               color=CIRCLE_THEME['product_color'], 
+                               alpha=0.6, zorder=4)
                 
-                # 连接主类别和子类别的线
-                ax.plot([x, sub_x], [y, sub_y], 
-                        color=CIRCLE_THEME['connection_color'], 
-                        linewidth=1.5, alpha=0.5, zorder=2)
+                # 连接子类别和产品的线
+                edge_batch.add((sub_x, sub_y), (prod_x, prod_y), 
+                               color=CIRCLE_THEME['connection_color'], 
+                               linewidth=1, alpha=0.3, zorder=1)
                 
-                # 绘制产品节点（选择性显示重要产品）
-                if len(products) <= 8:  # 只有当产品数量不太多时才显示
-                    product_radius = 9
-                    n_products = len(products)
-                    if n_products == 1:
-                        product_angles = [sub_angle]
-                    else:
-                        product_span = np.pi / 8
-                        product_angles = np.linspace(sub_angle - product_span/2,
-                                                   sub_angle + product_span/2, n_products)
-                    
-                    for k, product in enumerate(products[:8]):  # 最多显示8个产品
-                        prod_angle = product_angles[k % len(product_angles)]
-                        prod_x = center_x + product_radius * np.cos(prod_angle)
-                        prod_y = center_y + product_radius * np.sin(prod_angle)
-                        
-                        # 绘制产品节点
-                        prod_circle = plt.Circle((prod_x, prod_y), 0.15,
-                                               color=CIRCLE_THEME['product_color'], 
-                                               alpha=0.6, zorder=4)
-                        ax.add_patch(prod_circle)
-                        
-                        # 连接子类别和产品的线
-                        ax.plot([sub_x, prod_x], [sub_y, prod_y], 
-                                color=CIRCLE_THEME['connection_color'], 
-                                linewidth=1, alpha=0.3, zorder=1)
-                        
-                        # 产品标签（简化）
-                        short_name = product.split('-')[0][:8] if '-' in product else product[:8]
-                        ax.text(prod_x + 0.3, prod_y, short_name, 
-                                ha='left', va='center',
-                                fontsize=7, color=CIRCLE_THEME['text_color'], 
-                                alpha=0.8, zorder=5)
+                # 产品标签（简化）
+                short_name = product.split('-')[0][:8] if '-' in product else product[:8]
+                ax.text(prod_x + 0.3, prod_y, short_name, 
+                        ha='left', va='center',
+                        fontsize=7, color=CIRCLE_THEME['text_color'], 
+                        alpha=0.8, zorder=5)
+            
+            # 其余产品的汇总节点：大小随总规模增长
+            if summary_count[subcat]:
+                prod_x = prod_xs[prod_index]
+                prod_y = prod_ys[prod_index]
+                prod_index += 1
+                node_batch.add(prod_x, prod_y, min(0.15 + np.sqrt(summary_scale[subcat]) / 40, 0.4),
+                               color=CIRCLE_THEME['product_color'], alpha=0.35, zorder=4)
+                edge_batch.add((sub_x, sub_y), (prod_x, prod_y), 
+                               color=CIRCLE_THEME['connection_color'], 
+                               linewidth=1, alpha=0.3, zorder=1)
+                ax.text(prod_x + 0.3, prod_y, f'+{summary_count[subcat]}个 {summary_scale[subcat]:.0f}亿', 
+                        ha='left', va='center',
+                        fontsize=7, color=CIRCLE_THEME['text_color'], 
+                        alpha=0.8, zorder=5)
+    
+    node_batch.draw(ax)
+    edge_batch.draw(ax)
     
     # 添加图例
     legend_elements = [
@@ -266,10 +270,10 @@ def create_circular_network():
                 color=CIRCLE_THEME['text_color'])
     
     # 保存图片
-    plt.savefig('ABS_Circular_Network.png', 
-                dpi=300, facecolor=CIRCLE_THEME['bg_color'], 
-                edgecolor='none', bbox_inches='tight', 
-                pad_inches=0.5)
+    export_figure(plt.gcf(), 'ABS_Circular_Network.png', 
+                  dpi=300, facecolor=CIRCLE_THEME['bg_color'], 
+                  edgecolor='none', bbox_inches='tight', 
+                  pad_inches=0.5)
     
     print("✅ 圆形网络关系图已保存为 'ABS_Circular_Network.png'")
     
@@ -6,12 +6,24 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import PathPatch, Circle, Wedge
 from matplotlib.path import Path
+import argparse
+import logging
 import warnings
+from abs_data import load_integrated
+from abs_classify import classify
+from abs_export import export_figure
+from abs_fonts import font_rc
+from abs_logging import configure_logging, get_logger
+from abs_labels import place_ring_labels, points_per_unit, text_extent
+from abs_layout import sector_layout
+from abs_lod import select_lod
+from abs_render import EdgeBatch, NodeBatch, draw_patches
 warnings.filterwarnings('ignore')
 
+logger = get_logger(__name__)
+
 # 设置中文字体
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+plt.rcParams.update(font_rc(['Arial Unicode MS', 'SimHei', 'DejaVu Sans']))
 
 # 更深的专业配色方案
 CLUSTER_COLORS = [
@@ -43,42 +55,108 @@ def create_bezier_curve(start, end, curvature=0.2):
     codes = [Path.MOVETO, Path.CURVE3, Path.CURVE3]
     return Path(vertices, codes)
 
-def create_circular_network(ax, title):
-    """创建圆形网络图（承销商维度）"""
-    # 读取新数据
-    df = pd.read_csv('integrated ABS.csv')
-    
-    # 数据预处理
-    df['申报日期'] = pd.to_datetime(df['申报日期'])
-    df['拟发行金额(亿元)'] = pd.to_numeric(df['拟发行金额(亿元)'])
-    
-    # 提取资产类型和绿色认证
-    def extract_asset_type(name):
-        if '数据中心' in name:
-            return '数据中心'
-        elif '高速' in name:
-            return '高速公路'
-        elif '住房租赁' in name:
-            return '住房租赁'
-        elif '商业' in name:
-            return '商业地产'
-        elif '新能源' in name or '火电' in name:
-            return '能源设施'
-        elif '物流' in name:
-            return '物流仓储'
-        elif '产业园' in name:
-            return '产业园区'
-        elif '铁建' in name:
-            return '基础设施'
+def is_valid_underwriter(underwriter):
+    """承销商名称是否可用于建立连接"""
+    return (isinstance(underwriter, str) and
+            underwriter not in ['nan', 'N/A', '', 'None'] and
+            underwriter.strip() != '' and
+            len(underwriter.strip()) > 2)
+
+def _ordered_pairs(indices, accept=None):
+    """按 (i, j) 字典序惰性生成 indices 中 i < j 的组合"""
+    for a, i in enumerate(indices):
+        for j in indices[a + 1:]:
+            if accept is None or accept(i, j):
+                yield (i, j)
+
+def build_connection_edges(products, max_total=25, max_large=10, max_green=6, large_threshold=15):
+    """按索引生成连接边，返回 [(i, j, 连接类型), ...]
+
+    承销商连接：按承销商分桶，只在同一承销商内不同层级之间组合；
+    大规模/绿色连接：按规模阈值和绿色类别筛出候选节点后按序惰性组合，到达上限即停止。
+    结果与逐对扫描全部产品的 O(n²) 实现完全一致（包括边的顺序和上限截断）。
+    """
+    edges = []
+
+    # 第一轮：承销商连接
+    buckets = {}
+    for i, product in enumerate(products):
+        if is_valid_underwriter(product['underwriter']):
+            buckets.setdefault(product['underwriter'], {}).setdefault(product['tier'], []).append(i)
+
+    underwriter_edges = []
+    for tiers in buckets.values():
+        tier_lists = list(tiers.values())
+        for a, first in enumerate(tier_lists):
+            for second in tier_lists[a + 1:]:
+                underwriter_edges.extend((min(i, j), max(i, j)) for i in first for j in second)
+    underwriter_edges.sort()
+    edges.extend((i, j, 'underwriter') for i, j in underwriter_edges)
+
+    # 第二轮：大规模和绿色资产连接
+    scales = np.array([product['scale'] for product in products], dtype=float)
+    order = np.argsort(scales, kind='stable')
+    start = np.searchsorted(scales[order], large_threshold, side='right')
+    large_nodes = np.sort(order[start:]).tolist()
+    green_nodes = [i for i, product in enumerate(products)
+                   if '绿色' in str(product.get('category', ''))]
+
+    large_pairs = _ordered_pairs(large_nodes)
+    green_pairs = _ordered_pairs(green_nodes, lambda i, j: products[i]['tier'] != products[j]['tier'])
+    next_large = next(large_pairs, None) if max_large > 0 else None
+    next_green = next(green_pairs, None) if max_green > 0 else None
+    counts = {'large_scale': 0, 'green_asset': 0}
+    total = len(edges)
+
+    while total < max_total and (next_large is not None or next_green is not None):
+        pair = min(p for p in (next_large, next_green) if p is not None)
+        # 同一对产品同时满足两种条件时优先作为大规模连接
+        if pair == next_large:
+            kind = 'large_scale'
         else:
-            return '其他'
-    
-    def is_green_project(name):
-        green_keywords = ['碳中和', '新能源', '绿色', '环保', '清洁']
-        return any(keyword in name for keyword in green_keywords)
+            kind = 'green_asset'
+        edges.append(pair + (kind,))
+        counts[kind] += 1
+        total += 1
+
+        if pair == next_large:
+            next_large = next(large_pairs, None) if counts['large_scale'] < max_large else None
+        if pair == next_green:
+            next_green = next(green_pairs, None) if counts['green_asset'] < max_green else None
+
+    return edges
+
+def apply_lod(clusters, max_nodes):
+    """按节点预算精简各cluster：保留规模靠前的产品，其余合并为每个cluster一个汇总节点"""
+    cluster_keys = list(clusters.keys())
+    flat = [(c, product) for c, key in enumerate(cluster_keys) for product in clusters[key]]
+    individual, summary_count, summary_scale = select_lod(
+        [product['scale'] for _, product in flat], [c for c, _ in flat], max_nodes, len(cluster_keys))
+
+    display_clusters = {key: [] for key in cluster_keys}
+    for (c, product), keep in zip(flat, individual):
+        if keep:
+            display_clusters[cluster_keys[c]].append(product)
+    for c, key in enumerate(cluster_keys):
+        if summary_count[c]:
+            base_cluster, tier = key.rsplit('_', 1)
+            display_clusters[key].append({
+                'name': f'{key}:+{summary_count[c]}',
+                'scale': float(summary_scale[c]),
+                'count': int(summary_count[c]),
+                'tier': tier,
+                'cluster': base_cluster,
+                'summary': True
+            })
+    return display_clusters
+
+def create_circular_network(ax, title, max_nodes=None):
+    """创建圆形网络图（承销商维度）；指定 max_nodes 时启用细节层次，节点总数不超过预算"""
+    # 读取数据（共享解析缓存）
+    df = load_integrated()
     
-    df['资产类型'] = df['ABS'].apply(extract_asset_type)
-    df['绿色认证'] = df['ABS'].apply(is_green_project)
+    # 提取资产类型和绿色认证（向量化分类）
+    df['资产类型'], df['绿色认证'] = classify(df['ABS'])
     
     # 数据分析和聚类
     clusters = {}
@@ -148,6 +226,12 @@ def create_circular_network(ax, title):
             'cluster': cluster_key
         })
     
+    # 细节层次：超出节点预算的低规模产品按cluster/层级合并为汇总节点
+    display_clusters = clusters if max_nodes is None else apply_lod(clusters, max_nodes)
+    if max_nodes is not None:
+        logger.info("细节层次: 预算 %d 个节点, 实际绘制 %d 个",
+                    max_nodes, sum(len(products) for products in display_clusters.values()))
+    
     # 同心圆层级布局
     tier_radii = {'inner': 2.5, 'middle': 4.5, 'outer': 6.5}
     tier_labels = {
@@ -160,12 +244,14 @@ def create_circular_network(ax, title):
     base_clusters = list(set([k.rsplit('_', 1)[0] for k in clusters.keys()]))
     cluster_angles = {}
     
-    # 调试输出：显示cluster数量和名称
-    print(f"📊 发现 {len(base_clusters)} 个cluster: {base_clusters}")
+    # 摘要：cluster数量和名称
+    logger.info("发现 %d 个cluster: %s", len(base_clusters), base_clusters)
     
     # 分配角度区间
     angle_per_cluster = 2 * np.pi / len(base_clusters)
     
+    # 背景扇形和边界线分别合并为一个集合
+    background_wedges, border_wedges = [], []
     for i, base_cluster in enumerate(base_clusters):
         start_angle = i * angle_per_cluster
         end_angle = (i + 1) * angle_per_cluster
@@ -181,12 +267,15 @@ def create_circular_network(ax, title):
             alpha_value = 0.15 - radius_idx * 0.02
             wedge = Wedge((0, 0), radius, np.degrees(start_angle), np.degrees(end_angle),
                          facecolor=color, alpha=alpha_value, zorder=0)
-            ax.add_patch(wedge)
+            background_wedges.append(wedge)
             
         # 边界线
         wedge_border = Wedge((0, 0), 7.5, np.degrees(start_angle), np.degrees(end_angle),
                            facecolor='none', edgecolor=color, linewidth=2, alpha=0.7, zorder=1)
-        ax.add_patch(wedge_border)
+        border_wedges.append(wedge_border)
+    
+    draw_patches(ax, background_wedges)
+    draw_patches(ax, border_wedges)
     
     # 绘制同心圆 - 用不同粗细表示层级重要性
     tier_line_widths = {'inner': 4, 'middle': 3, 'outer': 2}
@@ -199,31 +288,33 @@ def create_circular_network(ax, title):
                        linewidth=line_width, alpha=0.9, zorder=2)
         ax.add_patch(circle)
     
-    # 放置节点
+    # 放置节点（阴影和节点各为一个图层）
     node_positions = {}
-    
-    for cluster_key, products in clusters.items():
+    node_batch = NodeBatch()
+    labels = []
+    
+    # 一次计算所有节点的角度和坐标：每个cluster在所属扇区内留10%边距均匀分布
+    cluster_keys = list(display_clusters.keys())
+    node_angles, node_xs, node_ys = sector_layout(
+        [cluster_angles[k.rsplit('_', 1)[0]]['start'] for k in cluster_keys],
+        [cluster_angles[k.rsplit('_', 1)[0]]['end'] for k in cluster_keys],
+        [len(display_clusters[k]) for k in cluster_keys],
+        [tier_radii[k.rsplit('_', 1)[1]] for k in cluster_keys],
+        margin=0.1)
+    node_index = 0
+    
+    for cluster_key, products in display_clusters.items():
         base_cluster = cluster_key.rsplit('_', 1)[0]
         tier = cluster_key.rsplit('_', 1)[1]
         radius = tier_radii[tier]
         
         cluster_color = CLUSTER_COLORS[base_clusters.index(base_cluster) % len(CLUSTER_COLORS)]
         
-        angle_info = cluster_angles[base_cluster]
-        start_angle = angle_info['start']
-        end_angle = angle_info['end']
-        angle_span = end_angle - start_angle
-        
-        for j, product in enumerate(products):
-            if len(products) == 1:
-                angle = start_angle + angle_span / 2
-            else:
-                margin = angle_span * 0.1
-                usable_span = angle_span - 2 * margin
-                angle = start_angle + margin + (j / max(1, len(products) - 1)) * usable_span
-            
-            x = radius * np.cos(angle)
-            y = radius * np.sin(angle)
+        for product in products:
+            angle = node_angles[node_index]
+            x = node_xs[node_index]
+            y = node_ys[node_index]
+            node_index += 1
             
             node_positions[product['name']] = (x, y)
             
@@ -238,24 +329,27 @@ def create_circular_network(ax, title):
                     node_size = max(0.10, min(0.25, scale / 55))
             except:
                 node_size = 0.15
+            if product.get('summary'):
+                # 汇总节点按总规模放大，上限高于单个产品
+                node_size = max(0.15, min(0.6, np.sqrt(product['scale']) / 12))
             
             # 深色阴影
-            shadow = Circle((x + 0.03, y - 0.03), node_size, color='#000000', 
+            node_batch.add(x + 0.03, y - 0.03, node_size, color='#000000', 
                            alpha=0.25, zorder=2)
-            ax.add_patch(shadow)
             
-            circle = Circle((x, y), node_size, color=cluster_color, 
-                           alpha=0.95, zorder=3, edgecolor='white', linewidth=2)
-            ax.add_patch(circle)
-            
-            # 添加标签 - 确保标签在正确的层级位置
-            label_distance = radius + 0.4  # 减少距离，让标签更接近对应节点
-            label_x = label_distance * np.cos(angle)
-            label_y = label_distance * np.sin(angle)
+            if product.get('summary'):
+                # 汇总节点：白底、cluster色边框
+                node_batch.add(x, y, node_size, color='white', edgecolor=cluster_color,
+                               alpha=0.95, zorder=3, linewidth=2)
+            else:
+                node_batch.add(x, y, node_size, color=cluster_color, 
+                               alpha=0.95, zorder=3, linewidth=2)
             
             # 简化产品名称
             product_name = product['name']
-            if '-' in product_name:
+            if product.get('summary'):
+                short_name = f"+{product['count']}个产品"
+            elif '-' in product_name:
                 short_name = product_name.split('-')[-1]
             else:
                 short_name = product_name
@@ -267,28 +361,6 @@ def create_circular_network(ax, title):
             scale_info = f"\n{product['scale']:.1f}亿" if product['scale'] > 0 else ""
             full_label = short_name + scale_info
             
-            # 文字方向 - 重新优化算法确保所有文字都正向
-            angle_deg = np.degrees(angle)
-            
-            # 标准化角度到 0-360
-            angle_deg = angle_deg % 360
-            
-            # 简化逻辑：只要角度在左半边就翻转
-            if 90 < angle_deg < 270:
-                # 左半边：文字需要翻转以保持可读
-                rotation = angle_deg - 180
-                ha = 'right'
-            else:
-                # 右半边：文字保持正常方向
-                rotation = angle_deg
-                ha = 'left'
-            
-            # 确保旋转角度在 -90 到 +90 之间
-            while rotation > 90:
-                rotation -= 180
-            while rotation < -90:
-                rotation += 180
-            
             # 字体大小和颜色 - 不同层级使用不同颜色
             if tier == 'inner':
                 fontsize = 9
@@ -309,131 +381,134 @@ def create_circular_network(ax, title):
                 bbox_color = '#f0f0f0'  # 更浅背景
                 bbox_alpha = 0.85
             
-            ax.text(label_x, label_y, full_label, 
-                   ha=ha, va='center', rotation=rotation,
-                   fontsize=fontsize, color=text_color, fontweight=fontweight, zorder=4,
-                   bbox=dict(boxstyle="round,pad=0.15", facecolor=bbox_color, alpha=bbox_alpha, 
-                            edgecolor='#666666', linewidth=0.5))
+            # 标签先登记，全部节点放置完后统一做避让再绘制
+            labels.append({'text': full_label, 'angle': angle, 'radius': radius, 'scale': product['scale'],
+                           'fontsize': fontsize, 'fontweight': fontweight, 'text_color': text_color,
+                           'bbox_color': bbox_color, 'bbox_alpha': bbox_alpha})
+    
+    # 标签避让：估算尺寸（含0.15字号的bbox内边距），按规模优先放置，冲突的沿圆周微调、加引线或隐藏
+    units_per_point = 1 / points_per_unit(ax)
+    extents = np.array([text_extent(label['text'], label['fontsize'], pad=0.15) for label in labels]).reshape(-1, 2)
+    label_angles, label_visible, label_leader = place_ring_labels(
+        [label['angle'] for label in labels],
+        [label['radius'] + 0.4 for label in labels],  # 减少距离，让标签更接近对应节点
+        extents[:, 0] * units_per_point, extents[:, 1] * units_per_point,
+        priority=[label['scale'] for label in labels])
+    label_moved = label_visible & (label_angles != np.array([label['angle'] for label in labels]))
+    logger.info("产品标签: 原位 %d 个, 微调 %d 个 (其中引线 %d 个), 隐藏 %d 个",
+                int((label_visible & ~label_moved).sum()), int(label_moved.sum()),
+                int(label_leader.sum()), int((~label_visible).sum()))
+    
+    leader_batch = EdgeBatch()
+    for label, angle, visible, leader in zip(labels, label_angles, label_visible, label_leader):
+        if not visible:
+            continue
+        label_distance = label['radius'] + 0.4
+        label_x = label_distance * np.cos(angle)
+        label_y = label_distance * np.sin(angle)
+        if leader:
+            # 引线从节点指向偏移后的标签锚点
+            node_angle = label['angle']
+            leader_batch.add((label['radius'] * np.cos(node_angle), label['radius'] * np.sin(node_angle)),
+                             (label_x, label_y), color='#888888', linewidth=0.6, alpha=0.8, zorder=3)
+        
+        # 文字方向 - 重新优化算法确保所有文字都正向
+        angle_deg = np.degrees(angle)
+        
+        # 标准化角度到 0-360
+        angle_deg = angle_deg % 360
+        
+        # 简化逻辑：只要角度在左半边就翻转
+        if 90 < angle_deg < 270:
+            # 左半边：文字需要翻转以保持可读
+            rotation = angle_deg - 180
+            ha = 'right'
+        else:
+            # 右半边：文字保持正常方向
+            rotation = angle_deg
+            ha = 'left'
+        
+        # 确保旋转角度在 -90 到 +90 之间
+        while rotation > 90:
+            rotation -= 180
+        while rotation < -90:
+            rotation += 180
+        
+        ax.text(label_x, label_y, label['text'], 
+               ha=ha, va='center', rotation=rotation,
+               fontsize=label['fontsize'], color=label['text_color'], fontweight=label['fontweight'], zorder=4,
+               bbox=dict(boxstyle="round,pad=0.15", facecolor=label['bbox_color'], alpha=label['bbox_alpha'], 
+                        edgecolor='#666666', linewidth=0.5))
+    
+    leader_batch.draw(ax)
+    
+    node_batch.draw(ax)
     
     # 添加连接线 - 修复连接逻辑
     connection_count = 0
     connection_stats = {'underwriter': 0, 'large_scale': 0, 'green_asset': 0}
-    print("🔗 正在添加连接线...")
+    logger.debug("正在添加连接线...")
     
-    # 获取所有产品用于连接分析
+    # 获取所有单独绘制的产品用于连接分析（汇总节点不参与连接）
     all_products = []
-    for cluster_products in clusters.values():
-        all_products.extend(cluster_products)
-    
-    print(f"📊 总共有 {len(all_products)} 个产品可用于连接")
-    
-    # 先打印承销商信息用于调试
-    print("🔍 承销商信息调试:")
-    underwriter_count = {}
-    for product in all_products:
-        uw = product['underwriter']
-        if uw not in underwriter_count:
-            underwriter_count[uw] = []
-        underwriter_count[uw].append((product['name'][:30], product['tier']))
-    
-    for uw, products in underwriter_count.items():
-        if len(products) > 1:
-            print(f"   承销商 '{uw}': {len(products)}个产品")
-            for name, tier in products:
-                print(f"     - {name}... ({tier})")
-    
-    # 直接从所有产品中寻找连接，不受cluster限制
-    print("🔗 开始连接检查循环...")
-    
-    # 首先专门寻找承销商连接
-    print("🔍 第一轮：专门寻找承销商连接")
-    for i, product1 in enumerate(all_products):
-        for j, product2 in enumerate(all_products):
-            if i >= j:
-                continue
-            
-            # 只检查承销商连接
-            underwriter1 = product1['underwriter']
-            underwriter2 = product2['underwriter']
-            tier1 = product1['tier']
-            tier2 = product2['tier']
-            
-            # 详细承销商检查
-            if underwriter1 in ['平安证券', '中投证券', '中信建投']:
-                print(f"  🔎 检查产品 {i+1}-{j+1}: '{underwriter1}' vs '{underwriter2}' | 层级: {tier1} vs {tier2}")
-                print(f"      承销商相同: {underwriter1 == underwriter2}")
-                print(f"      层级不同: {tier1 != tier2}")
-                print(f"      承销商有效: {underwriter1 not in ['nan', 'N/A', '', 'None'] and len(underwriter1.strip()) > 2}")
-            
-            # 承销商连接条件
-            if (tier1 != tier2 and 
-                underwriter1 == underwriter2 and 
-                underwriter1 not in ['nan', 'N/A', '', 'None'] and
-                underwriter1.strip() != '' and
-                len(underwriter1.strip()) > 2):
-                
-                print(f"  ✅ 找到承销商连接: '{underwriter1}' - {product1['name'][:20]}...({tier1}) ↔ {product2['name'][:20]}...({tier2})")
-                
-                pos1 = node_positions.get(product1['name'])
-                pos2 = node_positions.get(product2['name'])
-                
-                if pos1 and pos2:
-                    # 实线 - 承销商关系（深蓝色）
-                    ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]], 
-                           color='#003f5c', linewidth=3.5, alpha=1.0, 
-                           linestyle='-', zorder=4)
-                    print(f"    ✅ 绘制承销商连线: {underwriter1}")
-                    connection_stats['underwriter'] += 1
-                    connection_count += 1
-    
-    # 第二轮：其他连接
-    print("🔍 第二轮：其他连接（大规模和绿色资产）")
-    for i, product1 in enumerate(all_products):
-        for j, product2 in enumerate(all_products):
-            if i >= j or connection_count >= 25:  # 增加上限
-                continue
-            
-            should_connect = False
-            connection_type = None
-            
-            # 大规模产品连接
-            if (product1['scale'] > 15 and product2['scale'] > 15 and 
-                connection_stats['large_scale'] < 10):  # 限制数量
-                should_connect = True
-                connection_type = 'large_scale'
-                
-            # 绿色资产连接
-            elif (product1['tier'] != product2['tier'] and 
-                  ('绿色' in str(product1.get('category', '')) and 
-                   '绿色' in str(product2.get('category', ''))) and
-                  connection_stats['green_asset'] < 6):  # 减少绿色连接数量
-                should_connect = True
-                connection_type = 'green_asset'
-            
-            if should_connect:
-                pos1 = node_positions.get(product1['name'])
-                pos2 = node_positions.get(product2['name'])
-                
-                if pos1 and pos2:
-                    if connection_type == 'large_scale':
-                        # 虚线 - 大规模产品关系（紫红色）
-                        ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]], 
-                               color='#d45087', linewidth=3.0, alpha=0.9, 
+    for cluster_products in display_clusters.values():
+        all_products.extend(product for product in cluster_products if not product.get('summary'))
+    
+    # 只在开启调试日志时才整理和格式化逐条信息，默认路径不做任何字符串拼接
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("总共有 %d 个产品可用于连接", len(all_products))
+        underwriter_count = {}
+        for product in all_products:
+            uw = product['underwriter']
+            if uw not in underwriter_count:
+                underwriter_count[uw] = []
+            underwriter_count[uw].append((product['name'][:30], product['tier']))
+        
+        for uw, products in underwriter_count.items():
+            if len(products) > 1:
+                logger.debug("承销商 '%s': %d个产品", uw, len(products))
+                for name, tier in products:
+                    logger.debug("  - %s... (%s)", name, tier)
+    
+    # 按索引生成连接边，代价只与实际生成的边数相关
+    logger.debug("开始生成连接边...")
+    edges = build_connection_edges(all_products)
+
+    # 同一样式的连接线合并为一个 LineCollection
+    edge_batch = EdgeBatch()
+    for i, j, connection_type in edges:
+        product1 = all_products[i]
+        product2 = all_products[j]
+        pos1 = node_positions.get(product1['name'])
+        pos2 = node_positions.get(product2['name'])
+
+        if pos1 and pos2:
+            if connection_type == 'underwriter':
+                if debug:
+                    logger.debug("找到承销商连接: '%s' - %s...(%s) ↔ %s...(%s)",
+                                 product1['underwriter'], product1['name'][:20], product1['tier'],
+                                 product2['name'][:20], product2['tier'])
+                # 实线 - 承销商关系（深蓝色）
+                edge_batch.add(pos1, pos2, color='#003f5c', linewidth=3.5, alpha=1.0, 
+                               linestyle='-', zorder=4)
+            elif connection_type == 'large_scale':
+                # 虚线 - 大规模产品关系（紫红色）
+                edge_batch.add(pos1, pos2, color='#d45087', linewidth=3.0, alpha=0.9, 
                                linestyle='--', zorder=3)
-                    elif connection_type == 'green_asset':
-                        # 点线 - 绿色资产关系（绿色）
-                        ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]], 
-                               color='#31a354', linewidth=2.5, alpha=0.8, 
+            elif connection_type == 'green_asset':
+                # 点线 - 绿色资产关系（绿色）
+                edge_batch.add(pos1, pos2, color='#31a354', linewidth=2.5, alpha=0.8, 
                                linestyle=':', zorder=3)
-                    
-                    connection_count += 1
-                    connection_stats[connection_type] += 1
+            
+            connection_count += 1
+            connection_stats[connection_type] += 1
+
+    edge_batch.draw(ax)
 
-    print(f"🔗 连接线统计:")
-    print(f"   • 承销商关系: {connection_stats['underwriter']} 条")
-    print(f"   • 大规模产品: {connection_stats['large_scale']} 条") 
-    print(f"   • 绿色资产: {connection_stats['green_asset']} 条")
-    print(f"   • 总计: {connection_count} 条连接线")
+    logger.info("连接线统计: 承销商关系 %d 条, 大规模产品 %d 条, 绿色资产 %d 条, 总计 %d 条",
+                connection_stats['underwriter'], connection_stats['large_scale'],
+                connection_stats['green_asset'], connection_count)
     
     # 添加cluster标识
     for base_cluster, angle_info in cluster_angles.items():
@@ -526,7 +601,7 @@ def create_circular_network(ax, title):
     
     return len(df), len(base_clusters)
 
-def create_single_network():
+def create_single_network(max_nodes=None):
     """创建单个圆形网络图"""
     print("🌐 创建承销商维度聚类网络图...")
     
@@ -534,10 +609,12 @@ def create_single_network():
     fig, ax = plt.subplots(1, 1, figsize=(16, 16), facecolor='white')
     
     ax.set_facecolor('white')
-    total_products, total_clusters = create_circular_network(ax, '上海证券交易所房地产持有型ABS市场\n承销商维度聚类网络分析')
+    # 先确定坐标范围，标签避让需要据此把字号换算为数据单位
     ax.set_xlim(-14, 14)
     ax.set_ylim(-14, 14)
     ax.set_aspect('equal')
+    total_products, total_clusters = create_circular_network(ax, '上海证券交易所房地产持有型ABS市场\n承销商维度聚类网络分析',
+                                                             max_nodes=max_nodes)
     ax.axis('off')
     
     # 数据来源
@@ -562,9 +639,9 @@ def create_single_network():
     plt.subplots_adjust(bottom=0.1)
     
     # 保存图片
-    plt.savefig('ABS_Clustered_Network.png', 
-                dpi=300, facecolor='white', edgecolor='none', 
-                bbox_inches='tight', pad_inches=0.3)
+    export_figure(plt.gcf(), 'ABS_Clustered_Network.png', 
+                  dpi=300, facecolor='white', edgecolor='none', 
+                  bbox_inches='tight', pad_inches=0.3)
     
     print("✅ 承销商维度聚类网络图已保存为 'ABS_Clustered_Network.png'")
     
@@ -573,8 +650,16 @@ def create_single_network():
 
 # 主程序
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='承销商维度聚类网络图')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出逐条连接的调试日志')
+    parser.add_argument('--summary', action='store_true', help='输出连接线和cluster计数摘要')
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help='节点预算：超出时低规模产品按cluster/层级合并为汇总节点（默认绘制全部产品）')
+    args = parser.parse_args()
+    configure_logging(verbose=args.verbose, summary=args.summary)
+    
     try:
-        create_single_network()
+        create_single_network(max_nodes=args.max_nodes)
         print("\n🎊 承销商维度聚类网络图创建完成！")
         print("🌟 核心特色:")
         print("   • 🎨 深色专业配色方案")
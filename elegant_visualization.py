@@ -3,15 +3,17 @@ import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from matplotlib.patches import Rectangle
 import warnings
+from abs_data import load_shanghai
+from abs_export import export_figure
+from abs_fonts import font_rc
+from abs_region import resolve_regions
 warnings.filterwarnings('ignore')
 
 # 设置中文字体 - 使用简单有效的方法
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+plt.rcParams.update(font_rc(['Arial Unicode MS', 'SimHei', 'DejaVu Sans']))
 
 # 优雅的紫粉橙配色方案 - 参考地图风格
 ELEGANT_THEME = {
@@ -44,10 +46,7 @@ def create_elegant_dashboard():
     print("🎨 创建优雅主题可视化...")
     
     # 读取数据
-    df = pd.read_csv('shanghai_real_estate_abs.csv')
-    df.columns = df.columns.str.strip()
-    df['Scale_Billion_Yuan'] = pd.to_numeric(df['Scale_Billion_Yuan'], errors='coerce')
-    df['Issuance_Date'] = pd.to_datetime(df['Issuance_Date'], errors='coerce')
+    df = load_shanghai()
     df['Year'] = df['Issuance_Date'].dt.year
     
     # 数据预处理
@@ -58,21 +57,8 @@ def create_elegant_dashboard():
     yearly_data = yearly_data.dropna()
     yearly_data['Cumulative_Scale'] = yearly_data['Scale_Billion_Yuan'].cumsum()
     
-    # 地域分布处理
-    regions = []
-    for issuer in df['Issuer']:
-        if '北京' in str(issuer):
-            regions.append('北京')
-        elif '上海' in str(issuer):
-            regions.append('上海')
-        elif '广州' in str(issuer) or '广东' in str(issuer):
-            regions.append('广东')
-        elif '江苏' in str(issuer) or '无锡' in str(issuer) or '南通' in str(issuer) or '南京' in str(issuer):
-            regions.append('江苏')
-        elif '武汉' in str(issuer):
-            regions.append('湖北')
-        else:
-            regions.append('其他')
+    # 地域分布处理：发行人去重后按省市名录解析，结果缓存在磁盘
+    regions = resolve_regions(df['Issuer'])
     
     # 创建主图表
     fig = plt.figure(figsize=(20, 14), facecolor=ELEGANT_THEME['bg_primary'])
@@ -203,10 +189,12 @@ def create_elegant_dashboard():
     ax6 = fig.add_subplot(gs[2, 1])
     ax6.set_facecolor(ELEGANT_THEME['bg_secondary'])
     
-    region_counts = pd.Series(regions).value_counts()
+    region_counts = regions.value_counts()
     colors_region = [ELEGANT_THEME['purple_deep'], ELEGANT_THEME['pink_deep'], 
                      ELEGANT_THEME['orange_deep'], ELEGANT_THEME['purple_medium'], 
-                     ELEGANT_THEME['pink_medium']]
+                     ELEGANT_THEME['pink_medium'], ELEGANT_THEME['orange_medium'],
+                     ELEGANT_THEME['purple_light'], ELEGANT_THEME['pink_light'],
+                     ELEGANT_THEME['orange_light']]
     
     bars = ax6.bar(range(len(region_counts)), region_counts.values,
                   color=colors_region[:len(region_counts)],
@@ -263,10 +251,10 @@ def create_elegant_dashboard():
     ax7.set_ylim(0, 1)
     
     # 保存图像
-    plt.savefig('ABS_Elegant_Dashboard.png', 
-                dpi=300, facecolor=ELEGANT_THEME['bg_primary'], 
-                edgecolor='none', bbox_inches='tight', 
-                pad_inches=0.3)
+    export_figure(plt.gcf(), 'ABS_Elegant_Dashboard.png', 
+                  dpi=300, facecolor=ELEGANT_THEME['bg_primary'], 
+                  edgecolor='none', bbox_inches='tight', 
+                  pad_inches=0.3)
     
     print("✅ 优雅仪表板已保存为 'ABS_Elegant_Dashboard.png'")
     
@@ -1,379 +1,463 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from datetime import datetime
 import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
+from matplotlib.patches import Patch, Rectangle
 import warnings
+from abs_data import load_integrated
+from abs_classify import classify
+from abs_aggregate import build_cube, load_aggregates
+from abs_export import EXPORT_BAND_HEIGHT, export_figure
+from abs_fonts import font_rc
+from abs_render import DENSITY_THRESHOLD, draw_density
 warnings.filterwarnings('ignore')
 
-# Set Chinese font for matplotlib with fallback
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans', 'sans-serif']
-plt.rcParams['axes.unicode_minus'] = False
-
-# Load and process the data
-df = pd.read_csv('integrated ABS.csv')
-
-# Data preprocessing
-df['申报日期'] = pd.to_datetime(df['申报日期'])
-df['反馈/获批日期'] = pd.to_datetime(df['反馈/获批日期'].str.split('；').str[0])
-df['拟发行金额(亿元)'] = pd.to_numeric(df['拟发行金额(亿元)'])
-
-# Extract asset types from ABS names
-def extract_asset_type(name):
-    if '数据中心' in name:
-        return '数据中心'
-    elif '高速' in name:
-        return '高速公路'
-    elif '住房租赁' in name:
-        return '住房租赁'
-    elif '商业' in name:
-        return '商业地产'
-    elif '新能源' in name or '火电' in name:
-        return '能源设施'
-    elif '物流' in name:
-        return '物流仓储'
-    elif '产业园' in name:
-        return '产业园区'
-    elif '铁建' in name:
-        return '基础设施'
-    else:
-        return '其他'
-
-df['资产类型'] = df['ABS'].apply(extract_asset_type)
-
-# Identify green/carbon neutral projects
-def is_green_project(name):
-    green_keywords = ['碳中和', '新能源', '绿色', '环保', '清洁']
-    return any(keyword in name for keyword in green_keywords)
+# Chinese font (resolved once and cached by abs_fonts) with fallback, applied only while a dashboard is rendered
+RC_PARAMS = font_rc(['SimHei', 'Arial Unicode MS', 'DejaVu Sans'])
 
-df['绿色认证'] = df['ABS'].apply(is_green_project)
-
-# Create final polished dashboard with precise layout control
-fig = plt.figure(figsize=(28, 36))
-gs = fig.add_gridspec(9, 4, height_ratios=[0.6, 1.0, 1.2, 1.2, 1.8, 1.4, 1.2, 1.2, 1.6], 
-                      width_ratios=[1, 1, 1, 1], hspace=0.5, wspace=0.35)
+OUTPUT_PNG = 'Final_Polished_ABS_Dashboard.png'
 
 # Professional color schemes
 colors_main = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22']
 colors_status = {'已发行': '#1f77b4', '已申报': '#ff7f0e'}
 colors_green = ['#d62728', '#2ca02c']
 
-# Calculate key statistics
-total_scale = df['拟发行金额(亿元)'].sum()
-total_products = len(df)
-avg_scale = df['拟发行金额(亿元)'].mean()
-issued_products = len(df[df['状态'] == '已发行'])
-pending_products = len(df[df['状态'] == '已申报'])
-green_ratio = df['绿色认证'].mean() * 100
+
+def compute_aggregates(df, cube=None):
+    """Compute every statistic and table the panels need from the classified frame.
+
+    The frame needs the 资产类型 and 绿色认证 columns; it is not modified.
+    All grouped tables are rolled up from one AggregateCube pass (pass a
+    prebuilt cube to reuse it); only the row-level views read df directly.
+    Processing-time statistics come from the cube's quantile sketches, so a
+    persisted cube serves them without rescanning the dates.
+    """
+    cube = build_cube(df) if cube is None else cube
+    is_issued = (df['状态'] == '已发行').to_numpy()
+    is_pending = (df['状态'] == '已申报').to_numpy()
+
+    by_asset = cube.rollup('资产类型')
+    asset_stats = by_asset[['sum', 'count']].round(2)
+    asset_stats.columns = ['总规模', '产品数量']
+
+    by_underwriter = cube.rollup('承销商/管理人')
+    underwriter_stats = by_underwriter[['sum', 'count']].round(2)
+    underwriter_stats.columns = ['总规模', '产品数量']
+
+    by_month = cube.rollup('申报月份')
+
+    # Filter the specialization matrix to the top underwriters
+    specialization_matrix = cube.crosstab('承销商/管理人', '资产类型', 'sum')
+    top_underwriters = by_underwriter['sum'].nlargest(8).index
+
+    asset_performance = pd.DataFrame({
+        '总规模': by_asset['sum'],
+        '平均规模': by_asset['sum'] / by_asset['count'],
+        '产品数量': by_asset['count'],
+    }).round(2)
+
+    total_products = cube.total('rows')
+
+    # Processing-time statistics need approval dates: the cube has no digests when the
+    # frame lacks 反馈/获批日期, and processing_overall stays None while no row has one
+    processing = dict.fromkeys(['processing_time', 'processing_overall',
+                                'processing_by_asset', 'processing_by_underwriter'])
+    if cube.digests:
+        overall = cube.percentiles()
+        processing = {
+            'processing_time': cube.digests['资产类型'].overall(),
+            'processing_overall': overall.iloc[0] if len(overall) else None,
+            'processing_by_asset': cube.percentiles('资产类型').sort_values('count', ascending=False, kind='stable'),
+            'processing_by_underwriter': cube.percentiles('承销商/管理人')
+            .sort_values('count', ascending=False, kind='stable').head(8),
+        }
+
+    return {
+        'total_scale': cube.total('sum'),
+        'total_products': total_products,
+        'avg_scale': cube.total('sum') / cube.total('count'),
+        'issued_products': cube.total('rows', {'状态': '已发行'}),
+        'pending_products': cube.total('rows', {'状态': '已申报'}),
+        'green_ratio': cube.total('rows', {'绿色认证': True}) / total_products * 100,
+        'total_pipeline': cube.total('sum', {'状态': '已申报'}),
+        'timeline': df[['申报日期', '拟发行金额(亿元)']],
+        'issued': df.loc[is_issued, ['申报日期', '拟发行金额(亿元)']],
+        'pending': df.loc[is_pending, ['申报日期', '拟发行金额(亿元)']],
+        'asset_stats': asset_stats.sort_values('总规模', ascending=False),
+        'underwriter_stats': underwriter_stats.sort_values('总规模', ascending=False).head(6),
+        'scale_dist': cube.rollup('规模区间')['rows'].reindex(cube.levels['规模区间'], fill_value=0),
+        'status_counts': cube.value_counts('状态'),
+        'status_green': cube.crosstab('状态', '绿色认证'),
+        'monthly_apps': by_month['rows'],
+        'monthly_scale': by_month['sum'],
+        **processing,
+        'specialization_matrix': specialization_matrix.loc[top_underwriters],
+        'top_projects': cube.top(8)[['ABS', '拟发行金额(亿元)', '状态']],
+        'asset_performance': asset_performance.sort_values('总规模', ascending=True),
+        'pipeline_by_type': cube.rollup('资产类型', {'状态': '已申报'})['sum'].sort_values(ascending=False),
+    }
+
 
 # 1. Title and Key Metrics Header (Improved spacing)
-ax_header = fig.add_subplot(gs[0, :])
-ax_header.axis('off')
-
-# Main title with better positioning
-ax_header.text(0.5, 0.75, '中国持有型不动产ABS市场深度分析仪表板', 
-               ha='center', va='center', fontsize=32, fontweight='bold', 
-               transform=ax_header.transAxes, color='#2c3e50')
-ax_header.text(0.5, 0.35, 'China Holding-Type Real Estate ABS Market Analysis Dashboard', 
-               ha='center', va='center', fontsize=18, fontweight='normal', 
-               transform=ax_header.transAxes, color='#7f8c8d')
-
-# Key metrics boxes with precise positioning
-metrics = [
-    ('总规模\nTotal Scale', f'{total_scale:.1f}亿元', '#1f77b4'),
-    ('产品数量\nProducts', f'{total_products}只', '#ff7f0e'),
-    ('平均规模\nAverage', f'{avg_scale:.1f}亿元', '#2ca02c'),
-    ('已发行\nIssued', f'{issued_products}只', '#d62728'),
-    ('申报中\nPending', f'{pending_products}只', '#9467bd'),
-    ('绿色认证率\nGreen Rate', f'{green_ratio:.1f}%', '#8c564b')
-]
-
-for i, (label, value, color) in enumerate(metrics):
-    x_pos = 0.08 + i * 0.14
-    bbox = dict(boxstyle="round,pad=0.015", facecolor=color, alpha=0.15, edgecolor=color, linewidth=1.5)
-    ax_header.text(x_pos, 0.05, f'{value}\n{label}', ha='center', va='center', 
-                   fontsize=11, fontweight='bold', transform=ax_header.transAxes,
-                   bbox=bbox, color=color)
+def panel_header(agg, ax):
+    ax.axis('off')
+
+    # Main title with better positioning
+    ax.text(0.5, 0.75, '中国持有型不动产ABS市场深度分析仪表板',
+            ha='center', va='center', fontsize=32, fontweight='bold',
+            transform=ax.transAxes, color='#2c3e50')
+    ax.text(0.5, 0.35, 'China Holding-Type Real Estate ABS Market Analysis Dashboard',
+            ha='center', va='center', fontsize=18, fontweight='normal',
+            transform=ax.transAxes, color='#7f8c8d')
+
+    # Key metrics boxes with precise positioning
+    metrics = [
+        ('总规模\nTotal Scale', f"{agg['total_scale']:.1f}亿元", '#1f77b4'),
+        ('产品数量\nProducts', f"{agg['total_products']}只", '#ff7f0e'),
+        ('平均规模\nAverage', f"{agg['avg_scale']:.1f}亿元", '#2ca02c'),
+        ('已发行\nIssued', f"{agg['issued_products']}只", '#d62728'),
+        ('申报中\nPending', f"{agg['pending_products']}只", '#9467bd'),
+        ('绿色认证率\nGreen Rate', f"{agg['green_ratio']:.1f}%", '#8c564b')
+    ]
+
+    for i, (label, value, color) in enumerate(metrics):
+        x_pos = 0.08 + i * 0.14
+        bbox = dict(boxstyle="round,pad=0.015", facecolor=color, alpha=0.15, edgecolor=color, linewidth=1.5)
+        ax.text(x_pos, 0.05, f'{value}\n{label}', ha='center', va='center',
+                fontsize=11, fontweight='bold', transform=ax.transAxes,
+                bbox=bbox, color=color)
+    return ax
+
 
 # 2. Market Timeline (Improved with better spacing)
-ax1 = fig.add_subplot(gs[1, :])
-issued_df = df[df['状态'] == '已发行'].copy()
-pending_df = df[df['状态'] == '已申报'].copy()
-
-# Timeline plot with controlled sizing
-scatter1 = ax1.scatter(issued_df['申报日期'], issued_df['拟发行金额(亿元)'], 
-                      c='#1f77b4', s=issued_df['拟发行金额(亿元)']*6, alpha=0.7, 
-                      label='已发行产品', edgecolors='white', linewidth=1.5, zorder=3)
-scatter2 = ax1.scatter(pending_df['申报日期'], pending_df['拟发行金额(亿元)'], 
-                      c='#ff7f0e', s=pending_df['拟发行金额(亿元)']*6, alpha=0.7, 
-                      label='申报中产品', edgecolors='white', linewidth=1.5, zorder=3)
-
-ax1.set_title('持有型不动产ABS市场发展时间轴\nHolding-Type Real Estate ABS Market Timeline', 
-              fontsize=15, fontweight='bold', pad=25, color='#2c3e50')
-ax1.set_xlabel('申报日期 Application Date', fontsize=12, fontweight='bold', color='#34495e')
-ax1.set_ylabel('发行规模 (亿元)\nIssuance Scale (100M RMB)', fontsize=12, fontweight='bold', color='#34495e')
-ax1.legend(fontsize=11, loc='upper left', frameon=True, fancybox=True, shadow=True, framealpha=0.9)
-ax1.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
-
-# Format x-axis with better spacing
-ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=4))
-plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right', fontsize=10)
-
-# Add trend line
-if len(df) > 1:
-    z = np.polyfit(mdates.date2num(df['申报日期']), df['拟发行金额(亿元)'], 1)
-    p = np.poly1d(z)
-    ax1.plot(df['申报日期'], p(mdates.date2num(df['申报日期'])), 
-             "r--", alpha=0.6, linewidth=2, label='趋势线', zorder=2)
-
-# Set y-axis limits with padding
-ax1.set_ylim(0, df['拟发行金额(亿元)'].max() * 1.1)
+def panel_timeline(agg, ax):
+    issued_df = agg['issued']
+    pending_df = agg['pending']
+    timeline = agg['timeline']
+
+    if len(issued_df) + len(pending_df) > DENSITY_THRESHOLD:
+        # Too many deals for one marker each: bin them into a date x scale density image
+        draw_density(ax, [(issued_df['申报日期'], issued_df['拟发行金额(亿元)'], '#1f77b4', '已发行产品'),
+                          (pending_df['申报日期'], pending_df['拟发行金额(亿元)'], '#ff7f0e', '申报中产品')])
+    else:
+        # Timeline plot with controlled sizing
+        ax.scatter(issued_df['申报日期'], issued_df['拟发行金额(亿元)'],
+                   c='#1f77b4', s=issued_df['拟发行金额(亿元)']*6, alpha=0.7,
+                   label='已发行产品', edgecolors='white', linewidth=1.5, zorder=3)
+        ax.scatter(pending_df['申报日期'], pending_df['拟发行金额(亿元)'],
+                   c='#ff7f0e', s=pending_df['拟发行金额(亿元)']*6, alpha=0.7,
+                   label='申报中产品', edgecolors='white', linewidth=1.5, zorder=3)
+
+    ax.set_title('持有型不动产ABS市场发展时间轴\nHolding-Type Real Estate ABS Market Timeline',
+                 fontsize=15, fontweight='bold', pad=25, color='#2c3e50')
+    ax.set_xlabel('申报日期 Application Date', fontsize=12, fontweight='bold', color='#34495e')
+    ax.set_ylabel('发行规模 (亿元)\nIssuance Scale (100M RMB)', fontsize=12, fontweight='bold', color='#34495e')
+    ax.legend(fontsize=11, loc='upper left', frameon=True, fancybox=True, shadow=True, framealpha=0.9)
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
+
+    # Format x-axis with better spacing
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=4))
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right', fontsize=10)
+
+    # Add trend line
+    if len(timeline) > 1:
+        z = np.polyfit(mdates.date2num(timeline['申报日期']), timeline['拟发行金额(亿元)'], 1)
+        p = np.poly1d(z)
+        ax.plot(timeline['申报日期'], p(mdates.date2num(timeline['申报日期'])),
+                "r--", alpha=0.6, linewidth=2, label='趋势线', zorder=2)
+
+    # Set y-axis limits with padding
+    ax.set_ylim(0, timeline['拟发行金额(亿元)'].max() * 1.1)
+    return ax
+
 
 # 3. Asset Type Distribution (Improved pie chart)
-ax2 = fig.add_subplot(gs[2, 0])
-asset_stats = df.groupby('资产类型').agg({
-    '拟发行金额(亿元)': ['sum', 'count']
-}).round(2)
-asset_stats.columns = ['总规模', '产品数量']
-asset_stats = asset_stats.sort_values('总规模', ascending=False)
-
-# Create pie chart with controlled text positioning
-wedges, texts, autotexts = ax2.pie(asset_stats['总规模'], labels=None, 
-                                  autopct='%1.1f%%', colors=colors_main, startangle=90,
-                                  pctdistance=0.8, labeldistance=1.15, 
-                                  textprops={'fontsize': 9, 'fontweight': 'bold'})
-
-# Manually position labels to avoid overlap
-for i, (text, autotext) in enumerate(zip(texts, autotexts)):
-    autotext.set_color('white')
-    autotext.set_fontweight('bold')
-    autotext.set_fontsize(8)
-
-# Add legend instead of direct labels
-ax2.legend(wedges, asset_stats.index, title="资产类型", loc="center left", 
-          bbox_to_anchor=(1, 0, 0.5, 1), fontsize=9)
-ax2.set_title('资产类型分布\nAsset Type Distribution', fontsize=13, fontweight='bold', 
-              pad=20, color='#2c3e50')
+def panel_asset_pie(agg, ax):
+    asset_stats = agg['asset_stats']
+
+    # Create pie chart with controlled text positioning
+    wedges, texts, autotexts = ax.pie(asset_stats['总规模'], labels=None,
+                                      autopct='%1.1f%%', colors=colors_main, startangle=90,
+                                      pctdistance=0.8, labeldistance=1.15,
+                                      textprops={'fontsize': 9, 'fontweight': 'bold'})
+
+    # Manually position labels to avoid overlap
+    for i, (text, autotext) in enumerate(zip(texts, autotexts)):
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+        autotext.set_fontsize(8)
+
+    # Add legend instead of direct labels
+    ax.legend(wedges, asset_stats.index, title="资产类型", loc="center left",
+              bbox_to_anchor=(1, 0, 0.5, 1), fontsize=9)
+    ax.set_title('资产类型分布\nAsset Type Distribution', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    return ax
+
 
 # 4. Underwriter Market Share (Fixed bar positioning)
-ax3 = fig.add_subplot(gs[2, 1])
-underwriter_stats = df.groupby('承销商/管理人').agg({
-    '拟发行金额(亿元)': ['sum', 'count']
-}).round(2)
-underwriter_stats.columns = ['总规模', '产品数量']
-underwriter_stats = underwriter_stats.sort_values('总规模', ascending=False).head(6)
-
-bars = ax3.bar(range(len(underwriter_stats)), underwriter_stats['总规模'], 
-               color=colors_main[:len(underwriter_stats)], alpha=0.8, 
-               edgecolor='white', linewidth=1.5, width=0.7)
-
-ax3.set_title('承销商市场份额\nUnderwriter Market Share', fontsize=13, fontweight='bold', 
-              pad=20, color='#2c3e50')
-ax3.set_ylabel('发行规模 (亿元)', fontsize=11, fontweight='bold', color='#34495e')
-ax3.set_xticks(range(len(underwriter_stats)))
-ax3.set_xticklabels([name[:6] + '..' if len(name) > 6 else name for name in underwriter_stats.index], 
-                   rotation=45, ha='right', fontsize=9, fontweight='bold')
-ax3.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
-
-# Add value labels with controlled positioning
-max_height = underwriter_stats['总规模'].max()
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    ax3.text(bar.get_x() + bar.get_width()/2., height + max_height*0.02,
-             f'{height:.1f}', ha='center', va='bottom', fontsize=9, fontweight='bold')
-
-# Set y-axis limits
-ax3.set_ylim(0, max_height * 1.15)
+def panel_underwriter_share(agg, ax):
+    underwriter_stats = agg['underwriter_stats']
+
+    bars = ax.bar(range(len(underwriter_stats)), underwriter_stats['总规模'],
+                  color=colors_main[:len(underwriter_stats)], alpha=0.8,
+                  edgecolor='white', linewidth=1.5, width=0.7)
+
+    ax.set_title('承销商市场份额\nUnderwriter Market Share', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    ax.set_ylabel('发行规模 (亿元)', fontsize=11, fontweight='bold', color='#34495e')
+    ax.set_xticks(range(len(underwriter_stats)))
+    ax.set_xticklabels([name[:6] + '..' if len(name) > 6 else name for name in underwriter_stats.index],
+                       rotation=45, ha='right', fontsize=9, fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+
+    # Add value labels with controlled positioning
+    max_height = underwriter_stats['总规模'].max()
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + max_height*0.02,
+                f'{height:.1f}', ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+    # Set y-axis limits
+    ax.set_ylim(0, max_height * 1.15)
+    return ax
+
 
 # 5. Scale Distribution Analysis (Improved)
-ax4 = fig.add_subplot(gs[2, 2])
-scale_bins = [0, 10, 20, 30, 60]
-scale_labels = ['<10亿', '10-20亿', '20-30亿', '>30亿']
-df['规模区间'] = pd.cut(df['拟发行金额(亿元)'], bins=scale_bins, labels=scale_labels, include_lowest=True)
-
-scale_dist = df['规模区间'].value_counts().sort_index()
-bars = ax4.bar(scale_dist.index, scale_dist.values, color=colors_main[:len(scale_dist)], 
-               alpha=0.8, edgecolor='white', linewidth=1.5, width=0.6)
-
-ax4.set_title('发行规模分布\nIssuance Scale Distribution', fontsize=13, fontweight='bold', 
-              pad=20, color='#2c3e50')
-ax4.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
-ax4.set_xlabel('规模区间 (亿元)', fontsize=11, fontweight='bold', color='#34495e')
-ax4.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
-
-# Add value labels
-max_count = scale_dist.max()
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    ax4.text(bar.get_x() + bar.get_width()/2., height + max_count*0.05,
-             f'{int(height)}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-
-ax4.set_ylim(0, max_count * 1.2)
+def panel_scale_distribution(agg, ax):
+    scale_dist = agg['scale_dist']
+    bars = ax.bar(scale_dist.index, scale_dist.values, color=colors_main[:len(scale_dist)],
+                  alpha=0.8, edgecolor='white', linewidth=1.5, width=0.6)
+
+    ax.set_title('发行规模分布\nIssuance Scale Distribution', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    ax.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
+    ax.set_xlabel('规模区间 (亿元)', fontsize=11, fontweight='bold', color='#34495e')
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+
+    # Add value labels
+    max_count = scale_dist.max()
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + max_count*0.05,
+                f'{int(height)}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    ax.set_ylim(0, max_count * 1.2)
+    return ax
+
 
 # 6. Project Status Analysis (Improved)
-ax5 = fig.add_subplot(gs[2, 3])
-status_counts = df['状态'].value_counts()
-bars = ax5.bar(status_counts.index, status_counts.values, 
-               color=[colors_status[status] for status in status_counts.index],
-               alpha=0.8, edgecolor='white', linewidth=1.5, width=0.5)
-
-ax5.set_title('项目状态分布\nProject Status Distribution', fontsize=13, fontweight='bold', 
-              pad=20, color='#2c3e50')
-ax5.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
-ax5.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
-
-# Add value labels
-max_status = status_counts.max()
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    ax5.text(bar.get_x() + bar.get_width()/2., height + max_status*0.05,
-             f'{int(height)}', ha='center', va='bottom', fontsize=11, fontweight='bold')
-
-ax5.set_ylim(0, max_status * 1.2)
+def panel_status(agg, ax):
+    status_counts = agg['status_counts']
+    bars = ax.bar(status_counts.index, status_counts.values,
+                  color=[colors_status[status] for status in status_counts.index],
+                  alpha=0.8, edgecolor='white', linewidth=1.5, width=0.5)
+
+    ax.set_title('项目状态分布\nProject Status Distribution', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    ax.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+
+    # Add value labels
+    max_status = status_counts.max()
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + max_status*0.05,
+                f'{int(height)}', ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    ax.set_ylim(0, max_status * 1.2)
+    return ax
+
 
 # 7. Green Certification Analysis (Improved)
-ax6 = fig.add_subplot(gs[3, 0])
-status_green = pd.crosstab(df['状态'], df['绿色认证'])
-status_green.plot(kind='bar', ax=ax6, color=colors_green, width=0.6, 
-                 alpha=0.8, edgecolor='white', linewidth=1.5)
-ax6.set_title('项目状态与绿色认证\nProject Status & Green Certification', 
-              fontsize=13, fontweight='bold', pad=20, color='#2c3e50')
-ax6.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
-ax6.set_xlabel('项目状态', fontsize=11, fontweight='bold', color='#34495e')
-ax6.legend(['非绿色', '绿色/碳中和'], fontsize=10, loc='upper right', framealpha=0.9)
-ax6.tick_params(axis='x', rotation=0)
-ax6.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+def panel_status_green(agg, ax):
+    agg['status_green'].plot(kind='bar', ax=ax, color=colors_green, width=0.6,
+                             alpha=0.8, edgecolor='white', linewidth=1.5)
+    ax.set_title('项目状态与绿色认证\nProject Status & Green Certification',
+                 fontsize=13, fontweight='bold', pad=20, color='#2c3e50')
+    ax.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
+    ax.set_xlabel('项目状态', fontsize=11, fontweight='bold', color='#34495e')
+    ax.legend(['非绿色', '绿色/碳中和'], fontsize=10, loc='upper right', framealpha=0.9)
+    ax.tick_params(axis='x', rotation=0)
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+    return ax
+
 
 # 8. Monthly Application Trends (Improved with better spacing)
-ax7 = fig.add_subplot(gs[3, 1:3])
-df['申报年月'] = df['申报日期'].dt.to_period('M')
-monthly_apps = df.groupby('申报年月').size()
-monthly_scale = df.groupby('申报年月')['拟发行金额(亿元)'].sum()
-
-ax7_twin = ax7.twinx()
-line1 = ax7.plot(monthly_apps.index.astype(str), monthly_apps.values, 
-                 'o-', color='#1f77b4', linewidth=3, markersize=7, label='申报数量',
+def panel_monthly_trends(agg, ax):
+    monthly_apps = agg['monthly_apps']
+    monthly_scale = agg['monthly_scale']
+
+    ax_twin = ax.twinx()
+    ax.plot(monthly_apps.index.astype(str), monthly_apps.values,
+            'o-', color='#1f77b4', linewidth=3, markersize=7, label='申报数量',
+            markerfacecolor='white', markeredgewidth=2, zorder=3)
+    ax_twin.plot(monthly_scale.index.astype(str), monthly_scale.values,
+                 's-', color='#ff7f0e', linewidth=3, markersize=7, label='申报规模',
                  markerfacecolor='white', markeredgewidth=2, zorder=3)
-line2 = ax7_twin.plot(monthly_scale.index.astype(str), monthly_scale.values, 
-                      's-', color='#ff7f0e', linewidth=3, markersize=7, label='申报规模',
-                      markerfacecolor='white', markeredgewidth=2, zorder=3)
-
-ax7.set_title('月度申报趋势\nMonthly Application Trends', fontsize=13, fontweight='bold', 
-              pad=20, color='#2c3e50')
-ax7.set_ylabel('申报数量', color='#1f77b4', fontsize=11, fontweight='bold')
-ax7_twin.set_ylabel('申报规模 (亿元)', color='#ff7f0e', fontsize=11, fontweight='bold')
-ax7.tick_params(axis='x', rotation=45, labelsize=9)
-ax7.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
-
-# Combine legends with better positioning
-lines1, labels1 = ax7.get_legend_handles_labels()
-lines2, labels2 = ax7_twin.get_legend_handles_labels()
-ax7.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=10, framealpha=0.9)
+
+    ax.set_title('月度申报趋势\nMonthly Application Trends', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    ax.set_ylabel('申报数量', color='#1f77b4', fontsize=11, fontweight='bold')
+    ax_twin.set_ylabel('申报规模 (亿元)', color='#ff7f0e', fontsize=11, fontweight='bold')
+    ax.tick_params(axis='x', rotation=45, labelsize=9)
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
+
+    # Combine legends with better positioning
+    lines1, labels1 = ax.get_legend_handles_labels()
+    lines2, labels2 = ax_twin.get_legend_handles_labels()
+    ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=10, framealpha=0.9)
+    return ax
+
 
 # 9. Processing Time Analysis (Improved)
-ax8 = fig.add_subplot(gs[3, 3])
-df['处理天数'] = (df['反馈/获批日期'] - df['申报日期']).dt.days
-processing_time = df[df['处理天数'].notna()]['处理天数']
-
-n, bins, patches = ax8.hist(processing_time, bins=6, color='#2ca02c', alpha=0.7, 
-                           edgecolor='white', linewidth=1.5)
-ax8.axvline(processing_time.mean(), color='red', linestyle='--', linewidth=2, 
-           label=f'平均: {processing_time.mean():.0f}天', zorder=3)
-ax8.set_title('审批处理时间分布\nApproval Processing Time', fontsize=13, fontweight='bold', 
-              pad=20, color='#2c3e50')
-ax8.set_xlabel('处理天数', fontsize=11, fontweight='bold', color='#34495e')
-ax8.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
-ax8.legend(fontsize=10, framealpha=0.9)
-ax8.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+def panel_processing_time(agg, ax):
+    # Histogram of the sketch centroids weighted by their counts (exact while every value is its own centroid)
+    digest = agg['processing_time']
+    overall = agg['processing_overall']
+
+    if digest is not None:
+        # The exact min/max only bound the bins when the sketch holds any values
+        bounds = {'range': (digest.minimum[0], digest.maximum[0])} if digest.weights.sum() > 0 else {}
+        ax.hist(digest.means, weights=digest.weights, bins=6, **bounds,
+                color='#2ca02c', alpha=0.7, edgecolor='white', linewidth=1.5)
+    if overall is None:
+        ax.text(0.5, 0.5, '暂无数据\nNo data', transform=ax.transAxes, ha='center', va='center',
+                fontsize=14, color='#7f8c8d')
+    else:
+        ax.axvline(overall['mean'], color='red', linestyle='--', linewidth=2,
+                   label=f"平均: {overall['mean']:.0f}天", zorder=3)
+        ax.axvline(overall['p90'], color='#8e44ad', linestyle=':', linewidth=2,
+                   label=f"P90: {overall['p90']:.0f}天", zorder=3)
+        ax.legend(fontsize=10, framealpha=0.9)
+    ax.set_title('审批处理时间分布\nApproval Processing Time', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    ax.set_xlabel('处理天数', fontsize=11, fontweight='bold', color='#34495e')
+    ax.set_ylabel('产品数量', fontsize=11, fontweight='bold', color='#34495e')
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+    return ax
+
+
+# 9b. Processing Time Percentiles by Asset Type and Underwriter
+def panel_processing_percentiles(agg, ax):
+    ax.axis('off')
+    # Title and tables sit below the top of the slot, clear of the rotated pipeline tick labels above
+    ax.set_title('审批处理天数分位数\nProcessing Time Percentiles (days)', fontsize=15, fontweight='bold',
+                 y=0.84, pad=0, color='#2c3e50')
+
+    if agg['processing_overall'] is None:
+        ax.text(0.5, 0.4, '暂无数据\nNo data', transform=ax.transAxes, ha='center', va='center',
+                fontsize=14, color='#7f8c8d')
+        return ax
+
+    columns = ['项目数', '平均', 'P50', 'P90', 'P99']
+    for table, bbox, header_color in ((agg['processing_by_asset'], [0.0, 0.0, 0.47, 0.76], '#1f77b4'),
+                                      (agg['processing_by_underwriter'], [0.53, 0.0, 0.47, 0.76], '#ff7f0e')):
+        cells = [[f'{row.count:d}', f'{row.mean:.0f}', f'{row.p50:.0f}', f'{row.p90:.0f}', f'{row.p99:.0f}']
+                 for row in table.itertuples()]
+        rendered = ax.table(cellText=cells, rowLabels=list(table.index), colLabels=columns,
+                            cellLoc='center', bbox=bbox)
+        rendered.auto_set_font_size(False)
+        rendered.set_fontsize(10)
+        for (row, col), cell in rendered.get_celld().items():
+            cell.set_edgecolor('#d5dbdb')
+            if row == 0:
+                cell.set_facecolor(header_color)
+                cell.set_text_props(color='white', fontweight='bold')
+            elif col == -1:
+                cell.set_text_props(fontweight='bold')
+    return ax
+
 
 # 10. Underwriter Specialization Matrix (Improved)
-ax9 = fig.add_subplot(gs[4, :])
-specialization_matrix = pd.crosstab(df['承销商/管理人'], df['资产类型'], 
-                                   values=df['拟发行金额(亿元)'], aggfunc='sum')
-specialization_matrix = specialization_matrix.fillna(0)
-
-# Filter to show top underwriters
-top_underwriters = df.groupby('承销商/管理人')['拟发行金额(亿元)'].sum().nlargest(8).index
-specialization_matrix = specialization_matrix.loc[top_underwriters]
-
-im = ax9.imshow(specialization_matrix.values, cmap='YlOrRd', aspect='auto', alpha=0.9)
-ax9.set_xticks(range(len(specialization_matrix.columns)))
-ax9.set_yticks(range(len(specialization_matrix.index)))
-ax9.set_xticklabels(specialization_matrix.columns, rotation=45, ha='right', 
-                   fontsize=11, fontweight='bold')
-ax9.set_yticklabels(specialization_matrix.index, fontsize=11, fontweight='bold')
-ax9.set_title('承销商专业化矩阵 (发行规模)\nUnderwriter Specialization Matrix (Issuance Scale)', 
-              fontsize=15, fontweight='bold', pad=35, color='#2c3e50')
-
-# Add text annotations with better formatting
-for i in range(len(specialization_matrix.index)):
-    for j in range(len(specialization_matrix.columns)):
-        value = specialization_matrix.iloc[i, j]
-        if value > 0:
-            ax9.text(j, i, f'{value:.1f}', ha='center', va='center', 
-                    color='white' if value > specialization_matrix.values.max()/2 else 'black',
-                    fontweight='bold', fontsize=10)
-
-# Add colorbar with better styling
-cbar = plt.colorbar(im, ax=ax9, shrink=0.8, pad=0.02, aspect=30)
-cbar.set_label('发行规模 (亿元)', fontsize=12, fontweight='bold')
+def panel_specialization(agg, ax):
+    specialization_matrix = agg['specialization_matrix']
+
+    im = ax.imshow(specialization_matrix.values, cmap='YlOrRd', aspect='auto', alpha=0.9)
+    ax.set_xticks(range(len(specialization_matrix.columns)))
+    ax.set_yticks(range(len(specialization_matrix.index)))
+    ax.set_xticklabels(specialization_matrix.columns, rotation=45, ha='right',
+                       fontsize=11, fontweight='bold')
+    ax.set_yticklabels(specialization_matrix.index, fontsize=11, fontweight='bold')
+    ax.set_title('承销商专业化矩阵 (发行规模)\nUnderwriter Specialization Matrix (Issuance Scale)',
+                 fontsize=15, fontweight='bold', pad=35, color='#2c3e50')
+
+    # Add text annotations with better formatting
+    for i in range(len(specialization_matrix.index)):
+        for j in range(len(specialization_matrix.columns)):
+            value = specialization_matrix.iloc[i, j]
+            if value > 0:
+                ax.text(j, i, f'{value:.1f}', ha='center', va='center',
+                        color='white' if value > specialization_matrix.values.max()/2 else 'black',
+                        fontweight='bold', fontsize=10)
+
+    # Add colorbar with better styling
+    cbar = ax.figure.colorbar(im, ax=ax, shrink=0.8, pad=0.02, aspect=30)
+    cbar.set_label('发行规模 (亿元)', fontsize=12, fontweight='bold')
+    return ax
 
-# 11. Top Projects by Scale (Fixed horizontal bar positioning)
-ax10 = fig.add_subplot(gs[5, :])
-top_projects = df.nlargest(8, '拟发行金额(亿元)')
-
-bars = ax10.barh(range(len(top_projects)), top_projects['拟发行金额(亿元)'], 
-                 color=[colors_status[status] for status in top_projects['状态']],
-                 alpha=0.8, edgecolor='white', linewidth=1.5, height=0.7)
-
-ax10.set_yticks(range(len(top_projects)))
-# Truncate long names properly
-project_names = []
-for name in top_projects['ABS']:
-    if len(name) > 40:
-        project_names.append(name[:37] + '...')
-    else:
-        project_names.append(name)
-
-ax10.set_yticklabels(project_names, fontsize=10, fontweight='bold')
-ax10.set_xlabel('发行规模 (亿元)', fontsize=12, fontweight='bold', color='#34495e')
-ax10.set_title('规模最大的8个项目\nTop 8 Projects by Scale', fontsize=15, fontweight='bold', 
-               pad=25, color='#2c3e50')
-ax10.grid(True, alpha=0.3, axis='x', linestyle='--', linewidth=0.8)
-
-# Add value labels with proper positioning (fixed the protrusion issue)
-max_width = top_projects['拟发行金额(亿元)'].max()
-for i, bar in enumerate(bars):
-    width = bar.get_width()
-    # Position labels inside the bars for better appearance
-    if width > max_width * 0.3:  # For longer bars, put text inside
-        ax10.text(width * 0.95, bar.get_y() + bar.get_height()/2,
-                  f'{width:.1f}亿', ha='right', va='center', fontsize=10, 
-                  fontweight='bold', color='white')
-    else:  # For shorter bars, put text outside but with controlled spacing
-        ax10.text(width + max_width*0.01, bar.get_y() + bar.get_height()/2,
-                  f'{width:.1f}亿', ha='left', va='center', fontsize=10, fontweight='bold')
-
-# Set x-axis limits to prevent text protrusion
-ax10.set_xlim(0, max_width * 1.1)
-
-# Add legend for status colors
-from matplotlib.patches import Patch
-legend_elements = [Patch(facecolor=colors_status['已发行'], label='已发行'),
-                   Patch(facecolor=colors_status['已申报'], label='申报中')]
-ax10.legend(handles=legend_elements, loc='lower right', fontsize=11, framealpha=0.9)
 
-# 12. Market Summary Statistics (Improved layout)
-ax11 = fig.add_subplot(gs[6, 0])
-ax11.axis('off')
+# 11. Top Projects by Scale (Fixed horizontal bar positioning)
+def panel_top_projects(agg, ax):
+    top_projects = agg['top_projects']
+
+    bars = ax.barh(range(len(top_projects)), top_projects['拟发行金额(亿元)'],
+                   color=[colors_status[status] for status in top_projects['状态']],
+                   alpha=0.8, edgecolor='white', linewidth=1.5, height=0.7)
+
+    ax.set_yticks(range(len(top_projects)))
+    # Truncate long names properly
+    project_names = []
+    for name in top_projects['ABS']:
+        if len(name) > 40:
+            project_names.append(name[:37] + '...')
+        else:
+            project_names.append(name)
+
+    ax.set_yticklabels(project_names, fontsize=10, fontweight='bold')
+    ax.set_xlabel('发行规模 (亿元)', fontsize=12, fontweight='bold', color='#34495e')
+    ax.set_title('规模最大的8个项目\nTop 8 Projects by Scale', fontsize=15, fontweight='bold',
+                 pad=25, color='#2c3e50')
+    ax.grid(True, alpha=0.3, axis='x', linestyle='--', linewidth=0.8)
+
+    # Add value labels with proper positioning (fixed the protrusion issue)
+    max_width = top_projects['拟发行金额(亿元)'].max()
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        # Position labels inside the bars for better appearance
+        if width > max_width * 0.3:  # For longer bars, put text inside
+            ax.text(width * 0.95, bar.get_y() + bar.get_height()/2,
+                    f'{width:.1f}亿', ha='right', va='center', fontsize=10,
+                    fontweight='bold', color='white')
+        else:  # For shorter bars, put text outside but with controlled spacing
+            ax.text(width + max_width*0.01, bar.get_y() + bar.get_height()/2,
+                    f'{width:.1f}亿', ha='left', va='center', fontsize=10, fontweight='bold')
+
+    # Set x-axis limits to prevent text protrusion
+    ax.set_xlim(0, max_width * 1.1)
+
+    # Add legend for status colors
+    legend_elements = [Patch(facecolor=colors_status['已发行'], label='已发行'),
+                       Patch(facecolor=colors_status['已申报'], label='申报中')]
+    ax.legend(handles=legend_elements, loc='lower right', fontsize=11, framealpha=0.9)
+    return ax
 
-pipeline_df = df[df['状态'] == '已申报'].copy()
-total_pipeline = pipeline_df['拟发行金额(亿元)'].sum()
 
-stats_text = f"""市场概况统计
+# 12. Market Summary Statistics (Improved layout)
+def panel_summary(agg, ax):
+    ax.axis('off')
+
+    total_scale = agg['total_scale']
+    total_products = agg['total_products']
+    avg_scale = agg['avg_scale']
+    issued_products = agg['issued_products']
+    pending_products = agg['pending_products']
+    green_ratio = agg['green_ratio']
+    total_pipeline = agg['total_pipeline']
+
+    stats_text = f"""市场概况统计
 Market Overview
 
 📊 总发行规模: {total_scale:.1f} 亿元
@@ -397,49 +481,49 @@ Market Overview
 🚀 申报中管道: {total_pipeline:.1f} 亿元
    Pipeline: {total_pipeline:.1f}B RMB"""
 
-ax11.text(0.05, 0.95, stats_text, transform=ax11.transAxes, fontsize=10,
-         verticalalignment='top', fontweight='bold',
-         bbox=dict(boxstyle="round,pad=0.4", facecolor='lightblue', alpha=0.8, 
-                  edgecolor='#1f77b4', linewidth=1.5))
+    ax.text(0.05, 0.95, stats_text, transform=ax.transAxes, fontsize=10,
+            verticalalignment='top', fontweight='bold',
+            bbox=dict(boxstyle="round,pad=0.4", facecolor='lightblue', alpha=0.8,
+                      edgecolor='#1f77b4', linewidth=1.5))
+    return ax
+
 
 # 13. Asset Type Performance (Fixed horizontal bar chart)
-ax12 = fig.add_subplot(gs[6, 1:3])
-asset_performance = df.groupby('资产类型').agg({
-    '拟发行金额(亿元)': ['sum', 'mean', 'count']
-}).round(2)
-asset_performance.columns = ['总规模', '平均规模', '产品数量']
-asset_performance = asset_performance.sort_values('总规模', ascending=True)
-
-bars = ax12.barh(range(len(asset_performance)), asset_performance['总规模'], 
-                 color=colors_main[:len(asset_performance)], alpha=0.8,
-                 edgecolor='white', linewidth=1.5, height=0.7)
-
-ax12.set_yticks(range(len(asset_performance)))
-ax12.set_yticklabels(asset_performance.index, fontsize=11, fontweight='bold')
-ax12.set_xlabel('总规模 (亿元)', fontsize=12, fontweight='bold', color='#34495e')
-ax12.set_title('资产类型规模排名\nAsset Type Scale Ranking', fontsize=13, fontweight='bold', 
-               pad=20, color='#2c3e50')
-ax12.grid(True, alpha=0.3, axis='x', linestyle='--', linewidth=0.8)
-
-# Add value labels with proper positioning
-max_asset_width = asset_performance['总规模'].max()
-for i, bar in enumerate(bars):
-    width = bar.get_width()
-    if width > max_asset_width * 0.3:
-        ax12.text(width * 0.95, bar.get_y() + bar.get_height()/2,
-                  f'{width:.1f}亿', ha='right', va='center', fontsize=10, 
-                  fontweight='bold', color='white')
-    else:
-        ax12.text(width + max_asset_width*0.01, bar.get_y() + bar.get_height()/2,
-                  f'{width:.1f}亿', ha='left', va='center', fontsize=10, fontweight='bold')
+def panel_asset_ranking(agg, ax):
+    asset_performance = agg['asset_performance']
+
+    bars = ax.barh(range(len(asset_performance)), asset_performance['总规模'],
+                   color=colors_main[:len(asset_performance)], alpha=0.8,
+                   edgecolor='white', linewidth=1.5, height=0.7)
+
+    ax.set_yticks(range(len(asset_performance)))
+    ax.set_yticklabels(asset_performance.index, fontsize=11, fontweight='bold')
+    ax.set_xlabel('总规模 (亿元)', fontsize=12, fontweight='bold', color='#34495e')
+    ax.set_title('资产类型规模排名\nAsset Type Scale Ranking', fontsize=13, fontweight='bold',
+                 pad=20, color='#2c3e50')
+    ax.grid(True, alpha=0.3, axis='x', linestyle='--', linewidth=0.8)
+
+    # Add value labels with proper positioning
+    max_asset_width = asset_performance['总规模'].max()
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        if width > max_asset_width * 0.3:
+            ax.text(width * 0.95, bar.get_y() + bar.get_height()/2,
+                    f'{width:.1f}亿', ha='right', va='center', fontsize=10,
+                    fontweight='bold', color='white')
+        else:
+            ax.text(width + max_asset_width*0.01, bar.get_y() + bar.get_height()/2,
+                    f'{width:.1f}亿', ha='left', va='center', fontsize=10, fontweight='bold')
+
+    ax.set_xlim(0, max_asset_width * 1.1)
+    return ax
 
-ax12.set_xlim(0, max_asset_width * 1.1)
 
 # 14. Market Insights (Improved layout)
-ax13 = fig.add_subplot(gs[6, 3])
-ax13.axis('off')
+def panel_insights(agg, ax):
+    ax.axis('off')
 
-insights_text = """市场洞察
+    insights_text = """市场洞察
 Market Insights
 
 🏗️ 基础设施主导
@@ -466,72 +550,152 @@ Market Insights
    Strong Pipeline
    146.2亿元待发行"""
 
-ax13.text(0.05, 0.95, insights_text, transform=ax13.transAxes, fontsize=9,
-         verticalalignment='top', fontweight='bold',
-         bbox=dict(boxstyle="round,pad=0.4", facecolor='lightyellow', alpha=0.8, 
-                  edgecolor='#ff7f0e', linewidth=1.5))
+    ax.text(0.05, 0.95, insights_text, transform=ax.transAxes, fontsize=9,
+            verticalalignment='top', fontweight='bold',
+            bbox=dict(boxstyle="round,pad=0.4", facecolor='lightyellow', alpha=0.8,
+                      edgecolor='#ff7f0e', linewidth=1.5))
+    return ax
+
 
 # 15. Future Pipeline Analysis (Improved)
-ax14 = fig.add_subplot(gs[7:, :])
-pipeline_by_type = pipeline_df.groupby('资产类型')['拟发行金额(亿元)'].sum().sort_values(ascending=False)
-
-bars = ax14.bar(range(len(pipeline_by_type)), pipeline_by_type.values, 
-                color=colors_main[:len(pipeline_by_type)], alpha=0.8,
-                edgecolor='white', linewidth=1.5, width=0.7)
-
-ax14.set_title('申报中项目管道分析 (按资产类型)\nPending Projects Pipeline Analysis by Asset Type', 
-               fontsize=15, fontweight='bold', pad=35, color='#2c3e50')
-ax14.set_ylabel('申报规模 (亿元)', fontsize=12, fontweight='bold', color='#34495e')
-ax14.set_xticks(range(len(pipeline_by_type)))
-ax14.set_xticklabels(pipeline_by_type.index, rotation=45, ha='right', 
-                    fontsize=12, fontweight='bold')
-ax14.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
-
-# Add value labels with better positioning
-max_pipeline_height = pipeline_by_type.max()
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    ax14.text(bar.get_x() + bar.get_width()/2., height + max_pipeline_height*0.02,
-              f'{height:.1f}', ha='center', va='bottom', fontsize=12, fontweight='bold')
-
-ax14.set_ylim(0, max_pipeline_height * 1.15)
-
-# Add total pipeline value with better styling
-ax14.text(0.02, 0.95, f'申报中总规模: {total_pipeline:.1f} 亿元\nTotal Pipeline: {total_pipeline:.1f} billion RMB', 
-          transform=ax14.transAxes, fontsize=13, fontweight='bold',
-          verticalalignment='top', 
-          bbox=dict(boxstyle="round,pad=0.4", facecolor='yellow', alpha=0.9, 
-                   edgecolor='orange', linewidth=2))
-
-# Final styling improvements
-plt.suptitle('', fontsize=1)  # Remove default suptitle
-
-# Adjust layout with precise control
-plt.tight_layout()
-plt.subplots_adjust(top=0.97, bottom=0.03, left=0.05, right=0.95, hspace=0.5, wspace=0.35)
-
-# Save with high quality
-plt.savefig('Final_Polished_ABS_Dashboard.png', dpi=300, bbox_inches='tight', 
-            facecolor='white', edgecolor='none', pad_inches=0.3)
-plt.show()
-
-# Generate summary statistics
-print("=== 最终优化版市场分析摘要 Final Polished Market Analysis Summary ===")
-print(f"总发行规模: {total_scale:.1f} 亿元 (Total Scale: {total_scale:.1f} billion RMB)")
-print(f"产品总数: {total_products} 只 (Total Products: {total_products})")
-print(f"已发行: {issued_products} 只, 申报中: {pending_products} 只")
-print(f"平均规模: {avg_scale:.1f} 亿元 (Average Scale: {avg_scale:.1f} billion RMB)")
-print(f"绿色认证比例: {green_ratio:.1f}% (Green Certification Rate: {green_ratio:.1f}%)")
-print(f"申报中管道规模: {total_pipeline:.1f} 亿元 (Pipeline Scale: {total_pipeline:.1f} billion RMB)")
-
-print("\n=== 最终版本改进说明 Final Version Improvements ===")
-print("✅ 完全解决文本重叠问题 - Completely fixed text overlapping issues")
-print("✅ 修复条形图标签突出问题 - Fixed bar label protrusion issues") 
-print("✅ 优化图表间距和布局 - Optimized chart spacing and layout")
-print("✅ 统一专业色彩方案 - Unified professional color scheme")
-print("✅ 精确控制标签位置 - Precise label positioning control")
-print("✅ 改进图例和标题样式 - Improved legend and title styling")
-print("✅ 增强整体视觉层次 - Enhanced overall visual hierarchy")
-print("✅ 优化坐标轴限制 - Optimized axis limits")
-print("✅ 改进网格和边框样式 - Improved grid and border styling")
-print("✅ 确保所有文本清晰可读 - Ensured all text is clearly readable") 
\ No newline at end of file
+def panel_pipeline(agg, ax):
+    pipeline_by_type = agg['pipeline_by_type']
+    total_pipeline = agg['total_pipeline']
+
+    bars = ax.bar(range(len(pipeline_by_type)), pipeline_by_type.values,
+                  color=colors_main[:len(pipeline_by_type)], alpha=0.8,
+                  edgecolor='white', linewidth=1.5, width=0.7)
+
+    ax.set_title('申报中项目管道分析 (按资产类型)\nPending Projects Pipeline Analysis by Asset Type',
+                 fontsize=15, fontweight='bold', pad=35, color='#2c3e50')
+    ax.set_ylabel('申报规模 (亿元)', fontsize=12, fontweight='bold', color='#34495e')
+    ax.set_xticks(range(len(pipeline_by_type)))
+    ax.set_xticklabels(pipeline_by_type.index, rotation=45, ha='right',
+                       fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+
+    # Add value labels with better positioning
+    max_pipeline_height = pipeline_by_type.max()
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + max_pipeline_height*0.02,
+                f'{height:.1f}', ha='center', va='bottom', fontsize=12, fontweight='bold')
+
+    ax.set_ylim(0, max_pipeline_height * 1.15)
+
+    # Add total pipeline value with better styling
+    ax.text(0.02, 0.95, f'申报中总规模: {total_pipeline:.1f} 亿元\nTotal Pipeline: {total_pipeline:.1f} billion RMB',
+            transform=ax.transAxes, fontsize=13, fontweight='bold',
+            verticalalignment='top',
+            bbox=dict(boxstyle="round,pad=0.4", facecolor='yellow', alpha=0.9,
+                      edgecolor='orange', linewidth=2))
+    return ax
+
+
+# Panel name -> (draw function, (gridspec rows, gridspec columns)), in drawing order
+PANELS = {
+    'header': (panel_header, (0, slice(None))),
+    'timeline': (panel_timeline, (1, slice(None))),
+    'asset_pie': (panel_asset_pie, (2, 0)),
+    'underwriter_share': (panel_underwriter_share, (2, 1)),
+    'scale_distribution': (panel_scale_distribution, (2, 2)),
+    'status': (panel_status, (2, 3)),
+    'status_green': (panel_status_green, (3, 0)),
+    'monthly_trends': (panel_monthly_trends, (3, slice(1, 3))),
+    'processing_time': (panel_processing_time, (3, 3)),
+    'processing_percentiles': (panel_processing_percentiles, (9, slice(None))),
+    'specialization': (panel_specialization, (4, slice(None))),
+    'top_projects': (panel_top_projects, (5, slice(None))),
+    'summary': (panel_summary, (6, 0)),
+    'asset_ranking': (panel_asset_ranking, (6, slice(1, 3))),
+    'insights': (panel_insights, (6, 3)),
+    'pipeline': (panel_pipeline, (slice(7, 9), slice(None))),
+}
+
+
+def render_dashboard(df, panels=None, out=OUTPUT_PNG, aggregates=None, dpi=300, band_height=None):
+    """Render the dashboard (or only the named panels) and save it to out.
+
+    Panels not listed keep their grid slot empty so the layout does not shift.
+    Pass precomputed aggregates to skip recomputing them; out=None skips saving.
+    Saving also writes SVG/PDF and a thumbnail pyramid (see abs_export).
+    With band_height the PNG is rendered in horizontal bands of that many pixel
+    rows and streamed to disk, capping peak memory; the pixels are identical.
+    Returns the figure.
+    """
+    agg = compute_aggregates(df) if aggregates is None else aggregates
+    names = list(PANELS) if panels is None else list(panels)
+    unknown = [name for name in names if name not in PANELS]
+    if unknown:
+        raise ValueError(f'Unknown panels: {unknown}')
+
+    with plt.rc_context(RC_PARAMS):
+        # Create final polished dashboard with precise layout control
+        fig = plt.figure(figsize=(28, 40))
+        gs = fig.add_gridspec(10, 4, height_ratios=[0.6, 1.0, 1.2, 1.2, 1.8, 1.4, 1.2, 1.2, 1.6, 1.4],
+                              width_ratios=[1, 1, 1, 1], hspace=0.5, wspace=0.35)
+
+        for name in PANELS:
+            if name in names:
+                draw, (rows, cols) = PANELS[name]
+                draw(agg, fig.add_subplot(gs[rows, cols]))
+
+        # Final styling improvements
+        fig.suptitle('', fontsize=1)  # Remove default suptitle
+
+        # Adjust layout with precise control
+        fig.tight_layout()
+        fig.subplots_adjust(top=0.97, bottom=0.03, left=0.05, right=0.95, hspace=0.5, wspace=0.35)
+
+        # Save with high quality
+        if out:
+            export_figure(fig, out, band_height=band_height, dpi=dpi, bbox_inches='tight',
+                          facecolor='white', edgecolor='none', pad_inches=0.3)
+    return fig
+
+
+def print_summary(agg):
+    total_scale = agg['total_scale']
+    avg_scale = agg['avg_scale']
+    green_ratio = agg['green_ratio']
+    total_pipeline = agg['total_pipeline']
+
+    print("=== 最终优化版市场分析摘要 Final Polished Market Analysis Summary ===")
+    print(f"总发行规模: {total_scale:.1f} 亿元 (Total Scale: {total_scale:.1f} billion RMB)")
+    print(f"产品总数: {agg['total_products']} 只 (Total Products: {agg['total_products']})")
+    print(f"已发行: {agg['issued_products']} 只, 申报中: {agg['pending_products']} 只")
+    print(f"平均规模: {avg_scale:.1f} 亿元 (Average Scale: {avg_scale:.1f} billion RMB)")
+    print(f"绿色认证比例: {green_ratio:.1f}% (Green Certification Rate: {green_ratio:.1f}%)")
+    print(f"申报中管道规模: {total_pipeline:.1f} 亿元 (Pipeline Scale: {total_pipeline:.1f} billion RMB)")
+    overall = agg['processing_overall']
+    if overall is not None:
+        print(f"审批处理天数 P50/P90/P99: {overall['p50']:.0f}/{overall['p90']:.0f}/{overall['p99']:.0f} 天 "
+              f"(Processing Days P50/P90/P99)")
+
+    print("\n=== 最终版本改进说明 Final Version Improvements ===")
+    print("✅ 完全解决文本重叠问题 - Completely fixed text overlapping issues")
+    print("✅ 修复条形图标签突出问题 - Fixed bar label protrusion issues")
+    print("✅ 优化图表间距和布局 - Optimized chart spacing and layout")
+    print("✅ 统一专业色彩方案 - Unified professional color scheme")
+    print("✅ 精确控制标签位置 - Precise label positioning control")
+    print("✅ 改进图例和标题样式 - Improved legend and title styling")
+    print("✅ 增强整体视觉层次 - Enhanced overall visual hierarchy")
+    print("✅ 优化坐标轴限制 - Optimized axis limits")
+    print("✅ 改进网格和边框样式 - Improved grid and border styling")
+    print("✅ 确保所有文本清晰可读 - Ensured all text is clearly readable")
+
+
+if __name__ == "__main__":
+    # Load the preprocessed data (parsed once and cached by abs_data)
+    df = load_integrated()
+
+    # Classify asset types and green/carbon neutral projects from ABS names
+    df['资产类型'], df['绿色认证'] = classify(df['ABS'])
+
+    # Grouped tables come from the persisted aggregate store, which only folds in appended rows
+    aggregates = compute_aggregates(df, load_aggregates())
+    render_dashboard(df, aggregates=aggregates, band_height=EXPORT_BAND_HEIGHT)
+    plt.show()
+
+    # Generate summary statistics
+    print_summary(aggregates)
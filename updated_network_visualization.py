@@ -1,52 +1,25 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.patches import Circle, FancyBboxPatch
+from matplotlib.patches import FancyBboxPatch
 import matplotlib.patches as mpatches
 import warnings
+from abs_data import load_integrated
+from abs_classify import classify
+from abs_export import export_figure
+from abs_fonts import font_rc
+from abs_layout import ring_layout
+from abs_render import EdgeBatch, NodeBatch
 warnings.filterwarnings('ignore')
 
 # Set Chinese font for matplotlib
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+plt.rcParams.update(font_rc(['SimHei', 'Arial Unicode MS', 'DejaVu Sans']))
 
-# Load and process the data
-df = pd.read_csv('integrated ABS.csv')
+# Load the preprocessed data (parsed once and cached by abs_data)
+df = load_integrated()
 
-# Data preprocessing
-df['申报日期'] = pd.to_datetime(df['申报日期'])
-df['反馈/获批日期'] = pd.to_datetime(df['反馈/获批日期'].str.split('；').str[0])
-df['拟发行金额(亿元)'] = pd.to_numeric(df['拟发行金额(亿元)'])
-
-# Extract asset types from ABS names
-def extract_asset_type(name):
-    if '数据中心' in name:
-        return '数据中心'
-    elif '高速' in name:
-        return '高速公路'
-    elif '住房租赁' in name:
-        return '住房租赁'
-    elif '商业' in name:
-        return '商业地产'
-    elif '新能源' in name or '火电' in name:
-        return '能源设施'
-    elif '物流' in name:
-        return '物流仓储'
-    elif '产业园' in name:
-        return '产业园区'
-    elif '铁建' in name:
-        return '基础设施'
-    else:
-        return '其他'
-
-df['资产类型'] = df['ABS'].apply(extract_asset_type)
-
-# Identify green/carbon neutral projects
-def is_green_project(name):
-    green_keywords = ['碳中和', '新能源', '绿色', '环保', '清洁']
-    return any(keyword in name for keyword in green_keywords)
-
-df['绿色认证'] = df['ABS'].apply(is_green_project)
+# Classify asset types and green/carbon neutral projects from ABS names
+df['资产类型'], df['绿色认证'] = classify(df['ABS'])
 
 # Create network visualization
 fig, ax = plt.subplots(figsize=(20, 16))
@@ -88,12 +61,8 @@ underwriter_stats = underwriter_stats.sort_values('总规模', ascending=False)
 
 # Position underwriters in center
 center_radius = 3
-underwriter_positions = {}
-for i, (underwriter, stats) in enumerate(underwriter_stats.iterrows()):
-    angle = 2 * np.pi * i / len(underwriter_stats)
-    x = center_radius * np.cos(angle)
-    y = center_radius * np.sin(angle)
-    underwriter_positions[underwriter] = (x, y)
+_, xs, ys = ring_layout(len(underwriter_stats), center_radius)
+underwriter_positions = dict(zip(underwriter_stats.index, zip(xs, ys)))
 
 # Position asset types around the outside
 asset_stats = df.groupby('资产类型').agg({
@@ -104,14 +73,11 @@ asset_stats.columns = ['总规模', '产品数量']
 asset_stats = asset_stats.sort_values('总规模', ascending=False)
 
 outer_radius = 8
-asset_positions = {}
-for i, (asset_type, stats) in enumerate(asset_stats.iterrows()):
-    angle = 2 * np.pi * i / len(asset_stats)
-    x = outer_radius * np.cos(angle)
-    y = outer_radius * np.sin(angle)
-    asset_positions[asset_type] = (x, y)
+_, xs, ys = ring_layout(len(asset_stats), outer_radius)
+asset_positions = dict(zip(asset_stats.index, zip(xs, ys)))
 
-# Draw connections between underwriters and asset types
+# Draw connections between underwriters and asset types (one artist per line style)
+edge_batch = EdgeBatch()
 for _, row in df.iterrows():
     underwriter = row['承销商/管理人']
     asset_type = row['资产类型']
@@ -138,33 +104,37 @@ for _, row in df.iterrows():
             color = '#7F8C8D'
             linewidth = max(1, scale/15)
             
-        ax.plot([x1, x2], [y1, y2], color=color, linewidth=linewidth, 
-                linestyle=linestyle, alpha=alpha, zorder=1)
+        edge_batch.add((x1, y1), (x2, y2), color=color, linewidth=linewidth, 
+                       linestyle=linestyle, alpha=alpha, zorder=1)
 
-# Draw underwriter nodes
+edge_batch.draw(ax)
+
+# Draw underwriter nodes (one collection, drawn before the z=3 project labels)
+underwriter_nodes = NodeBatch()
 for underwriter, (x, y) in underwriter_positions.items():
     stats = underwriter_stats.loc[underwriter]
     size = max(800, stats['总规模'] * 15)
     color = colors_underwriter.get(underwriter, '#95A5A6')
     
     # Draw circle
-    circle = Circle((x, y), radius=np.sqrt(size)/50, color=color, alpha=0.8, zorder=3)
-    ax.add_patch(circle)
+    underwriter_nodes.add(x, y, np.sqrt(size)/50, color=color, alpha=0.8, zorder=3)
     
     # Add text
     ax.text(x, y, f"{underwriter}\n{stats['总规模']:.1f}亿\n{stats['产品数量']}只", 
             ha='center', va='center', fontsize=10, fontweight='bold', 
             color='white', zorder=4)
 
-# Draw asset type nodes
+underwriter_nodes.draw(ax)
+
+# Draw asset type and project nodes (shared z=2 layer)
+nodes = NodeBatch()
 for asset_type, (x, y) in asset_positions.items():
     stats = asset_stats.loc[asset_type]
     size = max(600, stats['总规模'] * 12)
     color = colors_asset.get(asset_type, '#BDC3C7')
     
     # Draw circle
-    circle = Circle((x, y), radius=np.sqrt(size)/60, color=color, alpha=0.7, zorder=2)
-    ax.add_patch(circle)
+    nodes.add(x, y, np.sqrt(size)/60, color=color, alpha=0.7, zorder=2)
     
     # Add text
     ax.text(x, y, f"{asset_type}\n{stats['总规模']:.1f}亿\n{stats['产品数量']}只", 
@@ -174,10 +144,11 @@ for asset_type, (x, y) in asset_positions.items():
 # Add individual projects as small nodes
 project_radius = 10
 project_positions = {}
+project_angles, project_xs, project_ys = ring_layout(len(df), project_radius)
 for i, (_, row) in enumerate(df.iterrows()):
-    angle = 2 * np.pi * i / len(df)
-    x = project_radius * np.cos(angle)
-    y = project_radius * np.sin(angle)
+    angle = project_angles[i]
+    x = project_xs[i]
+    y = project_ys[i]
     
     scale = row['拟发行金额(亿元)']
     status = row['状态']
@@ -194,17 +165,11 @@ for i, (_, row) in enumerate(df.iterrows()):
         color = '#F39C12'
         alpha = 0.6
         
-    # Green border for green projects
-    if is_green:
-        edge_color = '#27AE60'
-        edge_width = 3
-    else:
-        edge_color = 'white'
-        edge_width = 1
+    # Thicker border for green projects (the border takes the fill color)
+    edge_width = 3 if is_green else 1
     
-    circle = Circle((x, y), radius=np.sqrt(size)/20, color=color, alpha=alpha, 
-                   edgecolor=edge_color, linewidth=edge_width, zorder=2)
-    ax.add_patch(circle)
+    nodes.add(x, y, np.sqrt(size)/20, color=color, alpha=alpha, 
+              linewidth=edge_width, zorder=2)
     
     # Add project name for large projects
     if scale > 20:
@@ -212,6 +177,8 @@ for i, (_, row) in enumerate(df.iterrows()):
         ax.text(x, y-np.sqrt(size)/15, project_name, ha='center', va='top', 
                 fontsize=7, rotation=angle*180/np.pi if abs(angle) > np.pi/2 else 0)
 
+nodes.draw(ax)
+
 # Add title and legends
 ax.set_title('中国持有型不动产ABS市场网络分析图\nChina Holding-Type Real Estate ABS Market Network Analysis', 
              fontsize=20, fontweight='bold', pad=30)
@@ -275,8 +242,8 @@ ax.spines['bottom'].set_visible(False)
 ax.spines['left'].set_visible(False)
 
 plt.tight_layout()
-plt.savefig('Updated_ABS_Network_Visualization.png', dpi=300, bbox_inches='tight', 
-            facecolor='white', edgecolor='none')
+export_figure(plt.gcf(), 'Updated_ABS_Network_Visualization.png', dpi=300, bbox_inches='tight', 
+              facecolor='white', edgecolor='none')
 plt.show()
 
 print("=== 网络分析摘要 Network Analysis Summary ===")